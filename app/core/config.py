@@ -4,7 +4,7 @@
 
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
-from typing import List
+from typing import Dict, List
 import os
 
 
@@ -40,15 +40,103 @@ class Settings(BaseSettings):
     SESSION_TIMEOUT: int = 3600  # 1 hora em segundos
     MAX_HISTORY_PER_SESSION: int = 1000
     SESSION_CLEANUP_INTERVAL: int = 300  # 5 minutos
+    HISTORY_PAGE_DEFAULT_SIZE: int = 100
+    HISTORY_PAGE_MAX_SIZE: int = 1000
+    HISTORY_EXPORT_CHUNK_SIZE: int = 500
     
+    # Admission control / Rate limiting
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_PER_SECOND: float = 5.0  # tokens repostos por segundo, por cliente
+    RATE_LIMIT_BURST: int = 20  # capacidade máxima do bucket
+    RATE_LIMIT_HEAVY_COST: int = 5  # tokens consumidos por rota pesada
+    RATE_LIMIT_MAX_CLIENTS: int = 10000  # buckets mantidos em memória (IPs e sessões, cada)
+    # Proxies (IP ou CIDR) cujo X-Forwarded-For é aceito; vazio = IP da conexão
+    RATE_LIMIT_TRUSTED_PROXIES: List[str] = []
+    HEAVY_ROUTES: List[str] = [
+        "/api/v1/strategies",
+        "/api/v1/manual-input",
+        "/api/v1/import",
+        "/api/v1/ocr-upload",
+        "/api/v1/ocr-batch",
+    ]
+    RATE_LIMIT_EXEMPT_ROUTES: List[str] = ["/", "/health", "/metrics"]
+    MAX_CONCURRENT_HEAVY_REQUESTS: int = 8
+    MAX_REQUEST_BODY_SIZE: int = 1 * 1024 * 1024  # 1MB (rotas JSON)
+    MAX_UPLOAD_BODY_SIZE: int = 50 * 1024 * 1024  # 50MB (multipart)
+    MAX_MANUAL_INPUT_NUMBERS: int = 5000
+    IMPORT_CHUNK_SIZE: int = 5000  # spins gravados por aquisição de lock
+
+    @field_validator("HEAVY_ROUTES", "RATE_LIMIT_EXEMPT_ROUTES", "RATE_LIMIT_TRUSTED_PROXIES", mode="before")
+    @classmethod
+    def _parse_heavy_routes(cls, v):
+        """Aceita lista JSON ou string separada por vírgula no .env."""
+        if isinstance(v, str):
+            return [p.strip() for p in v.split(",") if p.strip()]
+        return v
+
     # OCR
     OCR_MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     OCR_ALLOWED_FORMATS: List[str] = ["image/jpeg", "image/png", "image/jpg"]
+    OCR_MAX_WORKERS: int = 3  # estratégias simultâneas por processo
+    OCR_EARLY_EXIT: bool = True  # para quando duas estratégias concordam
+    OCR_BACKEND: str = "auto"  # auto | tesserocr | pytesseract
+    OCR_ROI_ENABLED: bool = True  # recorta a faixa de histórico antes do OCR
+    OCR_ROI_TARGET_HEIGHT: int = 64  # altura (px) da faixa normalizada
+    OCR_ROI_CACHE_SIZE: int = 64  # regiões em cache por layout
+    OCR_MAX_DIMENSION: int = 2000  # maior lado (px) enviado ao OCR
+    # Layouts conhecidos: {"nome": [x, y, w, h]} relativos (0-1)
+    OCR_LAYOUT_TEMPLATES: Dict[str, List[float]] = {}
+    OCR_CACHE_ENABLED: bool = True
+    OCR_CACHE_MAX_BYTES: int = 8 * 1024 * 1024  # 8MB
+    OCR_CACHE_PERCEPTUAL: bool = False  # busca também pelo hash da faixa recortada
+    OCR_CACHE_PHASH_DISTANCE: int = 0  # bits de diferença aceitos (dHash da faixa)
+    OCR_CACHE_PHASH_SCAN: int = 64  # entradas comparadas quando a distância > 0
+    OCR_TEMPLATE_ENABLED: bool = True  # template matching antes do Tesseract
+    OCR_TEMPLATE_FONTS: List[str] = []  # TTFs das skins (vazio = fonte padrão)
+    OCR_TEMPLATE_DIR: str = ""  # recortes reais: <número>.png
+    OCR_TEMPLATE_MIN_CONFIDENCE: float = 0.75  # correlação mínima por ficha
+    OCR_STREAM_DIFF_THRESHOLD: float = 0.02  # diferença média (0-1) que conta como mudança
+    OCR_STREAM_NEWEST_FIRST: bool = True  # faixa cresce pela esquerda/topo
+    OCR_STREAM_MAX_NEW_PER_FRAME: int = 5  # acima disso, ressincroniza
+    OCR_STREAM_MIN_OVERLAP: int = 3  # números em comum entre leituras consecutivas
+    OCR_JOB_WORKERS: int = 2  # processos de OCR
+    OCR_JOB_MAX_QUEUE: int = 100  # jobs pendentes antes de responder 503
+    OCR_JOB_TIMEOUT: float = 30.0  # segundos por job
+    OCR_JOB_RESULT_TTL: float = 600.0  # segundos que o resultado fica disponível
+    OCR_BATCH_MAX_FILES: int = 50  # imagens por requisição de lote
     
     # AI Engine
     DEFAULT_HISTORY_LIMIT: int = 50
     MAX_HISTORY_LIMIT: int = 200
     MIN_HISTORY_LIMIT: int = 10
+    TRANSITIONS_TOP_K: int = 5  # seguidores mais prováveis do último spin
+    HOTNESS_HALF_LIFE_SECONDS: float = 1800.0  # meia-vida dos scores de hotness
+    HOTNESS_TOP_K: int = 10  # números mais quentes no resumo
+    SPIN_TIMESTAMP_MAX_SKEW: float = 300.0  # segundos aceitos à frente do relógio
+    # Viés da roda (todo o histórico da sessão, sem janela)
+    BIAS_PRIOR: float = 1.0  # pseudo-contagem Dirichlet por categoria
+    BIAS_CREDIBLE_LEVEL: float = 0.95  # nível dos intervalos da posterior
+    BIAS_CUSUM_NUMBER_SHIFT: float = 0.5  # aumento relativo detectado por número
+    BIAS_CUSUM_SECTOR_SHIFT: float = 0.1  # aumento relativo detectado por setor
+    BIAS_CUSUM_THRESHOLD: float = 12.0  # limiar do CUSUM (log-verossimilhança)
+    # Distância na roda entre spins consecutivos (assinatura do dealer)
+    DISTANCE_WINDOWS: List[int] = [37, 100, 500]  # janelas consultadas juntas
+    DISTANCE_TOP_K: int = 5  # distâncias mais frequentes por janela
+    DISTANCE_ZONE_RADIUS: int = 2  # casas para cada lado na zona prevista
+    # Significância (Monte Carlo sob roleta justa)
+    SIGNIFICANCE_ENABLED: bool = True
+    SIGNIFICANCE_SIMULATIONS: int = 10000  # janelas simuladas por tamanho
+    SIGNIFICANCE_ALPHA: float = 0.05  # nível para rotular quente/frio (com Bonferroni)
+    SIGNIFICANCE_CACHE_WINDOWS: int = 256  # tamanhos de janela em cache
+    SIGNIFICANCE_WARMUP: bool = True  # pré-calcula DEFAULT_HISTORY_LIMIT no startup
+    SIGNIFICANCE_WARMUP_ALL: bool = False  # todas as janelas 1..MAX_HISTORY_LIMIT (~10s de CPU)
+    # Alertas: regras padrão de cada sessão (alteráveis por sessão)
+    ALERT_DEFAULT_RULES: List[Dict] = [
+        {"type": "sector_absent", "threshold": 12},
+        {"type": "terminal_repeat", "threshold": 3},
+        {"type": "color_streak", "threshold": 7},
+    ]
+    ALERT_MAX_RULES: int = 20  # regras por sessão
     
     # Redis (para produção futura)
     REDIS_URL: str = "redis://localhost:6379"
@@ -60,6 +148,16 @@ class Settings(BaseSettings):
     
     # Logging
     LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = False  # uma linha JSON por log
+    LOG_QUEUE_SIZE: int = 10000  # records pendentes antes de descartar
+    # Fração mantida de DEBUG/INFO por prefixo de logger (caminho quente)
+    LOG_SAMPLING: Dict[str, float] = {"app.services.ai_service": 0.1}
+    
+    # Instrumentação (tempo por seção da análise)
+    TIMING_ENABLED: bool = False
+    TIMING_SAMPLE_RATE: float = 1.0  # fração das requisições medidas (0-1)
+    SERVER_TIMING_HEADER: bool = True  # envia o cabeçalho Server-Timing
+    METRICS_ENABLED: bool = True  # /metrics (requer prometheus-client)
     
     class Config:
         env_file = ".env"
@@ -85,7 +183,22 @@ def validate_environment():
             "CORS com '*' não é permitido em produção. "
             "Configure ALLOWED_ORIGINS corretamente."
         )
-    
+
+    if not settings.DISTANCE_WINDOWS or min(settings.DISTANCE_WINDOWS) < 1:
+        raise ValueError("DISTANCE_WINDOWS deve ter ao menos uma janela positiva.")
+
+    if settings.BIAS_PRIOR <= 0:
+        raise ValueError("BIAS_PRIOR deve ser positivo (pseudo-contagem da Dirichlet).")
+
+    if not 0 < settings.BIAS_CREDIBLE_LEVEL < 1:
+        raise ValueError("BIAS_CREDIBLE_LEVEL deve estar entre 0 e 1.")
+
+    if settings.BIAS_CUSUM_NUMBER_SHIFT <= 0 or settings.BIAS_CUSUM_SECTOR_SHIFT <= 0:
+        raise ValueError("BIAS_CUSUM_NUMBER_SHIFT e BIAS_CUSUM_SECTOR_SHIFT devem ser positivos.")
+
+    if settings.BIAS_CUSUM_THRESHOLD <= 0:
+        raise ValueError("BIAS_CUSUM_THRESHOLD deve ser positivo.")
+
     print(f"✅ Configurações carregadas: {settings.PROJECT_NAME} v{settings.VERSION}")
     print(f"📍 CORS Origins: {settings.ALLOWED_ORIGINS}")
     print(f"🔧 Debug Mode: {settings.DEBUG}")
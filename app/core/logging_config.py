@@ -0,0 +1,230 @@
+# ======================================================
+# LOGGING_CONFIG.PY - Pipeline de logs não bloqueante
+# ======================================================
+
+import json
+import logging
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Dict, Optional
+
+from app.core.config import settings
+
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+
+def get_request_id() -> str:
+    """ID de correlação da requisição atual ("-" fora de requisições)"""
+    return request_id_var.get()
+
+
+# ======================================================
+# FILTROS (rodam na thread de quem loga: só operações baratas)
+# ======================================================
+
+class RequestIdFilter(logging.Filter):
+    """Copia o ID de correlação do contexto para o record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Amostragem por logger para mensagens do caminho quente
+
+    `rates` mapeia prefixo de logger → fração mantida (0-1). Só afeta
+    DEBUG/INFO; WARNING ou acima sempre passam. Vale o prefixo mais
+    específico.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None):
+        super().__init__()
+        # Mais específico primeiro
+        self.rates = sorted((rates or {}).items(), key=lambda item: -len(item[0]))
+        self._cache: Dict[str, float] = {}
+
+    def _rate_for(self, name: str) -> float:
+        rate = self._cache.get(name)
+        if rate is None:
+            rate = 1.0
+            for prefix, value in self.rates:
+                if name == prefix or name.startswith(prefix + "."):
+                    rate = value
+                    break
+            self._cache[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self._rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+# ======================================================
+# FORMATTERS (rodam na thread do listener)
+# ======================================================
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        if not hasattr(record, "request_id"):
+            record.request_id = "-"
+        return super().format(record)
+
+
+# ======================================================
+# QUEUE HANDLER
+# ======================================================
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Enfileira records sem formatá-los
+
+    O QueueHandler padrão formata a mensagem em `prepare` (na thread
+    de quem loga). Aqui o record vai intacto (fila em memória, sem
+    pickle): `getMessage`, formatação e escrita acontecem na thread do
+    listener. Com a fila cheia o record é descartado e contado, em vez
+    de bloquear o event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+
+
+def setup_logging(
+    level: Optional[str] = None,
+    json_output: Optional[bool] = None,
+    sampling: Optional[Dict[str, float]] = None,
+    queue_size: Optional[int] = None,
+    stream=None
+) -> NonBlockingQueueHandler:
+    """
+    Configura o root logger: QueueHandler (caller) → QueueListener (thread)
+
+    Idempotente: chamadas repetidas reconfiguram o pipeline.
+    """
+    global _listener, _queue_handler
+    stop_logging()
+
+    level = (level or settings.LOG_LEVEL).upper()
+    json_output = settings.LOG_JSON if json_output is None else json_output
+    sampling = settings.LOG_SAMPLING if sampling is None else sampling
+    queue_size = queue_size or settings.LOG_QUEUE_SIZE
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if json_output else _TextFormatter(TEXT_FORMAT))
+
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    handler.addFilter(SamplingFilter(sampling))
+    handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    _queue_handler = handler
+    return handler
+
+
+def stop_logging() -> None:
+    """Esvazia a fila e para a thread do listener"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def logging_stats() -> Dict:
+    handler = _queue_handler
+    if handler is None:
+        return {"queued": 0, "dropped": 0}
+    return {"queued": handler.queue.qsize(), "dropped": handler.dropped}
+
+
+# ======================================================
+# MIDDLEWARE
+# ======================================================
+
+class RequestIdMiddleware:
+    """
+    ID de correlação por requisição
+
+    Usa o cabeçalho X-Request-ID quando enviado (até 128 caracteres)
+    ou gera um novo; fica disponível para os logs via contextvar e
+    volta no cabeçalho X-Request-ID da resposta.
+    """
+
+    def __init__(self, app: Callable, header: str = "x-request-id"):
+        self.app = app
+        self.header = header.encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == self.header:
+                request_id = value.decode("latin-1")[:128]
+                break
+        if not request_id:
+            request_id = uuid.uuid4().hex
+
+        token = request_id_var.set(request_id)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((self.header, request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
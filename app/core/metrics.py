@@ -0,0 +1,281 @@
+# ======================================================
+# METRICS.PY - Métricas Prometheus (/metrics)
+# ======================================================
+
+import logging
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        CollectorRegistry,
+        Counter,
+        Histogram,
+        ProcessCollector,
+        generate_latest,
+    )
+    from prometheus_client.core import (
+        CounterMetricFamily,
+        GaugeMetricFamily,
+        HistogramMetricFamily,
+    )
+    PROMETHEUS_AVAILABLE = True
+except ImportError:  # prometheus-client é opcional
+    PROMETHEUS_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+# Buckets (segundos)
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LOCK_WAIT_BUCKETS = (0.00001, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1)
+OCR_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class Metrics:
+    """
+    Métricas da aplicação
+
+    Contadores e histogramas atualizados no caminho da requisição;
+    valores que já existem em outros componentes (sessões, fila de OCR,
+    caches, seções da análise) são lidos só no momento do scrape, por
+    um collector. Sem prometheus-client (ou com METRICS_ENABLED=False)
+    todos os métodos viram no-op.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled and PROMETHEUS_AVAILABLE
+        if enabled and not PROMETHEUS_AVAILABLE:
+            logger.warning("⚠️  prometheus-client não instalado: /metrics desabilitado")
+        if not self.enabled:
+            return
+
+        self.registry = CollectorRegistry()
+        ProcessCollector(registry=self.registry)
+
+        self.request_duration = Histogram(
+            "roulette_http_request_duration_seconds",
+            "Latência das requisições HTTP por rota",
+            ["method", "route", "status"],
+            buckets=REQUEST_BUCKETS,
+            registry=self.registry,
+        )
+        self.analysis_duration = Histogram(
+            "roulette_analysis_duration_seconds",
+            "Tempo de cálculo de analyze_data",
+            buckets=REQUEST_BUCKETS,
+            registry=self.registry,
+        )
+        self.cleanup_duration = Histogram(
+            "roulette_session_cleanup_duration_seconds",
+            "Duração da limpeza de sessões expiradas",
+            buckets=REQUEST_BUCKETS,
+            registry=self.registry,
+        )
+        self.sessions_cleaned = Counter(
+            "roulette_sessions_cleaned",
+            "Sessões removidas pela limpeza",
+            registry=self.registry,
+        )
+        self.lock_acquisitions = Counter(
+            "roulette_session_lock_acquisitions",
+            "Aquisições do lock do SessionManager",
+            registry=self.registry,
+        )
+        self.lock_wait = Histogram(
+            "roulette_session_lock_wait_seconds",
+            "Espera pelo lock do SessionManager (só aquisições disputadas)",
+            buckets=LOCK_WAIT_BUCKETS,
+            registry=self.registry,
+        )
+        self.ocr_duration = Histogram(
+            "roulette_ocr_duration_seconds",
+            "Tempo de OCR por imagem nos workers",
+            ["kind"],
+            buckets=OCR_BUCKETS,
+            registry=self.registry,
+        )
+
+    # --------------------------------------------------
+    # Observações (no-op quando desabilitado)
+    # --------------------------------------------------
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        if self.enabled:
+            self.request_duration.labels(method, route, str(status)).observe(seconds)
+
+    def observe_analysis(self, seconds: float) -> None:
+        if self.enabled:
+            self.analysis_duration.observe(seconds)
+
+    def observe_cleanup(self, seconds: float, removed: int) -> None:
+        if self.enabled:
+            self.cleanup_duration.observe(seconds)
+            self.sessions_cleaned.inc(removed)
+
+    def observe_lock(self, wait: Optional[float]) -> None:
+        """`wait` None = lock livre na primeira tentativa"""
+        if self.enabled:
+            self.lock_acquisitions.inc()
+            if wait is not None:
+                self.lock_wait.observe(wait)
+
+    def observe_ocr(self, seconds: float, kind: str = "job") -> None:
+        if self.enabled:
+            self.ocr_duration.labels(kind).observe(seconds)
+
+    def register_collector(self, collector) -> None:
+        if self.enabled:
+            self.registry.register(collector)
+
+    def render(self) -> Tuple[bytes, str]:
+        """(corpo, content-type) no formato de exposição do Prometheus"""
+        return generate_latest(self.registry), CONTENT_TYPE_LATEST
+
+
+metrics = Metrics(settings.METRICS_ENABLED)
+
+
+# ======================================================
+# LOCK INSTRUMENTADO
+# ======================================================
+
+class InstrumentedLock:
+    """
+    Envolve um lock medindo o tempo de espera
+
+    Tenta adquirir sem bloquear; só quando o lock está ocupado mede a
+    espera. O caminho sem disputa custa uma tentativa extra e um
+    incremento de contador.
+    """
+
+    __slots__ = ("_lock", "_metrics")
+
+    def __init__(self, lock, metrics_: Optional[Metrics] = None):
+        self._lock = lock
+        self._metrics = metrics_ or metrics
+
+    def __enter__(self):
+        if self._lock.acquire(blocking=False):
+            self._metrics.observe_lock(None)
+            return self
+
+        started = time.perf_counter()
+        self._lock.acquire()
+        self._metrics.observe_lock(time.perf_counter() - started)
+        return self
+
+    def __exit__(self, *exc):
+        self._lock.release()
+        return False
+
+
+# ======================================================
+# COLLECTOR (valores lidos no scrape)
+# ======================================================
+
+class AppCollector:
+    """
+    Lê o estado atual no momento do scrape
+
+    Args:
+        session_manager: Sessões ativas e spins armazenados
+        get_ocr_jobs: Retorna a fila de OCR (ou None se desabilitado)
+        timing_registry: Histogramas das seções de analyze_data
+    """
+
+    def __init__(
+        self,
+        session_manager,
+        get_ocr_jobs: Optional[Callable[[], object]] = None,
+        timing_registry=None
+    ):
+        self.session_manager = session_manager
+        self.get_ocr_jobs = get_ocr_jobs
+        self.timing_registry = timing_registry
+
+    def collect(self):
+        storage = self.session_manager.get_storage_stats()
+        yield GaugeMetricFamily("roulette_active_sessions", "Sessões em memória", value=storage["sessions"])
+        yield GaugeMetricFamily("roulette_stored_spins", "Spins armazenados em todas as sessões", value=storage["spins"])
+
+        ocr_jobs = self.get_ocr_jobs() if self.get_ocr_jobs else None
+        if ocr_jobs is not None:
+            yield from self._collect_ocr(ocr_jobs)
+
+        if self.timing_registry is not None:
+            yield from self._collect_sections(self.timing_registry.snapshot())
+
+    def _collect_ocr(self, ocr_jobs):
+        stats = ocr_jobs.stats()
+        yield GaugeMetricFamily("roulette_ocr_queue_depth", "Jobs de OCR aguardando ou em execução", value=stats["queue_depth"])
+        yield GaugeMetricFamily("roulette_ocr_jobs_running", "Jobs de OCR em execução", value=stats["running"])
+
+        jobs = CounterMetricFamily("roulette_ocr_jobs", "Jobs de OCR por resultado", labels=["result"])
+        for result in ("completed", "failed", "timeouts", "deduplicated"):
+            jobs.add_metric([result], stats[result])
+        yield jobs
+
+        cache = ocr_jobs.cache_stats()
+        if cache is not None:
+            lookups = CounterMetricFamily("roulette_ocr_cache_lookups", "Consultas ao cache de OCR", labels=["result"])
+            lookups.add_metric(["hit_exact"], cache["hits_exact"])
+            lookups.add_metric(["hit_perceptual"], cache["hits_perceptual"])
+            lookups.add_metric(["miss"], cache["misses"])
+            yield lookups
+            yield GaugeMetricFamily("roulette_ocr_cache_hit_ratio", "Taxa de acerto do cache de OCR", value=cache["hit_ratio"])
+            yield GaugeMetricFamily("roulette_ocr_cache_bytes", "Bytes ocupados pelo cache de OCR", value=cache["bytes"])
+
+    @staticmethod
+    def _collect_sections(snapshot: Dict[str, Dict]):
+        family = HistogramMetricFamily(
+            "roulette_analysis_section_duration_seconds",
+            "Tempo por seção de analyze_data (requisições amostradas)",
+            labels=["section"],
+        )
+        for section, h in snapshot.items():
+            cumulative = 0
+            buckets = []
+            for bound, count in zip(h["buckets_ms"], h["counts"]):
+                cumulative += count
+                buckets.append((repr(bound / 1000), cumulative))
+            buckets.append(("+Inf", h["count"]))
+            family.add_metric([section], buckets, sum_value=h["sum_ms"] / 1000)
+        yield family
+
+
+# ======================================================
+# MIDDLEWARE
+# ======================================================
+
+class MetricsMiddleware:
+    """Latência por rota (template da rota, não o caminho com IDs)"""
+
+    def __init__(self, app: Callable, metrics_: Optional[Metrics] = None):
+        self.app = app
+        self.metrics = metrics_ or metrics
+
+    async def __call__(self, scope, receive, send):
+        if not self.metrics.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # O router preenche scope["route"]; requisições recusadas
+            # antes do roteamento (429/413/503) ficam como "unmatched"
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            self.metrics.observe_request(scope["method"], route, status, time.perf_counter() - started)
@@ -0,0 +1,362 @@
+# ======================================================
+# RATE_LIMIT.PY - Admission control e rate limiting
+# ======================================================
+
+import ipaddress
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+
+
+# Content-Types de upload que usam MAX_UPLOAD_BODY_SIZE
+_UPLOAD_CONTENT_TYPES = (
+    "multipart/",
+    "text/csv",
+    "text/plain",
+    "application/x-ndjson",
+)
+
+
+class TokenBucket:
+    """
+    Token bucket clássico
+
+    Repõe `rate` tokens por segundo até `capacity`. A reposição é
+    calculada de forma preguiçosa a cada tentativa de consumo (O(1)).
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def check(self, cost: float = 1.0) -> Tuple[bool, float]:
+        """
+        Verifica se há `cost` tokens, sem consumir
+
+        Returns:
+            (permitido, segundos até haver tokens suficientes)
+        """
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+
+        if self.tokens >= cost:
+            return True, 0.0
+
+        if self.rate <= 0:
+            return False, float("inf")
+        return False, (cost - self.tokens) / self.rate
+
+    def try_consume(self, cost: float = 1.0) -> Tuple[bool, float]:
+        """Tenta consumir `cost` tokens (mesmo retorno de `check`)"""
+        allowed, retry_after = self.check(cost)
+        if allowed:
+            self.tokens -= cost
+        return allowed, retry_after
+
+
+class RateLimiter:
+    """
+    Mantém um token bucket por cliente
+
+    Os buckets ficam num OrderedDict em ordem LRU, limitado a
+    `max_clients` entradas para não crescer sem controle.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        max_clients: int = 10000
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, key: str) -> TokenBucket:
+        """Bucket do cliente, criado sob demanda (chamar com o lock)"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.capacity)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def check(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """Verifica o bucket do cliente sem consumir tokens"""
+        with self._lock:
+            return self._bucket(key).check(cost)
+
+    def hit(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """Consome tokens do bucket do cliente"""
+        with self._lock:
+            return self._bucket(key).try_consume(cost)
+
+    def reset(self) -> None:
+        """Remove todos os buckets"""
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class _BodyTooLarge(HTTPException):
+    """
+    Corpo da requisição excedeu o limite configurado
+
+    Herda de HTTPException para atravessar o parsing de corpo do
+    FastAPI e cair no handler padrão como 413.
+    """
+
+    def __init__(self, limit: int):
+        super().__init__(
+            status_code=413,
+            detail=f"Corpo da requisição excede {limit} bytes"
+        )
+
+
+def _header(scope: Dict, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class TrustedProxies:
+    """IPs/redes (CIDR) de proxies cujo X-Forwarded-For é confiável"""
+
+    def __init__(self, entries: Iterable[str] = ()):
+        self.networks = [ipaddress.ip_network(entry, strict=False) for entry in entries]
+
+    def __contains__(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.networks)
+
+
+def client_ip(scope: Dict, trusted: TrustedProxies) -> str:
+    """
+    IP do cliente: o par da conexão (`scope["client"]`)
+
+    X-Forwarded-For só vale quando o par é um proxy confiável (ex.
+    Railway); a lista é lida da direita para a esquerda e o primeiro
+    salto que não é proxy confiável é o cliente. Sem proxy confiável,
+    o cabeçalho é ignorado (qualquer cliente poderia forjá-lo).
+    """
+    client = scope.get("client")
+    peer = client[0] if client else "unknown"
+    if peer not in trusted:
+        return peer
+
+    forwarded = _header(scope, b"x-forwarded-for")
+    hops = [hop.strip() for hop in (forwarded or "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if hop not in trusted:
+            return hop
+    return hops[0] if hops else peer
+
+
+def _session_id(scope: Dict) -> Optional[str]:
+    """session_id da query string (None se ausente)"""
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    session_ids = query.get("session_id")
+    return session_ids[0] if session_ids and session_ids[0] else None
+
+
+class AdmissionControlMiddleware:
+    """
+    Middleware ASGI de admission control
+
+    - Limita o tamanho do corpo (413)
+    - Rate limit por IP com token bucket (429) e, com session_id, também
+      por sessão (os dois precisam ter tokens; trocar de session_id não
+      dá um bucket novo ao IP)
+    - Limita requisições pesadas simultâneas (503)
+
+    Quando saturado responde imediatamente com Retry-After, em vez
+    de enfileirar a requisição indefinidamente.
+    """
+
+    def __init__(
+        self,
+        app: Callable,
+        rate_limiter: Optional[RateLimiter] = None,
+        session_limiter: Optional[RateLimiter] = None,
+        trusted_proxies: Optional[Iterable[str]] = None,
+        heavy_routes: Optional[Iterable[str]] = None,
+        exempt_routes: Optional[Iterable[str]] = None,
+        max_concurrent_heavy: Optional[int] = None,
+        heavy_cost: Optional[int] = None,
+        max_body_size: Optional[int] = None,
+        max_upload_size: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ):
+        self.app = app
+        # `is not None`: um RateLimiter vazio tem len() == 0 (falsy)
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter(
+            rate=settings.RATE_LIMIT_PER_SECOND,
+            capacity=settings.RATE_LIMIT_BURST,
+            max_clients=settings.RATE_LIMIT_MAX_CLIENTS,
+        )
+        # Buckets de sessão separados: session_ids novos não expulsam IPs do LRU
+        self.session_limiter = session_limiter if session_limiter is not None else RateLimiter(
+            rate=settings.RATE_LIMIT_PER_SECOND,
+            capacity=settings.RATE_LIMIT_BURST,
+            max_clients=settings.RATE_LIMIT_MAX_CLIENTS,
+        )
+        self.trusted_proxies = TrustedProxies(
+            trusted_proxies if trusted_proxies is not None else settings.RATE_LIMIT_TRUSTED_PROXIES
+        )
+        self.heavy_routes: List[str] = list(
+            heavy_routes if heavy_routes is not None else settings.HEAVY_ROUTES
+        )
+        self.exempt_routes = frozenset(
+            exempt_routes if exempt_routes is not None else settings.RATE_LIMIT_EXEMPT_ROUTES
+        )
+        self.max_concurrent_heavy = (
+            max_concurrent_heavy
+            if max_concurrent_heavy is not None
+            else settings.MAX_CONCURRENT_HEAVY_REQUESTS
+        )
+        self.heavy_cost = (
+            heavy_cost if heavy_cost is not None else settings.RATE_LIMIT_HEAVY_COST
+        )
+        self.max_body_size = (
+            max_body_size if max_body_size is not None else settings.MAX_REQUEST_BODY_SIZE
+        )
+        self.max_upload_size = (
+            max_upload_size if max_upload_size is not None else settings.MAX_UPLOAD_BODY_SIZE
+        )
+        self.enabled = enabled if enabled is not None else settings.RATE_LIMIT_ENABLED
+        self.in_flight_heavy = 0
+        self.rejected = {"413": 0, "429": 0, "503": 0}
+
+    def _is_heavy(self, path: str) -> bool:
+        return any(path.startswith(route) for route in self.heavy_routes)
+
+    def _body_limit(self, scope: Dict) -> int:
+        content_type = _header(scope, b"content-type") or ""
+        if content_type.startswith(_UPLOAD_CONTENT_TYPES):
+            return self.max_upload_size
+        return self.max_body_size
+
+    async def __call__(self, scope: Dict, receive: Callable, send: Callable):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        # 1. Tamanho do corpo (Content-Length declarado)
+        body_limit = self._body_limit(scope)
+        content_length = _header(scope, b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > body_limit:
+            await self._reject(send, 413, f"Corpo da requisição excede {body_limit} bytes")
+            return
+
+        # Preflight CORS (OPTIONS) não consome tokens
+        path = scope.get("path", "")
+        if path in self.exempt_routes or scope.get("method") == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        # 2. Rate limit por IP e, por cima, por sessão: verifica os dois
+        #    buckets antes de consumir (rejeição da sessão não gasta o IP)
+        heavy = self._is_heavy(path)
+        cost = self.heavy_cost if heavy else 1
+        buckets = [(self.rate_limiter, f"ip:{client_ip(scope, self.trusted_proxies)}")]
+        session_id = _session_id(scope)
+        if session_id:
+            buckets.append((self.session_limiter, f"session:{session_id}"))
+
+        checks = [limiter.check(key, cost=cost) for limiter, key in buckets]
+        if not all(allowed for allowed, _ in checks):
+            retry_after = max(wait for allowed, wait in checks if not allowed)
+            await self._reject(
+                send, 429, "Limite de requisições excedido", retry_after=retry_after
+            )
+            return
+        for limiter, key in buckets:
+            limiter.hit(key, cost=cost)
+
+        # 3. Concorrência de rotas pesadas (sem fila: rejeita na hora)
+        if heavy:
+            if self.in_flight_heavy >= self.max_concurrent_heavy:
+                await self._reject(
+                    send, 503, "Servidor ocupado, tente novamente", retry_after=1
+                )
+                return
+            self.in_flight_heavy += 1
+
+        # Corpos sem Content-Length (chunked) são contados em streaming
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > body_limit:
+                    raise _BodyTooLarge(body_limit)
+            return message
+
+        async def tracked_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except _BodyTooLarge as exc:
+            if not response_started:
+                await self._reject(send, 413, exc.detail)
+        finally:
+            if heavy:
+                self.in_flight_heavy -= 1
+
+    async def _reject(
+        self,
+        send: Callable,
+        status_code: int,
+        message: str,
+        retry_after: Optional[float] = None
+    ):
+        """Responde rapidamente no formato de erro padrão da API"""
+        self.rejected[str(status_code)] = self.rejected.get(str(status_code), 0) + 1
+
+        body = json.dumps({"status": "error", "message": message}).encode("utf-8")
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+        ]
+        if retry_after is not None:
+            seconds = 1 if math.isinf(retry_after) else max(1, math.ceil(retry_after))
+            headers.append((b"retry-after", str(seconds).encode("latin-1")))
+
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": headers,
+        })
+        await send({"type": "http.response.body", "body": body})
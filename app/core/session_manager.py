@@ -3,13 +3,16 @@
 # ======================================================
 
 import uuid
+from array import array
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from collections import defaultdict
 import threading
 import time
 
 from app.core.config import settings
+from app.core.metrics import InstrumentedLock, metrics
+from app.engines.trackers import SessionTrackers
 
 
 class SessionManager:
@@ -22,39 +25,113 @@ class SessionManager:
     
     def __init__(self):
         self._sessions: Dict[str, Dict] = {}
-        self._lock = threading.RLock()
+        # Com métricas ligadas, mede a espera pelo lock
+        self._lock = (
+            InstrumentedLock(threading.RLock()) if metrics.enabled else threading.RLock()
+        )
         self._cleanup_thread = None
         self._start_cleanup_thread()
     
+    @staticmethod
+    def _new_session() -> Dict:
+        """Estrutura inicial de uma sessão"""
+        now = datetime.now()
+        return {
+            "history": [],
+            # Quantos spins já saíram do início do histórico (janela)
+            # Permite cursores absolutos estáveis para paginação
+            "offset": 0,
+            # Instante (epoch, segundos) de cada spin, paralelo a "history"
+            "timestamps": array("d"),
+            # Estatísticas incrementais da janela (atualizadas por spin)
+            "trackers": SessionTrackers(),
+            "created_at": now,
+            "last_updated": now,
+        }
+    
     def create_session(self) -> str:
         """Cria uma nova sessão e retorna o ID"""
         with self._lock:
             session_id = str(uuid.uuid4())
-            self._sessions[session_id] = {
-                "history": [],
-                "created_at": datetime.now(),
-                "last_updated": datetime.now(),
-            }
+            self._sessions[session_id] = self._new_session()
             return session_id
     
-    def add_spin(self, session_id: str, number: int) -> None:
-        """Adiciona um spin ao histórico da sessão"""
+    def add_spin(
+        self,
+        session_id: str,
+        number: int,
+        timestamp: Optional[float] = None
+    ) -> None:
+        """
+        Adiciona um spin ao histórico da sessão
+        
+        `timestamp` é o instante do spin (epoch, segundos); sem ele,
+        vale o horário de chegada.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        
         with self._lock:
             if session_id not in self._sessions:
-                self._sessions[session_id] = {
-                    "history": [],
-                    "created_at": datetime.now(),
-                    "last_updated": datetime.now(),
-                }
+                self._sessions[session_id] = self._new_session()
             
             session = self._sessions[session_id]
             session["history"].append(number)
+            session["timestamps"].append(timestamp)
+            session["trackers"].append(number, timestamp)
             session["last_updated"] = datetime.now()
             
             # Limitar tamanho do histórico
-            max_size = settings.MAX_HISTORY_PER_SESSION
-            if len(session["history"]) > max_size:
-                session["history"] = session["history"][-max_size:]
+            self._trim(session)
+    
+    def add_spins(
+        self,
+        session_id: str,
+        numbers: List[int],
+        timestamps: Optional[List[float]] = None
+    ) -> int:
+        """
+        Adiciona vários spins de uma vez (um único lock)
+        
+        Os números já devem estar validados. O histórico é cortado uma
+        só vez no final, em vez de a cada spin. Sem `timestamps` (um por
+        número), todos os spins recebem o horário de chegada.
+        
+        Returns:
+            Quantidade de spins adicionados
+        """
+        if not numbers:
+            return 0
+        if timestamps is None:
+            timestamps = [time.time()] * len(numbers)
+        elif len(timestamps) != len(numbers):
+            raise ValueError("timestamps deve ter um valor por número")
+        
+        with self._lock:
+            if session_id not in self._sessions:
+                self._sessions[session_id] = self._new_session()
+            
+            session = self._sessions[session_id]
+            session["history"].extend(numbers)
+            session["timestamps"].extend(timestamps)
+            session["trackers"].extend(numbers, timestamps)
+            session["last_updated"] = datetime.now()
+            
+            self._trim(session)
+            
+            return len(numbers)
+    
+    @staticmethod
+    def _trim(session: Dict) -> None:
+        """Corta o histórico em MAX_HISTORY_PER_SESSION (chamar com o lock)"""
+        max_size = settings.MAX_HISTORY_PER_SESSION
+        overflow = len(session["history"]) - max_size
+        if overflow > 0:
+            # Spins que saem da janela também saem dos rastreadores
+            session["trackers"].evict_prefix(session["history"], overflow)
+            session["history"] = session["history"][-max_size:]
+            del session["timestamps"][:overflow]
+            session["offset"] += overflow
     
     def get_history(
         self, 
@@ -73,11 +150,142 @@ class SessionManager:
             
             return history.copy()
     
+    def get_history_with_insights(
+        self,
+        session_id: str,
+        limit: Optional[int] = None
+    ) -> Tuple[List[int], Optional[Dict]]:
+        """
+        Histórico e seções incrementais do mesmo instante
+        
+        Sob o lock só são copiados o histórico e os contadores
+        (`snapshot`, ~0,1 ms); o resumo é montado fora dele.
+        
+        As seções não seguem `limit`: transições, sequências e gaps
+        cobrem a janela inteira da sessão (MAX_HISTORY_PER_SESSION),
+        hotness decai no tempo, viés cobre a mesa toda e distâncias usam
+        DISTANCE_WINDOWS. Retorna ([], None) para sessões inexistentes.
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return [], None
+            
+            history = session["history"]
+            history = history[-limit:] if limit else history.copy()
+            trackers = session["trackers"].snapshot()
+        
+        return history, trackers.summary()
+    
+    def set_alert_rules(self, session_id: str, rules: List[Dict]) -> Dict:
+        """
+        Troca as regras de alerta da sessão
+        
+        O estado das regras é reconstruído a partir da janela atual
+        (uma vez); depois disso, cada spin avalia as regras em O(regras).
+        
+        Raises:
+            ValueError: regra inválida (estado anterior mantido)
+        """
+        with self._lock:
+            if session_id not in self._sessions:
+                self._sessions[session_id] = self._new_session()
+            
+            session = self._sessions[session_id]
+            alerts = session["trackers"].alerts
+            alerts.configure(rules, session["history"])
+            return {"rules": alerts.config(), "alerts": alerts.summary()}
+    
+    def get_alerts(self, session_id: str) -> Optional[Dict]:
+        """Regras e alertas ativos da sessão (None se não existir)"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            
+            alerts = session["trackers"].alerts
+            return {"rules": alerts.config(), "alerts": alerts.summary()}
+    
+    def get_bias(self, session_id: str) -> Optional[Dict]:
+        """Estimativa de viés da roda da sessão (None se não existir)"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            
+            return session["trackers"].bias.summary()
+    
+    def get_history_page(
+        self,
+        session_id: str,
+        cursor: Optional[int] = None,
+        limit: int = 100
+    ) -> Dict:
+        """
+        Retorna uma página do histórico a partir de um cursor
+        
+        O cursor é a posição absoluta do spin na sessão (0 = primeiro
+        spin já registrado), então continua válido mesmo quando spins
+        antigos saem da janela. Cursores anteriores à janela atual
+        começam no spin mais antigo ainda disponível.
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return {"items": [], "timestamps": [], "cursor": 0, "next_cursor": None, "total": 0}
+            
+            history = session["history"]
+            offset = session["offset"]
+            end = offset + len(history)
+            
+            start = offset if cursor is None else min(max(cursor, offset), end)
+            stop = min(start + max(limit, 0), end)
+            items = history[start - offset:stop - offset]
+            timestamps = session["timestamps"][start - offset:stop - offset].tolist()
+            
+            return {
+                "items": items,
+                "timestamps": timestamps,
+                "cursor": start,
+                "next_cursor": stop if stop < end else None,
+                "total": len(history),
+            }
+    
+    def iter_history(
+        self,
+        session_id: str,
+        chunk_size: int = 500
+    ) -> Iterator[List[Tuple[int, int]]]:
+        """
+        Itera o histórico em blocos de (posição, número)
+        
+        O lock é adquirido por bloco e liberado entre eles, então uma
+        exportação longa não bloqueia add_spin. Cada bloco é copiado
+        isoladamente; o histórico completo nunca é materializado.
+        """
+        cursor: Optional[int] = None
+        while True:
+            page = self.get_history_page(session_id, cursor=cursor, limit=chunk_size)
+            items = page["items"]
+            if not items:
+                return
+            
+            start = page["cursor"]
+            yield [(start + i, n) for i, n in enumerate(items)]
+            
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return
+    
     def clear_session(self, session_id: str) -> None:
         """Limpa o histórico de uma sessão"""
         with self._lock:
             if session_id in self._sessions:
+                session = self._sessions[session_id]
+                session["offset"] += len(session["history"])
+                session["trackers"].reset()
                 self._sessions[session_id]["history"] = []
+                self._sessions[session_id]["timestamps"] = array("d")
                 self._sessions[session_id]["last_updated"] = datetime.now()
     
     def delete_session(self, session_id: str) -> None:
@@ -96,6 +304,14 @@ class SessionManager:
         with self._lock:
             return len(self._sessions)
     
+    def get_storage_stats(self) -> Dict[str, int]:
+        """Sessões ativas e total de spins armazenados"""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "spins": sum(len(s["history"]) for s in self._sessions.values()),
+            }
+    
     def cleanup_old_sessions(self, max_age_seconds: Optional[int] = None) -> int:
         """
         Remove sessões antigas
@@ -104,6 +320,7 @@ class SessionManager:
         if max_age_seconds is None:
             max_age_seconds = settings.SESSION_TIMEOUT
         
+        started = time.perf_counter()
         with self._lock:
             cutoff_time = datetime.now() - timedelta(seconds=max_age_seconds)
             
@@ -115,8 +332,9 @@ class SessionManager:
             
             for session_id in old_sessions:
                 del self._sessions[session_id]
-            
-            return len(old_sessions)
+        
+        metrics.observe_cleanup(time.perf_counter() - started, len(old_sessions))
+        return len(old_sessions)
     
     def get_session_info(self, session_id: str) -> Optional[Dict]:
         """Retorna informações sobre uma sessão"""
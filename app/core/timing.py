@@ -0,0 +1,237 @@
+# ======================================================
+# TIMING.PY - Tempo por seção e cabeçalho Server-Timing
+# ======================================================
+
+import bisect
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+
+# Limites dos buckets dos histogramas (ms)
+DEFAULT_BUCKETS_MS: Tuple[float, ...] = (
+    0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500
+)
+
+
+class _Section:
+    """Context manager de uma seção (sem gerador, para custo mínimo)"""
+
+    __slots__ = ("timer", "name", "started")
+
+    def __init__(self, timer: "SectionTimer", name: str):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        ended = time.perf_counter()
+        self.timer.record(self.name, ended - self.started, ended)
+        return False
+
+
+class SectionTimer:
+    """Acumula a duração de cada seção de uma requisição"""
+
+    __slots__ = ("sections", "started", "last_end")
+
+    enabled = True
+
+    def __init__(self):
+        self.sections: List[Tuple[str, float]] = []
+        self.started = time.perf_counter()
+        self.last_end: Optional[float] = None
+
+    def section(self, name: str) -> _Section:
+        return _Section(self, name)
+
+    def record(self, name: str, seconds: float, ended: Optional[float] = None) -> None:
+        self.sections.append((name, seconds))
+        self.last_end = ended if ended is not None else time.perf_counter()
+
+    def totals(self) -> Dict[str, float]:
+        """Segundos por seção (seções repetidas são somadas)"""
+        totals: Dict[str, float] = {}
+        for name, seconds in self.sections:
+            totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+
+class _NullSection:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class NullTimer:
+    """Timer desligado: `section` devolve sempre o mesmo no-op"""
+
+    __slots__ = ()
+
+    enabled = False
+    _section = _NullSection()
+
+    def section(self, name: str) -> _NullSection:
+        return self._section
+
+    def record(self, name: str, seconds: float, ended: Optional[float] = None) -> None:
+        pass
+
+
+NULL_TIMER = NullTimer()
+_current_timer: ContextVar = ContextVar("section_timer", default=NULL_TIMER)
+
+
+def current_timer():
+    """Timer da requisição atual (NULL_TIMER fora de requisições amostradas)"""
+    return _current_timer.get()
+
+
+# ======================================================
+# HISTOGRAMAS
+# ======================================================
+
+class TimingHistogram:
+    """Histograma cumulativo de durações (buckets fixos em ms)"""
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)  # último = +Inf
+        self.count = 0
+        self.sum_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.buckets_ms, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Quantil aproximado (limite superior do bucket)"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return self.buckets_ms[i] if i < len(self.buckets_ms) else float("inf")
+        return None
+
+    def snapshot(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum_ms, 3),
+            "mean_ms": round(self.sum_ms / self.count, 4) if self.count else None,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets_ms": list(self.buckets_ms),
+            "counts": list(self.counts),
+        }
+
+
+class TimingRegistry:
+    """Histogramas por seção, alimentados pelas requisições amostradas"""
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._histograms: Dict[str, TimingHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = TimingHistogram(self.buckets_ms)
+            histogram.observe(seconds)
+
+    def observe_many(self, totals: Dict[str, float]) -> None:
+        for name, seconds in totals.items():
+            self.observe(name, seconds)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {name: h.snapshot() for name, h in sorted(self._histograms.items())}
+
+
+timing_registry = TimingRegistry()
+
+
+# ======================================================
+# MIDDLEWARE
+# ======================================================
+
+def format_server_timing(totals: Dict[str, float]) -> str:
+    """`zones;dur=0.123, stats;dur=0.045` (durações em ms)"""
+    return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in totals.items())
+
+
+class ServerTimingMiddleware:
+    """
+    Middleware ASGI de tempo por seção
+
+    Em requisições amostradas (`sample_rate`), instala um SectionTimer
+    no contexto; o motor registra as seções nele. No início da resposta
+    acrescenta `serialization` (do fim da última seção até a resposta
+    ficar pronta: validação do modelo e JSON) e `total`, alimenta os
+    histogramas e, se `emit_header`, envia o cabeçalho Server-Timing.
+    Desligado, repassa a requisição sem custo extra.
+    """
+
+    def __init__(
+        self,
+        app: Callable,
+        enabled: Optional[bool] = None,
+        sample_rate: Optional[float] = None,
+        emit_header: Optional[bool] = None,
+        registry: Optional[TimingRegistry] = None
+    ):
+        self.app = app
+        self.enabled = enabled if enabled is not None else settings.TIMING_ENABLED
+        self.sample_rate = sample_rate if sample_rate is not None else settings.TIMING_SAMPLE_RATE
+        self.emit_header = emit_header if emit_header is not None else settings.SERVER_TIMING_HEADER
+        self.registry = registry or timing_registry
+
+    async def __call__(self, scope, receive, send):
+        if (
+            not self.enabled
+            or scope["type"] != "http"
+            or (self.sample_rate < 1.0 and random.random() >= self.sample_rate)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        timer = SectionTimer()
+        token = _current_timer.set(timer)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and timer.sections:
+                now = time.perf_counter()
+                if timer.last_end is not None:
+                    timer.record("serialization", now - timer.last_end, now)
+                totals = timer.totals()
+                totals["total"] = now - timer.started
+                self.registry.observe_many(totals)
+
+                if self.emit_header:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", format_server_timing(totals).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timer.reset(token)
@@ -9,6 +9,9 @@ from dataclasses import dataclass, asdict
 from typing import Dict, List, Optional, Tuple, Any
 from enum import Enum
 
+from app.core.config import settings
+from app.core.timing import current_timer
+
 
 # ======================================================
 # ENUMS PARA MELHOR TYPE SAFETY
@@ -189,6 +192,21 @@ def sector_membership(number: int) -> str:
     return Sector.UNKNOWN.value
 
 
+# ======================================================
+# TABELAS DE ATRIBUTOS POR NÚMERO (índice = número)
+# ======================================================
+# Usadas pelos rastreadores incrementais: um lookup por spin em vez
+# de recalcular os helpers acima.
+
+COLOR_OF: Tuple[str, ...] = tuple(color(n) for n in range(37))
+PARITY_OF: Tuple[Optional[str], ...] = tuple(parity(n) for n in range(37))
+DOZEN_OF: Tuple[Optional[int], ...] = tuple(dozen(n) for n in range(37))
+COLUMN_OF: Tuple[Optional[int], ...] = tuple(column(n) for n in range(37))
+HIGH_LOW_OF: Tuple[Optional[str], ...] = tuple(high_low(n) for n in range(37))
+TERMINAL_OF: Tuple[int, ...] = tuple(terminal(n) for n in range(37))
+SECTOR_OF: Tuple[str, ...] = tuple(sector_membership(n) for n in range(37))
+
+
 # ======================================================
 # VALIDAÇÃO DE ENTRADA
 # ======================================================
@@ -253,8 +271,28 @@ def _zone_status_from_hits(hits: int, max_hits: int, min_hits: int) -> Tuple[str
     return "Neutra", "Zona com comportamento estatisticamente equilibrado"
 
 
-def calculate_physical_zones(history: List[int]) -> List[Dict]:
-    """Calcula análise de zonas físicas (setores clássicos)"""
+def _zone_status_from_significance(p_high: float, p_low: float, alpha: float) -> Tuple[str, str]:
+    """Status pela distribuição nula (roleta justa) em vez de máximo/mínimo"""
+    if p_high < alpha:
+        return "🔥 Quente", f"Zona acima do esperado para uma roleta justa (p={p_high:.4f})"
+    if p_low < alpha:
+        return "❄️ Fria", f"Zona abaixo do esperado para uma roleta justa (p={p_low:.4f})"
+    return "Neutra", "Zona dentro da faixa esperada para uma roleta justa"
+
+
+def calculate_physical_zones(
+    history: List[int],
+    significance=None,
+    alpha: float = 0.05
+) -> List[Dict]:
+    """
+    Calcula análise de zonas físicas (setores clássicos)
+    
+    Com `significance` (SignificanceEngine), cada zona traz p-valores e
+    faixa esperada, e quente/fria passa a significar fora do esperado
+    (alpha com correção de Bonferroni entre as zonas). Sem ela, vale a
+    zona com mais/menos hits.
+    """
     total = len(history)
     if total == 0:
         return []
@@ -292,6 +330,20 @@ def calculate_physical_zones(history: List[int]) -> List[Dict]:
         zones.append(zone)
     
     # Determinar status
+    if significance is not None:
+        dist = significance.distribution(total, "zone_hits")
+        zone_alpha = alpha / len(zones)
+        for z in zones:
+            z["significance"] = dist.describe(z["key"], z["hits"])
+            status, explanation = _zone_status_from_significance(
+                z["significance"]["p_value_high"],
+                z["significance"]["p_value_low"],
+                zone_alpha
+            )
+            z["status"] = status
+            z["explanation"] = explanation
+        return zones
+    
     max_hits = max((z["hits"] for z in zones), default=0)
     min_hits = min((z["hits"] for z in zones), default=0)
     
@@ -357,8 +409,19 @@ def calculate_horses() -> List[Dict]:
 # TERMINAIS
 # ======================================================
 
-def calculate_terminals(history: List[int], max_spins: int = 50) -> Dict:
-    """Análise completa de terminais (último dígito)"""
+def calculate_terminals(
+    history: List[int],
+    max_spins: int = 50,
+    significance=None,
+    alpha: float = 0.05
+) -> Dict:
+    """
+    Análise completa de terminais (último dígito)
+    
+    Com `significance`, o status vem dos p-valores (Bonferroni entre
+    os 10 terminais) e cada terminal traz hits e ausência comparados
+    com uma roleta justa.
+    """
     last_spins = history[-max_spins:]
     total = len(last_spins)
     
@@ -411,6 +474,21 @@ def calculate_terminals(history: List[int], max_spins: int = 50) -> Dict:
         for t in range(10)
     ]
     
+    if significance is not None:
+        hits_dist = significance.distribution(total, "terminal_hits")
+        absence_dist = significance.distribution(total, "terminal_absence")
+        terminal_alpha = alpha / 10
+        for d in terminals_detail:
+            hits_sig = hits_dist.describe(d["terminal"], d["hits"])
+            absence_sig = absence_dist.describe(d["terminal"], d["absence"])
+            d["significance"] = {**hits_sig, "absence": absence_sig}
+            if hits_sig["p_value_high"] < terminal_alpha:
+                d["status"] = "🔥 Quente"
+            elif hits_sig["p_value_low"] < terminal_alpha:
+                d["status"] = "❄️ Frio"
+            else:
+                d["status"] = "Neutro"
+    
     # Top 3 quentes e frios
     top = sorted(terminals_detail, key=lambda x: x["hits"], reverse=True)[:3]
     cold = sorted(terminals_detail, key=lambda x: (x["hits"], -x["absence"]))[:3]
@@ -428,8 +506,13 @@ def calculate_terminals(history: List[int], max_spins: int = 50) -> Dict:
 # AUSÊNCIAS
 # ======================================================
 
-def calculate_absences(history: List[int], max_spins: int = 50) -> Dict:
-    """Calcula números, zonas, cavalos e terminais ausentes"""
+def calculate_absences(history: List[int], max_spins: int = 50, significance=None) -> Dict:
+    """
+    Calcula números, zonas, cavalos e terminais ausentes
+    
+    Com `significance`, compara a quantidade de números ausentes com a
+    esperada numa roleta justa.
+    """
     last_spins = history[-max_spins:]
     last_set = frozenset(last_spins)
     
@@ -451,12 +534,18 @@ def calculate_absences(history: List[int], max_spins: int = 50) -> Dict:
     t_counts: Counter = Counter(terminal(n) for n in last_spins)
     absent_terminals = [t for t in range(10) if t not in t_counts]
     
-    return {
+    absences = {
         "numbers": absent_numbers,
         "zones": absent_zones,
         "horses": absent_horses,
         "terminals": absent_terminals,
     }
+    
+    if significance is not None and last_spins:
+        dist = significance.distribution(len(last_spins), "absent_numbers")
+        absences["significance"] = dist.describe("count", len(absent_numbers))
+    
+    return absences
 
 
 # ======================================================
@@ -525,8 +614,18 @@ def analyze_premium_strategies(
 # ESTATÍSTICAS GERAIS
 # ======================================================
 
-def calculate_stats(history: List[int]) -> Dict[str, Any]:
-    """Calcula estatísticas gerais da sessão"""
+def calculate_stats(
+    history: List[int],
+    significance=None,
+    alpha: float = 0.05
+) -> Dict[str, Any]:
+    """
+    Calcula estatísticas gerais da sessão
+    
+    Com `significance`, informa se o número mais quente é incomum para
+    uma roleta justa e lista os números fora da faixa esperada
+    (Bonferroni entre os 37).
+    """
     if not history:
         return {}
     
@@ -542,7 +641,7 @@ def calculate_stats(history: List[int]) -> Dict[str, Any]:
     
     hottest_num, hottest_hits = c.most_common(1)[0] if c else (None, 0)
     
-    return {
+    stats = {
         "total_spins": total,
         "hottest_number": hottest_num,
         "hottest_hits": hottest_hits,
@@ -552,6 +651,29 @@ def calculate_stats(history: List[int]) -> Dict[str, Any]:
         "columns": dict(by_column),
         "high_low": dict(by_highlow),
     }
+    
+    if significance is not None:
+        stats["hottest_significance"] = significance.distribution(
+            total, "max_number_hits"
+        ).describe("max", hottest_hits)
+        
+        hits_dist = significance.distribution(total, "number_hits")
+        number_alpha = alpha / 37
+        unusual = []
+        for n in range(37):
+            hits = c.get(n, 0)
+            p_high = hits_dist.p_high("any", hits)
+            p_low = hits_dist.p_low("any", hits)
+            if p_high < number_alpha or p_low < number_alpha:
+                unusual.append({
+                    "number": n,
+                    "hits": hits,
+                    "direction": "hot" if p_high < number_alpha else "cold",
+                    "p_value": round(min(p_high, p_low), 6),
+                })
+        stats["unusual_numbers"] = unusual
+    
+    return stats
 
 
 # ======================================================
@@ -561,7 +683,8 @@ def calculate_stats(history: List[int]) -> Dict[str, Any]:
 def analyze_data(
     data: List[int],
     history_limit: int = 50,
-    user_strategies: Optional[List[Dict]] = None
+    user_strategies: Optional[List[Dict]] = None,
+    insights: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """
     Motor principal de análise
@@ -570,10 +693,16 @@ def analyze_data(
         data: Lista de números sorteados
         history_limit: Limite de histórico a considerar
         user_strategies: Estratégias customizadas do usuário
+        insights: Seções incrementais já prontas da sessão
+            (SessionManager.get_history_with_insights); sem elas, são
+            calculadas a partir de `history`
     
     Returns:
         Dicionário com análise completa
     """
+    # Timer da requisição (no-op quando a instrumentação está desligada)
+    timer = current_timer()
+    
     # Validação
     if not data:
         return {
@@ -582,7 +711,8 @@ def analyze_data(
             "errors": []
         }
     
-    valid, errors = validate_numbers(data)
+    with timer.section("validation"):
+        valid, errors = validate_numbers(data)
     
     if not valid:
         return {
@@ -594,12 +724,50 @@ def analyze_data(
     # Limitar histórico
     history = valid[-history_limit:]
     
+    # Distribuições nulas (Monte Carlo, em cache por tamanho de janela);
+    # janelas acima de MAX_HISTORY_LIMIT ficam sem significância
+    significance = None
+    alpha = settings.SIGNIFICANCE_ALPHA
+    if settings.SIGNIFICANCE_ENABLED:
+        from app.engines.significance import significance_engine
+        if significance_engine.covers(len(history)):
+            significance = significance_engine
+    
     # Construir objetos de giro
-    spins = [build_spin_object(n) for n in history]
-    last_spin = spins[-1] if spins else None
+    with timer.section("spins"):
+        spins = [build_spin_object(n) for n in history]
+        spins_dicts = [s.to_dict() for s in spins]
+        last_spin = spins_dicts[-1] if spins_dicts else None
+        
+        # Contagem de números
+        count: Counter = Counter(history)
+    
+    # Análises específicas
+    with timer.section("zones"):
+        physical_zones = calculate_physical_zones(history, significance, alpha)
+        horses = calculate_horses()
+    
+    with timer.section("neighbors"):
+        neighbors = calculate_neighbors(history, radius=3)
+    
+    with timer.section("absences"):
+        absences = calculate_absences(history, max_spins=history_limit, significance=significance)
+    
+    with timer.section("terminals"):
+        terminals = calculate_terminals(
+            history, max_spins=history_limit, significance=significance, alpha=alpha
+        )
+    
+    with timer.section("stats"):
+        stats = calculate_stats(history, significance, alpha)
+    
+    with timer.section("strategies"):
+        strategies = analyze_premium_strategies(history, user_strategies)
     
-    # Contagem de números
-    count: Counter = Counter(history)
+    # Seções incrementais (transições etc.)
+    if insights is None:
+        from app.engines.trackers import build_insights
+        insights = build_insights(history)
     
     # Análise completa
     analysis = {
@@ -608,20 +776,21 @@ def analyze_data(
         "history": history,
         
         # Dados detalhados dos giros
-        "spins": [s.to_dict() for s in spins],
-        "last_spin": last_spin.to_dict() if last_spin else None,
+        "spins": spins_dicts,
+        "last_spin": last_spin,
         
         # Análises específicas
-        "physical_zones": calculate_physical_zones(history),
-        "neighbors": calculate_neighbors(history, radius=3),
-        "horses": calculate_horses(),
-        "absences": calculate_absences(history, max_spins=history_limit),
-        "terminals": calculate_terminals(history, max_spins=history_limit),
-        "stats": calculate_stats(history),
+        "physical_zones": physical_zones,
+        "neighbors": neighbors,
+        "horses": horses,
+        "absences": absences,
+        "terminals": terminals,
+        "stats": stats,
+        **insights,
         
         # Estratégias e alertas
-        "strategies": analyze_premium_strategies(history, user_strategies),
-        "alerts": [],
+        "strategies": strategies,
+        "alerts": insights.get("alerts", []),
         
         # Metadados
         "errors": errors if errors else [],
@@ -0,0 +1,330 @@
+# ======================================================
+# ALERTS.PY - Regras de alerta avaliadas spin a spin
+# ======================================================
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from app.engines.ai_engine import (
+    COLOR_OF,
+    NEIGHBORS_1,
+    SECTOR_OF,
+    TERMINAL_OF,
+    Color,
+    Sector,
+)
+
+
+SECTOR_KEYS = (Sector.VOISINS.value, Sector.TIERS.value, Sector.ORPHELINS.value)
+_SECTOR_INDEX = tuple(SECTOR_KEYS.index(s) for s in SECTOR_OF)
+
+SECTOR_NAMES = {
+    Sector.VOISINS.value: "Voisins du Zero",
+    Sector.TIERS.value: "Tiers du Cylindre",
+    Sector.ORPHELINS.value: "Orphelins",
+}
+COLOR_NAMES = {
+    Color.RED.value: "Vermelho",
+    Color.BLACK.value: "Preto",
+    Color.GREEN.value: "Verde",
+}
+
+RULE_TYPES = ("sector_absent", "terminal_repeat", "color_streak", "strategy_miss_streak")
+
+
+class AlertCounters:
+    """
+    Contadores compartilhados pelas regras
+
+    Atualizados uma vez por spin; as regras só leem estes valores.
+    """
+
+    __slots__ = ("spins", "sector_last", "terminal", "terminal_run", "color", "color_run")
+
+    def __init__(self):
+        self.spins = 0
+        # Posição (1-based) da última aparição de cada setor; 0 = nunca
+        self.sector_last = array("I", bytes(4 * len(SECTOR_KEYS)))
+        self.terminal: Optional[int] = None
+        self.terminal_run = 0
+        self.color: Optional[str] = None
+        self.color_run = 0
+
+    def update(self, number: int) -> None:
+        self.spins += 1
+        self.sector_last[_SECTOR_INDEX[number]] = self.spins
+
+        t = TERMINAL_OF[number]
+        self.terminal_run = self.terminal_run + 1 if t == self.terminal else 1
+        self.terminal = t
+
+        c = COLOR_OF[number]
+        self.color_run = self.color_run + 1 if c == self.color else 1
+        self.color = c
+
+
+# ======================================================
+# REGRAS
+# ======================================================
+
+class AlertRule:
+    """Regra compilada: `update` mantém estado próprio, `evaluate` é O(1)"""
+
+    type = ""
+
+    def __init__(self, rule_id: str, threshold: int, severity: str = "warning"):
+        self.id = rule_id
+        self.threshold = threshold
+        self.severity = severity
+
+    def update(self, number: int) -> None:
+        pass
+
+    def reset(self) -> None:
+        pass
+
+    def evaluate(self, counters: AlertCounters) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def config(self) -> Dict:
+        return {"id": self.id, "type": self.type, "threshold": self.threshold, "severity": self.severity}
+
+    def _alert(self, value: int, message: str, **extra) -> Dict:
+        return {
+            "rule": self.id,
+            "type": self.type,
+            "severity": self.severity,
+            "message": message,
+            "value": value,
+            "threshold": self.threshold,
+            **extra,
+        }
+
+
+class SectorAbsentRule(AlertRule):
+    """Setor (ou qualquer setor) sem sair há `threshold` spins"""
+
+    type = "sector_absent"
+
+    def __init__(self, rule_id: str, threshold: int, severity: str = "warning", sector: Optional[str] = None):
+        super().__init__(rule_id, threshold, severity)
+        if sector is not None and sector not in SECTOR_KEYS:
+            raise ValueError(f"Setor inválido: {sector}")
+        self.sector = sector
+        self._indexes = (SECTOR_KEYS.index(sector),) if sector else tuple(range(len(SECTOR_KEYS)))
+
+    def evaluate(self, counters: AlertCounters) -> Optional[Dict]:
+        worst = None
+        for i in self._indexes:
+            absent = counters.spins - counters.sector_last[i]
+            if absent >= self.threshold and (worst is None or absent > worst[1]):
+                worst = (i, absent)
+        if worst is None:
+            return None
+
+        key = SECTOR_KEYS[worst[0]]
+        return self._alert(
+            worst[1],
+            f"{SECTOR_NAMES[key]} ausente há {worst[1]} spins",
+            sector=key,
+        )
+
+    def config(self) -> Dict:
+        return {**super().config(), "sector": self.sector}
+
+
+class TerminalRepeatRule(AlertRule):
+    """Mesmo terminal `threshold` vezes seguidas"""
+
+    type = "terminal_repeat"
+
+    def evaluate(self, counters: AlertCounters) -> Optional[Dict]:
+        if counters.terminal_run < self.threshold:
+            return None
+        return self._alert(
+            counters.terminal_run,
+            f"Terminal {counters.terminal} saiu {counters.terminal_run} vezes seguidas",
+            terminal=counters.terminal,
+        )
+
+
+class ColorStreakRule(AlertRule):
+    """Sequência de uma cor (ou de vermelho/preto) com `threshold` spins"""
+
+    type = "color_streak"
+
+    def __init__(self, rule_id: str, threshold: int, severity: str = "warning", color: Optional[str] = None):
+        super().__init__(rule_id, threshold, severity)
+        if color is not None and color not in COLOR_NAMES:
+            raise ValueError(f"Cor inválida: {color}")
+        self.color = color
+
+    def evaluate(self, counters: AlertCounters) -> Optional[Dict]:
+        current = counters.color
+        if counters.color_run < self.threshold:
+            return None
+        if self.color is None and current == Color.GREEN.value:
+            return None
+        if self.color is not None and current != self.color:
+            return None
+        return self._alert(
+            counters.color_run,
+            f"{COLOR_NAMES[current]} saiu {counters.color_run} vezes seguidas",
+            color=current,
+        )
+
+    def config(self) -> Dict:
+        return {**super().config(), "color": self.color}
+
+
+class StrategyMissStreakRule(AlertRule):
+    """
+    Estratégia sem acerto há `threshold` spins
+
+    Acerto = gatilho ou vizinho imediato, como em analyze_premium_strategies.
+    """
+
+    type = "strategy_miss_streak"
+
+    def __init__(
+        self,
+        rule_id: str,
+        threshold: int,
+        severity: str = "warning",
+        triggers: Sequence[int] = (),
+        name: Optional[str] = None
+    ):
+        super().__init__(rule_id, threshold, severity)
+        self.triggers = sorted({t for t in triggers if 0 <= t <= 36})
+        if not self.triggers:
+            raise ValueError("Estratégia sem números gatilho")
+        self.name = name or "Estratégia"
+        hits = set(self.triggers)
+        for t in self.triggers:
+            hits.update(NEIGHBORS_1[t])
+        self._hits = frozenset(hits)
+        self.misses = 0
+
+    def update(self, number: int) -> None:
+        self.misses = 0 if number in self._hits else self.misses + 1
+
+    def reset(self) -> None:
+        self.misses = 0
+
+    def evaluate(self, counters: AlertCounters) -> Optional[Dict]:
+        if self.misses < self.threshold:
+            return None
+        return self._alert(
+            self.misses,
+            f"{self.name}: {self.misses} spins sem acerto",
+            strategy=self.name,
+        )
+
+    def config(self) -> Dict:
+        return {**super().config(), "name": self.name, "triggers": self.triggers}
+
+
+_RULE_CLASSES = {
+    cls.type: cls
+    for cls in (SectorAbsentRule, TerminalRepeatRule, ColorStreakRule, StrategyMissStreakRule)
+}
+
+
+def compile_rule(config: Dict, index: int = 0) -> AlertRule:
+    """
+    Cria a regra a partir da configuração (dict do schema AlertRule)
+
+    Raises:
+        ValueError: tipo desconhecido ou parâmetros inválidos
+    """
+    rule_type = config.get("type")
+    cls = _RULE_CLASSES.get(rule_type)
+    if cls is None:
+        raise ValueError(f"Tipo de alerta desconhecido: {rule_type}")
+
+    threshold = int(config.get("threshold", 0))
+    if threshold < 1:
+        raise ValueError("threshold deve ser >= 1")
+
+    kwargs = {
+        "rule_id": config.get("id") or f"{rule_type}:{index}",
+        "threshold": threshold,
+        "severity": config.get("severity") or "warning",
+    }
+    if cls is SectorAbsentRule:
+        kwargs["sector"] = config.get("sector")
+    elif cls is ColorStreakRule:
+        kwargs["color"] = config.get("color")
+    elif cls is StrategyMissStreakRule:
+        kwargs["triggers"] = config.get("triggers") or ()
+        kwargs["name"] = config.get("name")
+    return cls(**kwargs)
+
+
+# ======================================================
+# MOTOR
+# ======================================================
+
+class AlertEngine:
+    """
+    Alertas de uma sessão
+
+    Regras compiladas uma vez (`configure`); a cada spin os contadores
+    são atualizados e cada regra é avaliada em O(1), então `append` é
+    O(regras) e os alertas ativos ficam prontos para a próxima leitura.
+    """
+
+    __slots__ = ("rules", "counters", "active")
+
+    def __init__(self, rules: Optional[Iterable[Dict]] = None):
+        self.rules: List[AlertRule] = [compile_rule(r, i) for i, r in enumerate(rules or ())]
+        self.counters = AlertCounters()
+        self.active: List[Dict] = []
+
+    def append(self, number: int) -> None:
+        counters = self.counters
+        counters.update(number)
+        active = []
+        for rule in self.rules:
+            rule.update(number)
+            alert = rule.evaluate(counters)
+            if alert is not None:
+                active.append(alert)
+        self.active = active
+
+    def reset(self) -> None:
+        self.counters = AlertCounters()
+        for rule in self.rules:
+            rule.reset()
+        self.active = []
+
+    def snapshot(self) -> "AlertEngine":
+        """
+        Cópia para `summary` fora do lock da sessão
+
+        Só os alertas ativos são lidos (a lista é trocada, nunca
+        alterada, a cada spin); regras e contadores não são copiados.
+        """
+        copy = AlertEngine.__new__(AlertEngine)
+        copy.rules, copy.counters = self.rules, self.counters
+        copy.active = self.active
+        return copy
+
+    def configure(self, rules: Iterable[Dict], history: Sequence[int] = ()) -> None:
+        """
+        Troca as regras e reconstrói o estado a partir de `history`
+
+        Único ponto que percorre o histórico (uma vez, na configuração).
+        Regras inválidas levantam ValueError sem alterar o estado atual.
+        """
+        compiled = [compile_rule(r, i) for i, r in enumerate(rules)]
+        self.rules = compiled
+        self.reset()
+        for number in history:
+            self.append(number)
+
+    def config(self) -> List[Dict]:
+        return [rule.config() for rule in self.rules]
+
+    def summary(self) -> List[Dict]:
+        return list(self.active)
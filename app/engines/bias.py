@@ -0,0 +1,258 @@
+# ======================================================
+# BIAS.PY - Estimador de viés da roda em streaming
+# ======================================================
+
+import math
+from statistics import NormalDist
+from typing import Dict, List, Sequence, Tuple
+
+from app.engines.ai_engine import SECTOR_OF, Sector
+
+
+SECTOR_KEYS = (Sector.VOISINS.value, Sector.TIERS.value, Sector.ORPHELINS.value)
+_SECTOR_INDEX = tuple(SECTOR_KEYS.index(s) for s in SECTOR_OF)
+_SECTOR_P0 = tuple(SECTOR_OF.count(s) / 37 for s in SECTOR_KEYS)
+_NUMBER_P0 = (1 / 37,) * 37
+
+
+# ======================================================
+# TESTES DE ADERÊNCIA (sem SciPy)
+# ======================================================
+
+def _gamma_q(a: float, x: float) -> float:
+    """Gama incompleta superior regularizada Q(a, x)"""
+    if x <= 0:
+        return 1.0
+    log_front = -x + a * math.log(x) - math.lgamma(a)
+
+    if x < a + 1:
+        # Série para P(a, x)
+        term = total = 1.0 / a
+        ap = a
+        for _ in range(500):
+            ap += 1
+            term *= x / ap
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_front))
+
+    # Fração contínua (Lentz) para Q(a, x)
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 500):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return min(1.0, math.exp(log_front) * h)
+
+
+def chi2_sf(statistic: float, df: int) -> float:
+    """P(χ²(df) ≥ statistic)"""
+    return _gamma_q(df / 2, statistic / 2)
+
+
+def goodness_of_fit(counts: Sequence[int], probs: Sequence[float]) -> Dict:
+    """Qui-quadrado de Pearson e teste G contra as proporções `probs`"""
+    total = sum(counts)
+    df = len(counts) - 1
+    if not total:
+        return {"df": df, "chi_square": 0.0, "p_value_chi_square": 1.0, "g_test": 0.0, "p_value_g": 1.0}
+
+    chi_square = 0.0
+    g = 0.0
+    for observed, p in zip(counts, probs):
+        expected = total * p
+        chi_square += (observed - expected) ** 2 / expected
+        if observed:
+            g += observed * math.log(observed / expected)
+    g *= 2
+    return {
+        "df": df,
+        "chi_square": round(chi_square, 3),
+        # 4 algarismos significativos: p-valores minúsculos continuam legíveis
+        "p_value_chi_square": float(f"{chi2_sf(chi_square, df):.4g}"),
+        "g_test": round(g, 3),
+        "p_value_g": float(f"{chi2_sf(g, df):.4g}"),
+    }
+
+
+# ======================================================
+# CUSUM PREGUIÇOSO
+# ======================================================
+
+class LazyCusum:
+    """
+    CUSUM de Page (aumento de frequência) para cada categoria
+
+    Para a categoria i, o log da razão de verossimilhança soma w1 quando
+    ela sai e w0 (< 0) quando não sai. O CUSUM é W(t) − min W(s), com W
+    o acumulado. Entre duas aparições W só desce, então o mínimo só
+    precisa ser atualizado quando a categoria sai: O(1) por spin, em vez
+    de mexer nas 37 categorias.
+    """
+
+    __slots__ = ("w_hit", "w_miss", "hits", "low", "low_at")
+
+    def __init__(self, p0: Sequence[float], shift: float):
+        self.w_hit: List[float] = []
+        self.w_miss: List[float] = []
+        for p in p0:
+            p1 = min(p * (1 + shift), 0.999)
+            self.w_hit.append(math.log(p1 / p))
+            self.w_miss.append(math.log((1 - p1) / (1 - p)))
+        self.reset()
+
+    def reset(self) -> None:
+        size = len(self.w_hit)
+        self.hits = [0] * size
+        self.low = [0.0] * size  # min W (W(0) = 0)
+        self.low_at = [0] * size  # spin em que o mínimo ocorreu
+
+    def snapshot(self) -> "LazyCusum":
+        copy = LazyCusum.__new__(LazyCusum)
+        copy.w_hit, copy.w_miss = self.w_hit, self.w_miss
+        copy.hits, copy.low, copy.low_at = self.hits[:], self.low[:], self.low_at[:]
+        return copy
+
+    def _walk(self, i: int, spins: int) -> float:
+        hits = self.hits[i]
+        return hits * self.w_hit[i] + (spins - hits) * self.w_miss[i]
+
+    def append(self, i: int, spins: int) -> None:
+        """A categoria `i` saiu no spin seguinte a `spins` spins já vistos"""
+        before = self._walk(i, spins)
+        if before < self.low[i]:
+            self.low[i] = before
+            self.low_at[i] = spins
+        self.hits[i] += 1
+
+    def state(self, i: int, spins: int) -> Tuple[float, int]:
+        """(CUSUM atual, spin estimado do início da mudança)"""
+        walk = self._walk(i, spins)
+        if walk <= self.low[i]:
+            return 0.0, spins
+        return walk - self.low[i], self.low_at[i]
+
+
+# ======================================================
+# ESTIMADOR
+# ======================================================
+
+class BiasEstimator:
+    """
+    Viés da roda sobre todo o histórico da mesa (sessão)
+
+    Guarda só contadores (37 números + 3 setores) e o estado do CUSUM:
+    memória constante e O(1) por spin, sem depender do histórico
+    armazenado nem da janela MAX_HISTORY_PER_SESSION.
+
+    - Aderência: qui-quadrado e teste G contra a roda justa
+    - Posterior Dirichlet(prior + contagens): média e intervalo de
+      credibilidade de cada proporção (aproximação normal da marginal
+      Beta, adequada para as dezenas de milhares de spins do uso real)
+    - CUSUM: detecta quando um número/setor passou a sair mais
+    """
+
+    __slots__ = ("prior", "level", "threshold", "spins", "numbers", "sectors",
+                 "number_cusum", "sector_cusum")
+
+    def __init__(
+        self,
+        prior: float = 1.0,
+        level: float = 0.95,
+        number_shift: float = 0.5,
+        sector_shift: float = 0.1,
+        threshold: float = 12.0
+    ):
+        self.prior = prior
+        self.level = level
+        self.threshold = threshold
+        self.number_cusum = LazyCusum(_NUMBER_P0, number_shift)
+        self.sector_cusum = LazyCusum(_SECTOR_P0, sector_shift)
+        self.reset()
+
+    def reset(self) -> None:
+        self.spins = 0
+        self.numbers = [0] * 37
+        self.sectors = [0] * len(SECTOR_KEYS)
+        self.number_cusum.reset()
+        self.sector_cusum.reset()
+
+    def snapshot(self) -> "BiasEstimator":
+        """Cópia dos contadores (leitura fora do lock da sessão)"""
+        copy = BiasEstimator.__new__(BiasEstimator)
+        copy.prior, copy.level, copy.threshold = self.prior, self.level, self.threshold
+        copy.spins = self.spins
+        copy.numbers, copy.sectors = self.numbers[:], self.sectors[:]
+        copy.number_cusum = self.number_cusum.snapshot()
+        copy.sector_cusum = self.sector_cusum.snapshot()
+        return copy
+
+    def append(self, number: int) -> None:
+        sector = _SECTOR_INDEX[number]
+        self.number_cusum.append(number, self.spins)
+        self.sector_cusum.append(sector, self.spins)
+        self.numbers[number] += 1
+        self.sectors[sector] += 1
+        self.spins += 1
+
+    def _entries(
+        self,
+        field: str,
+        keys: Sequence,
+        counts: Sequence[int],
+        p0: Sequence[float],
+        cusum: LazyCusum
+    ) -> List[Dict]:
+        z = NormalDist().inv_cdf(0.5 + self.level / 2)
+        alpha_total = self.prior * len(counts) + self.spins
+        entries = []
+        for i, (key, hits, p) in enumerate(zip(keys, counts, p0)):
+            # Marginal Beta(a, b) da posterior Dirichlet
+            a = self.prior + hits
+            mean = a / alpha_total
+            sd = math.sqrt(mean * (1 - mean) / (alpha_total + 1))
+            score, change_at = cusum.state(i, self.spins)
+            entries.append({
+                field: key,
+                "hits": hits,
+                "expected": round(self.spins * p, 2),
+                "fair": round(p, 5),
+                "posterior_mean": round(mean, 5),
+                "interval": [round(max(0.0, mean - z * sd), 5), round(min(1.0, mean + z * sd), 5)],
+                # P(proporção > roda justa) segundo a posterior
+                "p_above_fair": round(1 - NormalDist(mean, sd).cdf(p), 4),
+                "cusum": round(score, 3),
+                "alarm": score >= self.threshold,
+                "change_at": change_at if score >= self.threshold else None,
+            })
+        return entries
+
+    def summary(self) -> Dict:
+        numbers = self._entries("number", range(37), self.numbers, _NUMBER_P0, self.number_cusum)
+        sectors = self._entries("sector", SECTOR_KEYS, self.sectors, _SECTOR_P0, self.sector_cusum)
+        return {
+            "spins": self.spins,
+            "prior": self.prior,
+            "credible_level": self.level,
+            "cusum_threshold": self.threshold,
+            "numbers": {**goodness_of_fit(self.numbers, _NUMBER_P0), "entries": numbers},
+            "sectors": {**goodness_of_fit(self.sectors, _SECTOR_P0), "entries": sectors},
+            "alarms": [
+                {key: e[key], "cusum": e["cusum"], "change_at": e["change_at"]}
+                for key, entries in (("number", numbers), ("sector", sectors))
+                for e in entries if e["alarm"]
+            ],
+        }
@@ -0,0 +1,132 @@
+# ======================================================
+# DISTANCE.PY - Distância na roda entre spins consecutivos
+# ======================================================
+
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+from app.engines.ai_engine import ROULETTE_WHEEL, WHEEL_INDEX, WHEEL_LEN
+
+
+HALF_WHEEL = WHEEL_LEN // 2  # 18: distâncias vão de -18 a 18
+OFFSETS = tuple(range(-HALF_WHEEL, HALF_WHEEL + 1))
+
+
+def wheel_distance(previous: int, number: int) -> int:
+    """Casas (com sinal, sentido horário positivo) de `previous` até `number`"""
+    d = (WHEEL_INDEX[number] - WHEEL_INDEX[previous]) % WHEEL_LEN
+    return d - WHEEL_LEN if d > HALF_WHEEL else d
+
+
+class DistanceTracker:
+    """
+    Histogramas de distância na roda (assinatura do dealer)
+
+    Cada spin gera a distância até o anterior, guardada num buffer
+    circular de 1 byte do tamanho da maior janela. Cada janela mantém o
+    seu histograma: a distância nova entra e a que saiu da janela sai,
+    O(janelas) por spin. Todas as janelas são consultadas de uma vez,
+    sem recalcular a partir do histórico.
+    """
+
+    __slots__ = ("windows", "buffer", "histograms", "distances", "last_number")
+
+    def __init__(self, windows: Sequence[int]):
+        self.windows = tuple(sorted(set(windows)))
+        self.buffer = array("b", bytes(self.windows[-1]))
+        self.reset()
+
+    def reset(self) -> None:
+        self.histograms = [array("I", bytes(4 * WHEEL_LEN)) for _ in self.windows]
+        self.distances = 0  # distâncias já registradas (spins − 1)
+        self.last_number: Optional[int] = None
+
+    def snapshot(self) -> "DistanceTracker":
+        """Cópia dos histogramas (leitura fora do lock da sessão)"""
+        copy = DistanceTracker.__new__(DistanceTracker)
+        copy.windows = self.windows
+        copy.buffer = self.buffer[:]
+        copy.histograms = [histogram[:] for histogram in self.histograms]
+        copy.distances, copy.last_number = self.distances, self.last_number
+        return copy
+
+    def append(self, number: int) -> None:
+        previous, self.last_number = self.last_number, number
+        if previous is None:
+            return
+
+        distance = wheel_distance(previous, number)
+        buffer, count = self.buffer, self.distances
+        capacity = len(buffer)
+        for window, histogram in zip(self.windows, self.histograms):
+            if count >= window:
+                # A distância mais antiga da janela sai (lida antes de sobrescrever)
+                histogram[buffer[(count - window) % capacity] + HALF_WHEEL] -= 1
+            histogram[distance + HALF_WHEEL] += 1
+        buffer[count % capacity] = distance
+        self.distances = count + 1
+
+    def _describe(self, window: int, histogram: array, top_k: int, radius: int) -> Dict:
+        observed = min(self.distances, window)
+        result = {
+            "window": window,
+            "observed": observed,
+            "histogram": {str(o): histogram[o + HALF_WHEEL] for o in OFFSETS},
+        }
+        if not observed:
+            return {**result, "mean_abs_distance": None, "top_offsets": [], "predicted_zone": None}
+
+        # Só distâncias que ocorreram (janela curta: menos de top_k)
+        top = sorted(
+            (o for o in OFFSETS if histogram[o + HALF_WHEEL]),
+            key=lambda o: (-histogram[o + HALF_WHEEL], abs(o))
+        )[:top_k]
+
+        # Arco de 2·radius+1 casas com mais ocorrências (a roda é circular)
+        width = 2 * radius + 1
+
+        def arc(center: int) -> int:
+            return sum(
+                histogram[(center + k + HALF_WHEEL) % WHEEL_LEN]
+                for k in range(-radius, radius + 1)
+            )
+
+        center = max(OFFSETS, key=lambda o: (arc(o), -abs(o)))
+        zone_offsets = [
+            (center + k + HALF_WHEEL) % WHEEL_LEN - HALF_WHEEL
+            for k in range(-radius, radius + 1)
+        ]
+        base = WHEEL_INDEX[self.last_number]
+
+        return {
+            **result,
+            "mean_abs_distance": round(
+                sum(abs(o) * histogram[o + HALF_WHEEL] for o in OFFSETS) / observed, 2
+            ),
+            "top_offsets": [
+                {
+                    "offset": o,
+                    "count": histogram[o + HALF_WHEEL],
+                    "share": round(histogram[o + HALF_WHEEL] / observed, 4),
+                }
+                for o in top
+            ],
+            # Zona prevista para o próximo spin, a partir do último número
+            "predicted_zone": {
+                "center_offset": center,
+                "offsets": zone_offsets,
+                "numbers": [ROULETTE_WHEEL[(base + o) % WHEEL_LEN] for o in zone_offsets],
+                "hit_rate": round(arc(center) / observed, 4),
+                "expected_rate": round(width / WHEEL_LEN, 4),
+            },
+        }
+
+    def summary(self, top_k: int = 5, radius: int = 2) -> Dict:
+        return {
+            "last_number": self.last_number,
+            "radius": radius,
+            "windows": [
+                self._describe(window, histogram, top_k, radius)
+                for window, histogram in zip(self.windows, self.histograms)
+            ],
+        }
@@ -0,0 +1,181 @@
+# ======================================================
+# GAPS.PY - Índice de intervalos (gaps) por número
+# ======================================================
+
+import bisect
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.engines.ai_engine import SECTOR_OF, TERMINAL_OF, Sector
+
+
+SECTOR_KEYS = (Sector.VOISINS.value, Sector.TIERS.value, Sector.ORPHELINS.value)
+_SECTOR_INDEX = tuple(SECTOR_KEYS.index(s) for s in SECTOR_OF)
+
+# Gap esperado numa roleta justa: 37 / números da categoria
+_EXPECTED_NUMBER_GAP = 37.0
+_EXPECTED_TERMINAL_GAP = tuple(round(37 / TERMINAL_OF.count(t), 2) for t in range(10))
+_EXPECTED_SECTOR_GAP = tuple(round(37 / SECTOR_OF.count(s), 2) for s in SECTOR_KEYS)
+
+# Limites inferiores dos buckets do histograma de gaps (em spins)
+GAP_BUCKETS: Tuple[int, ...] = (1, 2, 3, 5, 10, 20, 37, 55, 74, 111, 148)
+GAP_BUCKET_LABELS: Tuple[str, ...] = tuple(
+    str(low) if high - low == 1 else f"{low}-{high - 1}"
+    for low, high in zip(GAP_BUCKETS, GAP_BUCKETS[1:])
+) + (f"{GAP_BUCKETS[-1]}+",)
+
+_COMPACT_MIN = 1024  # posições descartadas antes de compactar o array
+
+
+class PositionIndex:
+    """
+    Posições (absolutas) em que uma categoria saiu dentro da janela
+
+    Array de inteiros de 4 bytes com início móvel: sair da janela só
+    avança `head` (o array é compactado de vez em quando, O(1)
+    amortizado). Soma, contagem, máximo e histograma dos gaps entre
+    aparições consecutivas são mantidos a cada spin.
+    """
+
+    __slots__ = ("positions", "head", "gap_sum", "gap_counts", "max_gap", "buckets")
+
+    def __init__(self):
+        self.positions = array("I")
+        self.head = 0
+        self.gap_sum = 0
+        self.gap_counts: Dict[int, int] = {}
+        self.max_gap = 0
+        self.buckets = array("I", bytes(4 * len(GAP_BUCKETS)))
+
+    def __len__(self) -> int:
+        return len(self.positions) - self.head
+
+    def _add_gap(self, gap: int) -> None:
+        self.gap_sum += gap
+        self.gap_counts[gap] = self.gap_counts.get(gap, 0) + 1
+        self.buckets[bisect.bisect_right(GAP_BUCKETS, gap) - 1] += 1
+        if gap > self.max_gap:
+            self.max_gap = gap
+
+    def _remove_gap(self, gap: int) -> None:
+        self.gap_sum -= gap
+        remaining = self.gap_counts[gap] - 1
+        if remaining:
+            self.gap_counts[gap] = remaining
+        else:
+            del self.gap_counts[gap]
+            if gap == self.max_gap:
+                # Só recalcula quando o maior gap sai da janela
+                self.max_gap = max(self.gap_counts, default=0)
+        self.buckets[bisect.bisect_right(GAP_BUCKETS, gap) - 1] -= 1
+
+    def append(self, position: int) -> None:
+        if len(self):
+            self._add_gap(position - self.positions[-1])
+        self.positions.append(position)
+
+    def evict(self) -> None:
+        """Remove a aparição mais antiga (o spin que saiu da janela)"""
+        head = self.head
+        if head + 1 < len(self.positions):
+            self._remove_gap(self.positions[head + 1] - self.positions[head])
+        self.head = head + 1
+
+        if self.head >= _COMPACT_MIN and self.head * 2 >= len(self.positions):
+            del self.positions[:self.head]
+            self.head = 0
+
+    def last(self) -> Optional[int]:
+        return self.positions[-1] if len(self) else None
+
+    def snapshot(self) -> "PositionIndex":
+        """Cópia das aparições na janela (leitura fora do lock da sessão)"""
+        copy = PositionIndex.__new__(PositionIndex)
+        copy.positions = self.positions[self.head:]
+        copy.head = 0
+        copy.gap_sum = self.gap_sum
+        copy.gap_counts = dict(self.gap_counts)
+        copy.max_gap = self.max_gap
+        copy.buckets = self.buckets[:]
+        return copy
+
+    def describe(self, next_position: int, window: int) -> Dict:
+        hits = len(self)
+        gaps = hits - 1 if hits else 0
+        last = self.last()
+        return {
+            "hits": hits,
+            # Spins desde a última aparição (janela inteira se não saiu)
+            "absence": (next_position - 1 - last) if last is not None else window,
+            "mean_gap": round(self.gap_sum / gaps, 2) if gaps else None,
+            "max_gap": self.max_gap if gaps else None,
+            "histogram": dict(zip(GAP_BUCKET_LABELS, self.buckets)),
+        }
+
+
+class GapIndex:
+    """
+    Índice de gaps de números, terminais e setores
+
+    Cada spin acrescenta uma posição em três índices e cada spin que
+    sai da janela remove a mais antiga de três índices: O(1) por spin,
+    independente do tamanho do histórico (100k+ spins). As consultas
+    leem os agregados mantidos, sem percorrer o histórico.
+    """
+
+    __slots__ = ("numbers", "terminals", "sectors", "next_position", "window")
+
+    def __init__(self):
+        self.numbers: List[PositionIndex] = [PositionIndex() for _ in range(37)]
+        self.terminals: List[PositionIndex] = [PositionIndex() for _ in range(10)]
+        self.sectors: List[PositionIndex] = [PositionIndex() for _ in SECTOR_KEYS]
+        self.next_position = 0
+        self.window = 0
+
+    def append(self, number: int) -> None:
+        position = self.next_position
+        self.numbers[number].append(position)
+        self.terminals[TERMINAL_OF[number]].append(position)
+        self.sectors[_SECTOR_INDEX[number]].append(position)
+        self.next_position = position + 1
+        self.window += 1
+
+    def evict(self, number: int) -> None:
+        self.numbers[number].evict()
+        self.terminals[TERMINAL_OF[number]].evict()
+        self.sectors[_SECTOR_INDEX[number]].evict()
+        self.window -= 1
+
+    def reset(self) -> None:
+        self.__init__()
+
+    def snapshot(self) -> "GapIndex":
+        copy = GapIndex.__new__(GapIndex)
+        copy.numbers = [index.snapshot() for index in self.numbers]
+        copy.terminals = [index.snapshot() for index in self.terminals]
+        copy.sectors = [index.snapshot() for index in self.sectors]
+        copy.next_position = self.next_position
+        copy.window = self.window
+        return copy
+
+    def absence(self, number: int) -> int:
+        """Spins desde a última aparição de `number` (O(1))"""
+        last = self.numbers[number].last()
+        return self.next_position - 1 - last if last is not None else self.window
+
+    def summary(self) -> Dict:
+        nxt, window = self.next_position, self.window
+
+        def _describe(field: str, keys: Sequence, indexes: Sequence[PositionIndex], expected: Sequence) -> List[Dict]:
+            return [
+                {field: key, "expected_gap": gap, **index.describe(nxt, window)}
+                for key, index, gap in zip(keys, indexes, expected)
+            ]
+
+        return {
+            "window": window,
+            "buckets": list(GAP_BUCKET_LABELS),
+            "numbers": _describe("number", range(37), self.numbers, [_EXPECTED_NUMBER_GAP] * 37),
+            "terminals": _describe("terminal", range(10), self.terminals, _EXPECTED_TERMINAL_GAP),
+            "sectors": _describe("sector", SECTOR_KEYS, self.sectors, _EXPECTED_SECTOR_GAP),
+        }
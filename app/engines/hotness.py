@@ -0,0 +1,127 @@
+# ======================================================
+# HOTNESS.PY - Scores "quentes" com decaimento exponencial
+# ======================================================
+
+import math
+import time
+from typing import Dict, Optional
+
+from app.engines.ai_engine import SECTOR_OF, TERMINAL_OF, Sector
+
+
+SECTOR_KEYS = (Sector.VOISINS.value, Sector.TIERS.value, Sector.ORPHELINS.value)
+_SECTOR_INDEX = tuple(SECTOR_KEYS.index(s) for s in SECTOR_OF)
+
+# Posições no vetor de scores: 37 números, 3 setores, 10 terminais, total
+_SECTOR_BASE = 37
+_TERMINAL_BASE = _SECTOR_BASE + len(SECTOR_KEYS)
+_TOTAL = _TERMINAL_BASE + 10
+_SIZE = _TOTAL + 1
+
+_SECTOR_SHARE = tuple(SECTOR_OF.count(s) / 37 for s in SECTOR_KEYS)
+_TERMINAL_SHARE = tuple(TERMINAL_OF.count(t) / 37 for t in range(10))
+
+# Expoente máximo antes de trazer a referência para perto (exp(700) ≈ limite do float)
+_MAX_EXPONENT = 600.0
+
+
+class HotnessTracker:
+    """
+    Scores com meia-vida por número, setor e terminal
+
+    Cada spin soma 1 ao score das suas categorias e o score perde metade
+    a cada `half_life` segundos. Em vez de decair todos os scores a cada
+    spin, o peso é guardado em relação a um instante de referência
+    (exp(λ·(t − ref))) e o decaimento é aplicado só na leitura: O(1) por
+    spin, independente da janela. A referência é reposicionada quando o
+    expoente fica grande (O(50), raro). Instantes no futuro contam como
+    "agora", para a referência nunca passar do relógio.
+    """
+
+    __slots__ = ("half_life", "rate", "reference", "scores", "last_timestamp")
+
+    def __init__(self, half_life: float):
+        self.half_life = half_life
+        self.rate = math.log(2) / half_life
+        self.reset()
+
+    def reset(self) -> None:
+        self.reference: Optional[float] = None
+        self.scores = [0.0] * _SIZE
+        self.last_timestamp: Optional[float] = None
+
+    def snapshot(self) -> "HotnessTracker":
+        """Cópia dos scores (leitura fora do lock da sessão)"""
+        copy = HotnessTracker.__new__(HotnessTracker)
+        copy.half_life, copy.rate = self.half_life, self.rate
+        copy.reference, copy.last_timestamp = self.reference, self.last_timestamp
+        copy.scores = self.scores[:]
+        return copy
+
+    def _rebase(self, timestamp: float) -> None:
+        factor = math.exp(-self.rate * (timestamp - self.reference))
+        self.scores = [s * factor for s in self.scores]
+        self.reference = timestamp
+
+    def append(self, number: int, timestamp: Optional[float] = None) -> None:
+        now = time.time()
+        if timestamp is None or timestamp > now:
+            timestamp = now
+        if self.reference is None:
+            self.reference = timestamp
+
+        exponent = self.rate * (timestamp - self.reference)
+        if exponent > _MAX_EXPONENT:
+            self._rebase(timestamp)
+            exponent = 0.0
+
+        weight = math.exp(exponent)
+        scores = self.scores
+        scores[number] += weight
+        scores[_SECTOR_BASE + _SECTOR_INDEX[number]] += weight
+        scores[_TERMINAL_BASE + TERMINAL_OF[number]] += weight
+        scores[_TOTAL] += weight
+
+        if self.last_timestamp is None or timestamp > self.last_timestamp:
+            self.last_timestamp = timestamp
+
+    def summary(self, now: Optional[float] = None, top_k: int = 10) -> Dict:
+        """Scores decaídos até `now` (padrão: agora)"""
+        if now is None:
+            now = time.time()
+        base = {"half_life_seconds": self.half_life, "as_of": round(now, 3)}
+        if self.reference is None:
+            return {**base, "total": 0.0, "numbers": [], "sectors": [], "terminals": []}
+
+        # Relógio atrás da referência: lê no instante da referência (fator ≤ 1)
+        factor = math.exp(-self.rate * max(0.0, now - self.reference))
+        total = self.scores[_TOTAL] * factor
+
+        def _entry(field: str, key, index: int, expected_share: float) -> Dict:
+            score = self.scores[index] * factor
+            return {
+                field: key,
+                "score": round(score, 4),
+                "share": round(score / total, 4) if total else 0.0,
+                "expected_share": round(expected_share, 4),
+            }
+
+        numbers = sorted(
+            (_entry("number", n, n, 1 / 37) for n in range(37)),
+            key=lambda e: -e["score"]
+        )
+        return {
+            **base,
+            "last_spin_at": self.last_timestamp,
+            "total": round(total, 4),
+            "numbers": numbers[:top_k],
+            "sectors": [
+                _entry("sector", key, _SECTOR_BASE + i, _SECTOR_SHARE[i])
+                for i, key in enumerate(SECTOR_KEYS)
+            ],
+            "terminals": [
+                _entry("terminal", t, _TERMINAL_BASE + t, _TERMINAL_SHARE[t])
+                for t in range(10)
+            ],
+        }
+
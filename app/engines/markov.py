@@ -0,0 +1,183 @@
+# ======================================================
+# MARKOV.PY - Transições de primeira ordem (incrementais)
+# ======================================================
+
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+from app.engines.ai_engine import COLOR_OF, DOZEN_OF, SECTOR_OF, Sector
+
+
+# Estados das categorias menores (ordem fixa = índice na matriz)
+SECTOR_STATES = (Sector.VOISINS.value, Sector.TIERS.value, Sector.ORPHELINS.value)
+COLOR_STATES = ("red", "black", "green")
+DOZEN_STATES = ("1", "2", "3", "zero")
+
+# Número → índice do estado em cada categoria
+_SECTOR_STATE = tuple(SECTOR_STATES.index(s) for s in SECTOR_OF)
+_COLOR_STATE = tuple(COLOR_STATES.index(c) for c in COLOR_OF)
+_DOZEN_STATE = tuple(DOZEN_STATES.index(str(d) if d else "zero") for d in DOZEN_OF)
+
+
+class TransitionMatrix:
+    """
+    Matriz de contagem de transições (origem → destino)
+
+    Contagens num `array` contíguo (4 bytes por célula, 37x37 ≈ 5,4 KB)
+    e total por linha; `add`/`remove` são O(1).
+    """
+
+    __slots__ = ("states", "size", "counts", "row_totals")
+
+    def __init__(self, states: Sequence):
+        self.states = tuple(states)
+        self.size = len(self.states)
+        self.counts = array("I", bytes(4 * self.size * self.size))
+        self.row_totals = array("I", bytes(4 * self.size))
+
+    def add(self, src: int, dst: int) -> None:
+        self.counts[src * self.size + dst] += 1
+        self.row_totals[src] += 1
+
+    def remove(self, src: int, dst: int) -> None:
+        cell = src * self.size + dst
+        if self.counts[cell]:
+            self.counts[cell] -= 1
+            self.row_totals[src] -= 1
+
+    def reset(self) -> None:
+        self.counts = array("I", bytes(4 * self.size * self.size))
+        self.row_totals = array("I", bytes(4 * self.size))
+
+    def snapshot(self) -> "TransitionMatrix":
+        """Cópia das contagens (leitura fora do lock da sessão)"""
+        copy = TransitionMatrix.__new__(TransitionMatrix)
+        copy.states, copy.size = self.states, self.size
+        copy.counts, copy.row_totals = self.counts[:], self.row_totals[:]
+        return copy
+
+    def total(self) -> int:
+        return sum(self.row_totals)
+
+    def followers(self, src: int, top_k: Optional[int] = None) -> List[Dict]:
+        """Destinos mais frequentes a partir de `src` (maior contagem primeiro)"""
+        row_total = self.row_totals[src]
+        if not row_total:
+            return []
+
+        start = src * self.size
+        row = self.counts[start:start + self.size]
+        ranked = sorted(
+            (dst for dst in range(self.size) if row[dst]),
+            key=lambda dst: -row[dst]
+        )
+        if top_k is not None:
+            ranked = ranked[:top_k]
+
+        return [
+            {
+                "state": self.states[dst],
+                "count": row[dst],
+                "probability": round(row[dst] / row_total, 4),
+            }
+            for dst in ranked
+        ]
+
+    def probabilities(self) -> Dict[str, Dict[str, float]]:
+        """Matriz completa de probabilidades (só para categorias pequenas)"""
+        matrix: Dict[str, Dict[str, float]] = {}
+        for src in range(self.size):
+            row_total = self.row_totals[src]
+            start = src * self.size
+            matrix[str(self.states[src])] = {
+                str(self.states[dst]): round(self.counts[start + dst] / row_total, 4) if row_total else 0.0
+                for dst in range(self.size)
+            }
+        return matrix
+
+
+class MarkovTracker:
+    """
+    Transições número→número, setor→setor, cor→cor e dúzia→dúzia
+
+    Atualizado a cada spin (`append`) e quando o spin mais antigo sai
+    da janela da sessão (`evict`, que remove a transição dele para o
+    seguinte). Nenhuma operação percorre o histórico.
+    """
+
+    __slots__ = ("numbers", "sectors", "colors", "dozens", "last")
+
+    def __init__(self):
+        self.numbers = TransitionMatrix(range(37))
+        self.sectors = TransitionMatrix(SECTOR_STATES)
+        self.colors = TransitionMatrix(COLOR_STATES)
+        self.dozens = TransitionMatrix(DOZEN_STATES)
+        self.last: Optional[int] = None
+
+    def _apply(self, src: int, dst: int, add: bool) -> None:
+        if add:
+            self.numbers.add(src, dst)
+            self.sectors.add(_SECTOR_STATE[src], _SECTOR_STATE[dst])
+            self.colors.add(_COLOR_STATE[src], _COLOR_STATE[dst])
+            self.dozens.add(_DOZEN_STATE[src], _DOZEN_STATE[dst])
+        else:
+            self.numbers.remove(src, dst)
+            self.sectors.remove(_SECTOR_STATE[src], _SECTOR_STATE[dst])
+            self.colors.remove(_COLOR_STATE[src], _COLOR_STATE[dst])
+            self.dozens.remove(_DOZEN_STATE[src], _DOZEN_STATE[dst])
+
+    def append(self, number: int) -> None:
+        if self.last is not None:
+            self._apply(self.last, number, add=True)
+        self.last = number
+
+    def evict(self, number: int, successor: Optional[int]) -> None:
+        """Remove a transição `number → successor` (spin que saiu da janela)"""
+        if successor is not None:
+            self._apply(number, successor, add=False)
+
+    def reset(self) -> None:
+        for matrix in (self.numbers, self.sectors, self.colors, self.dozens):
+            matrix.reset()
+        self.last = None
+
+    def snapshot(self) -> "MarkovTracker":
+        copy = MarkovTracker.__new__(MarkovTracker)
+        copy.numbers = self.numbers.snapshot()
+        copy.sectors = self.sectors.snapshot()
+        copy.colors = self.colors.snapshot()
+        copy.dozens = self.dozens.snapshot()
+        copy.last = self.last
+        return copy
+
+    def summary(self, top_k: int = 5) -> Dict:
+        """Seguidores mais prováveis do último spin, por categoria"""
+        last = self.last
+        if last is None:
+            return {"transitions": 0, "last_number": None}
+
+        def _category(matrix: TransitionMatrix, state: int, full: bool) -> Dict:
+            section = {
+                "from": str(matrix.states[state]),
+                "observed": matrix.row_totals[state],
+                "followers": matrix.followers(state, top_k),
+            }
+            if full:
+                section["matrix"] = matrix.probabilities()
+            return section
+
+        numbers = _category(self.numbers, last, full=False)
+        numbers["from"] = last
+        numbers["followers"] = [
+            {"number": follower.pop("state"), **follower}
+            for follower in numbers["followers"]
+        ]
+
+        return {
+            "transitions": self.numbers.total(),
+            "last_number": last,
+            "numbers": numbers,
+            "sectors": _category(self.sectors, _SECTOR_STATE[last], full=True),
+            "colors": _category(self.colors, _COLOR_STATE[last], full=True),
+            "dozens": _category(self.dozens, _DOZEN_STATE[last], full=True),
+        }
@@ -0,0 +1,236 @@
+# ======================================================
+# SIGNIFICANCE.PY - Distribuições nulas por Monte Carlo
+# ======================================================
+#
+# Simula janelas de `n` spins de uma roleta justa (single zero, 37
+# casas equiprováveis) e guarda, por (janela, estatística), a
+# distribuição de cada contagem. A análise só consulta a tabela:
+# p-valores e faixas esperadas custam um lookup.
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.engines.ai_engine import SECTOR_OF, TERMINAL_OF, Sector
+
+
+ZONE_KEYS: Tuple[str, ...] = (Sector.VOISINS.value, Sector.TIERS.value, Sector.ORPHELINS.value)
+
+# Matrizes número → categoria (37 x categorias) para somar contagens
+_ZONE_MATRIX = np.zeros((37, len(ZONE_KEYS)), dtype=np.int32)
+_TERMINAL_MATRIX = np.zeros((37, 10), dtype=np.int32)
+for _n in range(37):
+    _ZONE_MATRIX[_n, ZONE_KEYS.index(SECTOR_OF[_n])] = 1
+    _TERMINAL_MATRIX[_n, TERMINAL_OF[_n]] = 1
+_TERMINAL_TABLE = np.array(TERMINAL_OF, dtype=np.int8)
+
+# Estatísticas simuladas (nome → categorias)
+STATISTICS: Dict[str, Tuple] = {
+    "number_hits": ("any",),          # contagem de um número (37 agregados)
+    "max_number_hits": ("max",),      # contagem do número mais frequente
+    "absent_numbers": ("count",),     # quantos números não saíram
+    "zone_hits": ZONE_KEYS,
+    "terminal_hits": tuple(range(10)),
+    "terminal_absence": tuple(range(10)),  # spins desde a última aparição
+}
+
+_CHUNK = 2500  # janelas simuladas por bloco (limita a memória)
+
+
+class NullDistribution:
+    """
+    Distribuição simulada de uma estatística (uma linha por categoria)
+
+    p-valores com correção (k + 1) / (N + 1), para nunca retornar 0
+    em valores além do que a simulação alcançou.
+    """
+
+    __slots__ = ("window", "categories", "simulations", "_ge", "_le", "mean", "low", "high")
+
+    def __init__(self, window: int, categories: Sequence, histogram: np.ndarray, simulations: int):
+        self.window = window
+        self.categories = tuple(categories)
+        self.simulations = simulations
+
+        samples = histogram.sum(axis=1, keepdims=True)
+        le = np.cumsum(histogram, axis=1)
+        ge = samples - le + histogram
+        self._le = ((le + 1) / (samples + 1)).astype(np.float32)
+        self._ge = ((ge + 1) / (samples + 1)).astype(np.float32)
+
+        pmf = histogram / samples
+        values = np.arange(histogram.shape[1])
+        self.mean = (pmf * values).sum(axis=1)
+        cdf = le / samples
+        self.low = (cdf >= 0.025).argmax(axis=1)
+        self.high = (cdf >= 0.975).argmax(axis=1)
+
+    def _index(self, category) -> int:
+        return self.categories.index(category) if len(self.categories) > 1 else 0
+
+    def p_high(self, category, value: int) -> float:
+        """P(X >= value) numa roleta justa"""
+        row = self._ge[self._index(category)]
+        if value >= len(row):
+            # Além do máximo possível na janela
+            return float(row[-1])
+        return float(row[max(value, 0)])
+
+    def p_low(self, category, value: int) -> float:
+        """P(X <= value) numa roleta justa"""
+        row = self._le[self._index(category)]
+        return float(row[min(max(value, 0), len(row) - 1)])
+
+    def describe(self, category, value: int) -> Dict:
+        i = self._index(category)
+        return {
+            "expected": round(float(self.mean[i]), 2),
+            "expected_range": [int(self.low[i]), int(self.high[i])],
+            "p_value_high": round(self.p_high(category, value), 4),
+            "p_value_low": round(self.p_low(category, value), 4),
+        }
+
+
+def _accumulate(histogram: np.ndarray, values: np.ndarray) -> None:
+    """Soma `values` (amostras x categorias) no histograma (categorias x valores)"""
+    categories, width = histogram.shape
+    offsets = np.arange(categories) * width
+    flat = (values + offsets).ravel()
+    histogram += np.bincount(flat, minlength=categories * width).reshape(categories, width)
+
+
+def simulate_window(window: int, simulations: int, seed: int) -> Dict[str, NullDistribution]:
+    """
+    Simula `simulations` janelas de `window` spins e monta todas as
+    distribuições dessa janela de uma vez (vetorizado, em blocos)
+    """
+    rng = np.random.default_rng(seed)
+    width = window + 1
+    histograms = {
+        "number_hits": np.zeros((1, width), dtype=np.int64),
+        "max_number_hits": np.zeros((1, width), dtype=np.int64),
+        "absent_numbers": np.zeros((1, 38), dtype=np.int64),
+        "zone_hits": np.zeros((len(ZONE_KEYS), width), dtype=np.int64),
+        "terminal_hits": np.zeros((10, width), dtype=np.int64),
+        "terminal_absence": np.zeros((10, width), dtype=np.int64),
+    }
+
+    done = 0
+    while done < simulations:
+        m = min(_CHUNK, simulations - done)
+        draws = rng.integers(0, 37, size=(m, window), dtype=np.int8)
+
+        # Contagem por número em cada janela simulada (m x 37)
+        flat = (draws.astype(np.int64) + (np.arange(m) * 37)[:, None]).ravel()
+        counts = np.bincount(flat, minlength=m * 37).reshape(m, 37)
+
+        _accumulate(histograms["number_hits"], counts.reshape(-1, 1))
+        _accumulate(histograms["max_number_hits"], counts.max(axis=1, keepdims=True))
+        _accumulate(histograms["absent_numbers"], (counts == 0).sum(axis=1, keepdims=True))
+        _accumulate(histograms["zone_hits"], counts @ _ZONE_MATRIX)
+        _accumulate(histograms["terminal_hits"], counts @ _TERMINAL_MATRIX)
+
+        # Ausência: posição da última aparição contada a partir do fim
+        reversed_terminals = _TERMINAL_TABLE[draws][:, ::-1]
+        absence = np.empty((m, 10), dtype=np.int64)
+        for t in range(10):
+            mask = reversed_terminals == t
+            absence[:, t] = np.where(mask.any(axis=1), mask.argmax(axis=1), window)
+        _accumulate(histograms["terminal_absence"], absence)
+
+        done += m
+
+    return {
+        name: NullDistribution(window, STATISTICS[name], histogram, simulations)
+        for name, histogram in histograms.items()
+    }
+
+
+class SignificanceEngine:
+    """
+    Cache de distribuições nulas por (janela, estatística)
+
+    A primeira consulta de uma janela simula todas as estatísticas dela
+    (dezenas de ms); as seguintes são lookup. A seed é derivada da
+    janela, então os p-valores são estáveis entre reinícios. O cache
+    guarda até `max_windows` janelas (LRU). Janelas acima de
+    `max_window` não são simuladas (o custo cresce com a janela).
+    """
+
+    def __init__(
+        self,
+        simulations: Optional[int] = None,
+        max_windows: Optional[int] = None,
+        seed: int = 20240611,
+        max_window: Optional[int] = None
+    ):
+        self.simulations = simulations or settings.SIGNIFICANCE_SIMULATIONS
+        self.max_windows = max_windows or settings.SIGNIFICANCE_CACHE_WINDOWS
+        self.max_window = max_window or settings.MAX_HISTORY_LIMIT
+        self.seed = seed
+        self._cache: "OrderedDict[Tuple[int, str], NullDistribution]" = OrderedDict()
+        self._windows: "OrderedDict[int, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def covers(self, window: int) -> bool:
+        """A janela pode ser simulada (1..max_window)"""
+        return 0 < window <= self.max_window
+
+    def distribution(self, window: int, statistic: str) -> NullDistribution:
+        if not self.covers(window):
+            raise ValueError(f"Janela fora de 1..{self.max_window}: {window}")
+        
+        key = (window, statistic)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._windows.move_to_end(window)
+                return cached
+
+        # Simula fora do lock: consultas a janelas em cache não esperam
+        # (duas threads podem simular a mesma janela; o resultado é igual)
+        simulated = simulate_window(window, self.simulations, self.seed + window)
+
+        with self._lock:
+            for name, dist in simulated.items():
+                self._cache[(window, name)] = dist
+            self._windows[window] = None
+            self._windows.move_to_end(window)
+
+            while len(self._windows) > self.max_windows:
+                evicted, _ = self._windows.popitem(last=False)
+                for name in STATISTICS:
+                    self._cache.pop((evicted, name), None)
+
+        return simulated[statistic]
+
+    def warmup(self, windows: Iterable[int]) -> None:
+        """Pré-calcula as janelas (ex.: no startup, em background)"""
+        for window in windows:
+            if self.covers(window):
+                self.distribution(window, "number_hits")
+
+    def start_warmup(self, windows: Iterable[int]) -> threading.Thread:
+        """`warmup` numa thread daemon (não atrasa o startup)"""
+        thread = threading.Thread(
+            target=self.warmup,
+            args=(list(windows),),
+            name="significance-warmup",
+            daemon=True
+        )
+        thread.start()
+        return thread
+
+    def cached_windows(self) -> List[int]:
+        with self._lock:
+            return list(self._windows)
+
+    def is_cached(self, window: int) -> bool:
+        with self._lock:
+            return window in self._windows
+
+
+significance_engine = SignificanceEngine()
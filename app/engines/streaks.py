@@ -0,0 +1,175 @@
+# ======================================================
+# STREAKS.PY - Sequências (runs) por categoria, incrementais
+# ======================================================
+
+from typing import Dict, Optional, Sequence, Tuple
+
+from app.engines.ai_engine import COLOR_OF, COLUMN_OF, DOZEN_OF, HIGH_LOW_OF, PARITY_OF
+
+
+def _states(values: Sequence[Optional[object]]) -> Tuple[str, ...]:
+    """Estado por número (zero/None vira "zero", que também quebra sequências)"""
+    return tuple("zero" if v is None else str(v) for v in values)
+
+
+# Mesmas categorias agregadas por calculate_stats
+CATEGORIES: Dict[str, Tuple[str, ...]] = {
+    "color": _states(COLOR_OF),
+    "parity": _states(PARITY_OF),
+    "dozen": _states(DOZEN_OF),
+    "column": _states(COLUMN_OF),
+    "high_low": _states(HIGH_LOW_OF),
+}
+
+
+class RunTracker:
+    """
+    Sequências de uma categoria dentro da janela
+
+    Guarda só a sequência atual (fim da janela), o tamanho da mais
+    antiga (início da janela) e um histograma tamanho → quantidade por
+    valor. Um spin novo ou removido mexe em no máximo duas entradas do
+    histograma; a maior sequência sai das chaves do histograma.
+    """
+
+    __slots__ = ("state_of", "runs", "tail_value", "tail_len", "head_len", "histogram")
+
+    def __init__(self, state_of: Tuple[str, ...]):
+        self.state_of = state_of
+        self.reset()
+
+    def reset(self) -> None:
+        self.runs = 0  # sequências (inteiras ou cortadas) na janela
+        self.tail_value: Optional[str] = None
+        self.tail_len = 0
+        self.head_len = 0
+        self.histogram: Dict[str, Dict[int, int]] = {}
+
+    def snapshot(self) -> "RunTracker":
+        """Cópia do estado (leitura fora do lock da sessão)"""
+        copy = RunTracker.__new__(RunTracker)
+        copy.state_of = self.state_of
+        copy.runs = self.runs
+        copy.tail_value, copy.tail_len, copy.head_len = self.tail_value, self.tail_len, self.head_len
+        copy.histogram = {value: dict(counts) for value, counts in self.histogram.items()}
+        return copy
+
+    def _move(self, value: str, old: int, new: int) -> None:
+        """Uma sequência de `value` passou de `old` para `new` spins"""
+        counts = self.histogram.setdefault(value, {})
+        if old:
+            remaining = counts[old] - 1
+            if remaining:
+                counts[old] = remaining
+            else:
+                del counts[old]
+        if new:
+            counts[new] = counts.get(new, 0) + 1
+
+    def append(self, number: int) -> None:
+        value = self.state_of[number]
+        if self.runs and value == self.tail_value:
+            self._move(value, self.tail_len, self.tail_len + 1)
+            self.tail_len += 1
+        else:
+            self._move(value, 0, 1)
+            self.runs += 1
+            self.tail_value = value
+            self.tail_len = 1
+
+        if self.runs == 1:
+            self.head_len = self.tail_len
+
+    def evict(self, history: Sequence[int], index: int) -> None:
+        """
+        Remove `history[index]`, o spin mais antigo da janela
+
+        Quando a sequência mais antiga acaba, o tamanho da próxima é
+        contado em `history` (cada sequência é contada uma vez ao chegar
+        ao início da janela: O(1) amortizado por spin).
+        """
+        if not self.runs:
+            return
+
+        value = self.state_of[history[index]]
+        self._move(value, self.head_len, self.head_len - 1)
+        self.head_len -= 1
+
+        if self.runs == 1:
+            self.tail_len = self.head_len
+            if not self.head_len:
+                self.reset()
+            return
+
+        if self.head_len:
+            return
+
+        self.runs -= 1
+        if self.runs == 1:
+            self.head_len = self.tail_len
+            return
+
+        start = index + 1
+        head_value = self.state_of[history[start]]
+        end = start + 1
+        while self.state_of[history[end]] == head_value:
+            end += 1
+        self.head_len = end - start
+
+    def summary(self) -> Dict:
+        by_value = {}
+        longest_value, longest = None, 0
+        for value, counts in self.histogram.items():
+            if not counts:
+                continue
+            value_longest = max(counts)
+            by_value[value] = {
+                "longest": value_longest,
+                "runs": sum(counts.values()),
+                "distribution": {str(length): counts[length] for length in sorted(counts)},
+            }
+            if value_longest > longest:
+                longest_value, longest = value, value_longest
+
+        return {
+            "current": {"value": self.tail_value, "length": self.tail_len},
+            "longest": {"value": longest_value, "length": longest},
+            "by_value": by_value,
+        }
+
+
+class StreakTracker:
+    """Sequências de cor, paridade, dúzia, coluna e alto/baixo"""
+
+    __slots__ = ("trackers", "window")
+
+    def __init__(self):
+        self.trackers = {name: RunTracker(states) for name, states in CATEGORIES.items()}
+        self.window = 0
+
+    def append(self, number: int) -> None:
+        self.window += 1
+        for tracker in self.trackers.values():
+            tracker.append(number)
+
+    def evict(self, history: Sequence[int], index: int) -> None:
+        self.window -= 1
+        for tracker in self.trackers.values():
+            tracker.evict(history, index)
+
+    def reset(self) -> None:
+        self.window = 0
+        for tracker in self.trackers.values():
+            tracker.reset()
+
+    def snapshot(self) -> "StreakTracker":
+        copy = StreakTracker.__new__(StreakTracker)
+        copy.trackers = {name: tracker.snapshot() for name, tracker in self.trackers.items()}
+        copy.window = self.window
+        return copy
+
+    def summary(self) -> Dict:
+        return {
+            "window": self.window,
+            **{name: tracker.summary() for name, tracker in self.trackers.items()},
+        }
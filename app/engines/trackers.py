@@ -0,0 +1,141 @@
+# ======================================================
+# TRACKERS.PY - Estado incremental por sessão
+# ======================================================
+
+from typing import Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.core.timing import current_timer
+from app.engines.alerts import AlertEngine
+from app.engines.bias import BiasEstimator
+from app.engines.distance import DistanceTracker
+from app.engines.gaps import GapIndex
+from app.engines.hotness import HotnessTracker
+from app.engines.markov import MarkovTracker
+from app.engines.streaks import StreakTracker
+
+
+class SessionTrackers:
+    """
+    Estatísticas mantidas spin a spin para uma sessão
+
+    O SessionManager chama `append` para cada spin novo e `evict` para
+    cada spin que sai da janela (MAX_HISTORY_PER_SESSION), sempre sob o
+    lock da sessão. Cada rastreador custa O(1) por spin; `summary`
+    monta as seções da análise sem percorrer o histórico e roda sobre
+    um `snapshot` tirado sob o lock, fora dele.
+    """
+
+    __slots__ = ("markov", "streaks", "gaps", "hotness", "bias", "distance", "alerts")
+
+    def __init__(self, alert_rules: Optional[List[Dict]] = None):
+        self.markov = MarkovTracker()
+        self.streaks = StreakTracker()
+        self.gaps = GapIndex()
+        self.hotness = HotnessTracker(settings.HOTNESS_HALF_LIFE_SECONDS)
+        self.bias = BiasEstimator(
+            prior=settings.BIAS_PRIOR,
+            level=settings.BIAS_CREDIBLE_LEVEL,
+            number_shift=settings.BIAS_CUSUM_NUMBER_SHIFT,
+            sector_shift=settings.BIAS_CUSUM_SECTOR_SHIFT,
+            threshold=settings.BIAS_CUSUM_THRESHOLD,
+        )
+        self.distance = DistanceTracker(settings.DISTANCE_WINDOWS)
+        self.alerts = AlertEngine(
+            settings.ALERT_DEFAULT_RULES if alert_rules is None else alert_rules
+        )
+
+    def append(self, number: int, timestamp: Optional[float] = None) -> None:
+        self.markov.append(number)
+        self.streaks.append(number)
+        self.gaps.append(number)
+        self.hotness.append(number, timestamp)
+        self.bias.append(number)
+        self.distance.append(number)
+        self.alerts.append(number)
+
+    def extend(
+        self,
+        numbers: Iterable[int],
+        timestamps: Optional[Iterable[float]] = None
+    ) -> None:
+        if timestamps is None:
+            for number in numbers:
+                self.append(number)
+        else:
+            for number, timestamp in zip(numbers, timestamps):
+                self.append(number, timestamp)
+
+    def evict_prefix(self, history: List[int], count: int) -> None:
+        """
+        Remove os `count` primeiros spins de `history` da janela
+
+        `history` é o histórico antes do corte (já com os spins novos).
+        Hotness (o decaimento já apaga), viés (cobre a mesa inteira) e
+        distâncias (janelas próprias) não são tocados.
+        """
+        for i in range(count):
+            successor = history[i + 1] if i + 1 < len(history) else None
+            self.markov.evict(history[i], successor)
+            self.streaks.evict(history, i)
+            self.gaps.evict(history[i])
+
+    def reset(self) -> None:
+        self.markov.reset()
+        self.streaks.reset()
+        self.gaps.reset()
+        self.hotness.reset()
+        self.bias.reset()
+        self.distance.reset()
+        self.alerts.reset()
+
+    def snapshot(self) -> "SessionTrackers":
+        """Cópia do estado que `summary` lê (contadores, sem o histórico)"""
+        copy = SessionTrackers.__new__(SessionTrackers)
+        copy.markov = self.markov.snapshot()
+        copy.streaks = self.streaks.snapshot()
+        copy.gaps = self.gaps.snapshot()
+        copy.hotness = self.hotness.snapshot()
+        copy.bias = self.bias.snapshot()
+        copy.distance = self.distance.snapshot()
+        copy.alerts = self.alerts.snapshot()
+        return copy
+
+    def summary(self) -> Dict:
+        timer = current_timer()
+        with timer.section("transitions"):
+            transitions = self.markov.summary(top_k=settings.TRANSITIONS_TOP_K)
+        with timer.section("streaks"):
+            streaks = self.streaks.summary()
+        with timer.section("gaps"):
+            gaps = self.gaps.summary()
+        with timer.section("hotness"):
+            hotness = self.hotness.summary(top_k=settings.HOTNESS_TOP_K)
+        with timer.section("bias"):
+            bias = self.bias.summary()
+        with timer.section("wheel_distance"):
+            distance = self.distance.summary(
+                top_k=settings.DISTANCE_TOP_K,
+                radius=settings.DISTANCE_ZONE_RADIUS
+            )
+        return {
+            "transitions": transitions,
+            "streaks": streaks,
+            "gaps": gaps,
+            "hotness": hotness,
+            "bias": bias,
+            "wheel_distance": distance,
+            "alerts": self.alerts.summary(),
+        }
+
+
+def build_insights(history: List[int]) -> Dict:
+    """
+    Seções incrementais calculadas a partir de um histórico avulso
+
+    Para chamadas sem sessão (O(n)); com sessão, o SessionManager
+    mantém os rastreadores e entrega o resumo pronto.
+    """
+    trackers = SessionTrackers()
+    trackers.extend(history)
+    return trackers.summary()
@@ -2,14 +2,27 @@
 # SCHEMAS.PY - Pydantic Models para validação
 # ======================================================
 
-from pydantic import BaseModel, Field, field_validator
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import List, Literal, Optional, Dict, Any
+import time
+
+from app.core.config import settings
+
+
+def _check_timestamp(t: float) -> None:
+    """Instante de spin: epoch em segundos, sem passar do relógio do servidor"""
+    if t < 0:
+        raise ValueError('timestamps não podem ser negativos')
+    if t > time.time() + settings.SPIN_TIMESTAMP_MAX_SKEW:
+        # Também pega epoch em milissegundos
+        raise ValueError('timestamp no futuro (use epoch em segundos)')
 
 
 class SpinInput(BaseModel):
     """Input para adicionar um único spin"""
     number: int = Field(..., ge=0, le=36, description="Número sorteado (0-36)")
     history_limit: int = Field(50, ge=10, le=200, description="Limite de histórico")
+    timestamp: Optional[float] = Field(None, ge=0, description="Instante do spin (epoch, segundos)")
 
     @field_validator('number')
     @classmethod
@@ -19,12 +32,28 @@ class SpinInput(BaseModel):
         if not (0 <= v <= 36):
             raise ValueError('Número deve estar entre 0 e 36')
         return v
+    
+    @field_validator('timestamp')
+    @classmethod
+    def validate_timestamp(cls, v):
+        if v is not None:
+            _check_timestamp(v)
+        return v
 
 
 class MultipleSpinsInput(BaseModel):
     """Input para adicionar múltiplos spins"""
-    numbers: List[int] = Field(..., min_length=1, description="Lista de números")
+    numbers: List[int] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.MAX_MANUAL_INPUT_NUMBERS,
+        description="Lista de números"
+    )
     history_limit: int = Field(50, ge=10, le=200)
+    timestamps: Optional[List[float]] = Field(
+        None,
+        description="Instante de cada spin (epoch, segundos), um por número"
+    )
 
     @field_validator('numbers')
     @classmethod
@@ -37,6 +66,15 @@ class MultipleSpinsInput(BaseModel):
             raise ValueError(f'Números inválidos encontrados: {invalid}')
         
         return v
+    
+    @model_validator(mode='after')
+    def validate_timestamps(self):
+        if self.timestamps is not None:
+            if len(self.timestamps) != len(self.numbers):
+                raise ValueError('timestamps deve ter um valor por número')
+            for t in self.timestamps:
+                _check_timestamp(t)
+        return self
 
 
 class Strategy(BaseModel):
@@ -59,6 +97,38 @@ class StrategyInput(BaseModel):
     history_limit: int = Field(50, ge=10, le=200)
 
 
+class AlertRule(BaseModel):
+    """Regra de alerta de uma sessão"""
+    type: Literal["sector_absent", "terminal_repeat", "color_streak", "strategy_miss_streak"]
+    threshold: int = Field(..., ge=1, le=1000, description="Spins (ausência/sequência) que disparam o alerta")
+    id: Optional[str] = Field(None, max_length=50)
+    severity: Literal["info", "warning", "critical"] = "warning"
+    sector: Optional[Literal["voisins", "tiers", "orphelins"]] = None  # sector_absent (vazio = qualquer)
+    color: Optional[Literal["red", "black", "green"]] = None  # color_streak (vazio = vermelho/preto)
+    name: Optional[str] = Field(None, max_length=100)  # strategy_miss_streak
+    triggers: Optional[List[int]] = None  # strategy_miss_streak
+    
+    @field_validator('triggers')
+    @classmethod
+    def validate_triggers(cls, v):
+        if v is not None:
+            invalid = [n for n in v if not (0 <= n <= 36)]
+            if invalid:
+                raise ValueError(f'Números gatilho inválidos: {invalid}')
+        return v
+    
+    @model_validator(mode='after')
+    def validate_strategy(self):
+        if self.type == "strategy_miss_streak" and not self.triggers:
+            raise ValueError('strategy_miss_streak exige números gatilho')
+        return self
+
+
+class AlertRulesInput(BaseModel):
+    """Regras de alerta da sessão (substituem as atuais)"""
+    rules: List[AlertRule] = Field(..., max_length=settings.ALERT_MAX_RULES)
+
+
 class AnalysisResponse(BaseModel):
     """Resposta de análise"""
     status: str
@@ -3,10 +3,14 @@
 # ======================================================
 
 from typing import List, Optional, Dict, Any
+import asyncio
 import logging
+import time
 
 # Importar o motor de IA corrigido
 from app.engines.ai_engine import analyze_data
+from app.core.config import settings
+from app.core.metrics import metrics
 
 
 logger = logging.getLogger(__name__)
@@ -25,7 +29,8 @@ class AIService:
         self,
         history: List[int],
         history_limit: int = 50,
-        user_strategies: Optional[List[Dict]] = None
+        user_strategies: Optional[List[Dict]] = None,
+        insights: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Executa análise completa do histórico
@@ -34,12 +39,13 @@ class AIService:
             history: Lista de números sorteados
             history_limit: Limite de histórico a considerar
             user_strategies: Estratégias customizadas
+            insights: Seções incrementais mantidas pela sessão
             
         Returns:
             Dicionário com análise completa
         """
         try:
-            logger.info(f"Analisando histórico com {len(history)} spins")
+            logger.info("Analisando histórico com %d spins", len(history))
             
             # Validar entrada
             if not history:
@@ -50,13 +56,16 @@ class AIService:
                 }
             
             # Chamar motor de IA
+            started = time.perf_counter()
             analysis = analyze_data(
                 data=history,
                 history_limit=history_limit,
-                user_strategies=user_strategies
+                user_strategies=user_strategies,
+                insights=insights
             )
+            metrics.observe_analysis(time.perf_counter() - started)
             
-            logger.info(f"✅ Análise concluída: {analysis.get('status')}")
+            logger.info("✅ Análise concluída: %s", analysis.get("status"))
             
             return analysis
             
@@ -68,6 +77,33 @@ class AIService:
                 "data": {}
             }
     
+    async def analyze_async(
+        self,
+        history: List[int],
+        history_limit: int = 50,
+        user_strategies: Optional[List[Dict]] = None,
+        insights: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        `analyze` para as rotas async
+        
+        A janela que ainda não está no cache de significância é simulada
+        numa thread (centenas de ms) antes da análise, para não travar o
+        event loop; o resto da análise é rápido e roda direto.
+        """
+        window = min(len(history), history_limit)
+        if settings.SIGNIFICANCE_ENABLED:
+            from app.engines.significance import significance_engine
+            if significance_engine.covers(window) and not significance_engine.is_cached(window):
+                await asyncio.to_thread(significance_engine.warmup, [window])
+        
+        return self.analyze(
+            history=history,
+            history_limit=history_limit,
+            user_strategies=user_strategies,
+            insights=insights
+        )
+    
     def analyze_single_spin(self, number: int) -> Dict[str, Any]:
         """
         Análise rápida de um único spin
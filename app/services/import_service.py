@@ -0,0 +1,179 @@
+# ======================================================
+# IMPORT_SERVICE.PY - Importação em massa de histórico
+# ======================================================
+
+import json
+import logging
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.session_manager import SessionManager
+
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_FORMATS = ("csv", "ndjson")
+MAX_REPORTED_ERRORS = 20
+
+# Sentinela para a linha de cabeçalho do CSV
+_HEADER = object()
+# Colunas que identificam um cabeçalho (export: `position,number`)
+_HEADER_COLUMNS = frozenset({"number", "position"})
+
+
+def detect_format(content_type: Optional[str], fmt: Optional[str] = None) -> Optional[str]:
+    """Resolve o formato pelo parâmetro explícito ou pelo Content-Type"""
+    if fmt:
+        fmt = fmt.lower()
+        return fmt if fmt in SUPPORTED_FORMATS else None
+
+    content_type = (content_type or "").lower()
+    if "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    if "csv" in content_type or content_type.startswith("text/plain"):
+        return "csv"
+    return None
+
+
+class _LineParser:
+    """
+    Converte linhas CSV/NDJSON em números de roleta
+
+    CSV: uma coluna com o número, ou cabeçalho contendo a coluna
+    `number` (compatível com o export `position,number`). A primeira
+    linha só é tratada como cabeçalho se tiver a coluna `number` ou
+    `position`; qualquer outra linha não numérica é reportada como erro.
+    NDJSON: cada linha é um inteiro ou um objeto com a chave `number`.
+    """
+
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self.line_no = 0
+        self._csv_column: Optional[int] = None
+        self._header_checked = False
+
+    def parse(self, line: str) -> Tuple[Optional[int], Optional[str]]:
+        """Retorna (número, erro); linhas vazias retornam (None, None)"""
+        self.line_no += 1
+        line = line.strip()
+        if not line:
+            return None, None
+
+        if self.fmt == "ndjson":
+            value = self._parse_ndjson(line)
+        else:
+            value = self._parse_csv(line)
+            if value is _HEADER:
+                return None, None
+
+        if isinstance(value, bool) or not isinstance(value, int):
+            return None, f"Linha {self.line_no}: valor '{line[:40]}' não é inteiro"
+        if not (0 <= value <= 36):
+            return None, f"Linha {self.line_no}: número {value} inválido (deve ser 0-36)"
+        return value, None
+
+    def _parse_ndjson(self, line: str):
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            return None
+        if isinstance(obj, dict):
+            return obj.get("number")
+        return obj
+
+    def _parse_csv(self, line: str):
+        if not self._header_checked:
+            line = line.lstrip("\ufeff")  # BOM de planilhas exportadas
+        fields = [f.strip().strip('"') for f in line.split(",")]
+
+        if not self._header_checked:
+            self._header_checked = True
+            lowered = [f.lower() for f in fields]
+            if _HEADER_COLUMNS.intersection(lowered):
+                self._csv_column = lowered.index("number") if "number" in lowered else len(fields) - 1
+                return _HEADER
+
+        column = self._csv_column if self._csv_column is not None else len(fields) - 1
+        if column >= len(fields):
+            return None
+
+        field = fields[column]
+        return int(field) if field.lstrip("-").isdigit() else None
+
+
+class HistoryImportService:
+    """
+    Importa histórico em streaming
+
+    Lê o corpo em blocos, faz o parsing linha a linha e grava na
+    sessão em lotes de `chunk_size` (um lock por lote).
+    """
+
+    def __init__(self, session_manager: SessionManager, chunk_size: int = 5000):
+        self.session_manager = session_manager
+        self.chunk_size = chunk_size
+
+    async def import_stream(
+        self,
+        session_id: str,
+        stream: AsyncIterator[bytes],
+        fmt: str
+    ) -> Dict:
+        """
+        Importa números de um stream de bytes
+
+        Returns:
+            Relatório com importados, ignorados, erros e throughput
+        """
+        started = time.perf_counter()
+        parser = _LineParser(fmt)
+
+        batch: List[int] = []
+        imported = 0
+        skipped = 0
+        errors: List[str] = []
+        pending = b""
+
+        def handle(line: bytes):
+            nonlocal skipped
+            number, error = parser.parse(line.decode("utf-8", errors="replace"))
+            if error:
+                skipped += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append(error)
+            elif number is not None:
+                batch.append(number)
+
+        async for chunk in stream:
+            if not chunk:
+                continue
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+
+            for line in lines:
+                handle(line)
+
+            if len(batch) >= self.chunk_size:
+                imported += self.session_manager.add_spins(session_id, batch)
+                batch = []
+
+        if pending:
+            handle(pending)
+        if batch:
+            imported += self.session_manager.add_spins(session_id, batch)
+
+        elapsed = time.perf_counter() - started
+        report = {
+            "imported": imported,
+            "skipped": skipped,
+            "lines": parser.line_no,
+            "errors": errors,
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "spins_per_second": round(imported / elapsed, 1) if elapsed > 0 else None,
+        }
+
+        logger.info(
+            "📥 Importação concluída: %d spins (%s spins/s, %d ignorados)",
+            imported, report["spins_per_second"], skipped
+        )
+        return report
@@ -0,0 +1,196 @@
+# ======================================================
+# OCR_BACKENDS.PY - Backends de OCR (Tesseract)
+# ======================================================
+
+import logging
+import queue
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pytesseract
+from PIL import Image
+
+try:  # Opcional: API C do Tesseract em processo (pip install tesserocr)
+    import tesserocr
+except ImportError:  # pragma: no cover - depende do ambiente
+    tesserocr = None
+
+
+logger = logging.getLogger(__name__)
+
+OCR_PSM = 6  # bloco único de texto
+OCR_WHITELIST = "0123456789"
+OCR_LANG = "eng"
+
+
+class OCRBackend:
+    """
+    Interface de backend de OCR
+
+    Recebe a imagem já pré-processada (array 2D uint8) e devolve o
+    texto reconhecido. Implementações devem ser thread-safe.
+    """
+
+    name = "base"
+
+    def recognize(self, img: np.ndarray) -> str:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Libera recursos do backend"""
+
+
+class PytesseractBackend(OCRBackend):
+    """
+    Backend via pytesseract (um subprocesso `tesseract` por chamada)
+
+    Sempre disponível quando o binário está instalado; usado como
+    fallback dos backends persistentes.
+    """
+
+    name = "pytesseract"
+
+    def __init__(self, psm: int = OCR_PSM, whitelist: str = OCR_WHITELIST):
+        self.config = f"--psm {psm} -c tessedit_char_whitelist={whitelist}"
+
+    def recognize(self, img: np.ndarray) -> str:
+        return pytesseract.image_to_string(img, config=self.config)
+
+
+class TesserocrPoolBackend(OCRBackend):
+    """
+    Pool de engines Tesseract persistentes (tesserocr)
+
+    Cada PyTessBaseAPI carrega os dados de idioma uma única vez e é
+    reutilizado entre chamadas, eliminando o fork do binário e o
+    recarregamento do traineddata. Um engine não é thread-safe, então
+    cada chamada pega um engine exclusivo do pool.
+    """
+
+    name = "tesserocr"
+
+    def __init__(
+        self,
+        pool_size: int = 3,
+        psm: int = OCR_PSM,
+        whitelist: str = OCR_WHITELIST,
+        lang: str = OCR_LANG
+    ):
+        if tesserocr is None:
+            raise RuntimeError("tesserocr não está instalado")
+
+        self._pool: "queue.Queue" = queue.Queue()
+        self._apis: List = []
+
+        for _ in range(max(1, pool_size)):
+            api = tesserocr.PyTessBaseAPI(lang=lang, psm=psm)
+            api.SetVariable("tessedit_char_whitelist", whitelist)
+            self._apis.append(api)
+            self._pool.put(api)
+
+    def recognize(self, img: np.ndarray) -> str:
+        api = self._pool.get()
+        try:
+            api.SetImage(Image.fromarray(img))
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+            self._pool.put(api)
+
+    def close(self) -> None:
+        for api in self._apis:
+            api.End()
+        self._apis = []
+
+
+BACKENDS = {
+    PytesseractBackend.name: PytesseractBackend,
+    TesserocrPoolBackend.name: TesserocrPoolBackend,
+}
+
+
+def create_backend(name: str = "auto", pool_size: int = 3) -> OCRBackend:
+    """
+    Cria o backend de OCR
+
+    "auto" tenta o pool persistente (tesserocr) e cai para
+    pytesseract se ele não estiver disponível.
+    """
+    name = (name or "auto").lower()
+
+    if name in ("auto", TesserocrPoolBackend.name):
+        try:
+            return TesserocrPoolBackend(pool_size=pool_size)
+        except Exception as e:
+            if name != "auto":
+                logger.warning(f"⚠️  Backend tesserocr indisponível: {str(e)}")
+            logger.info("OCR usando backend pytesseract (subprocesso por chamada)")
+
+    elif name != PytesseractBackend.name:
+        logger.warning(f"⚠️  Backend de OCR desconhecido '{name}', usando pytesseract")
+
+    return PytesseractBackend()
+
+
+# ======================================================
+# BENCHMARK
+# ======================================================
+
+def benchmark_backend(
+    backend: OCRBackend,
+    images: List[np.ndarray],
+    rounds: int = 3
+) -> Dict:
+    """Mede imagens/segundo de um backend (imagens pré-processadas)"""
+    backend.recognize(images[0])  # aquecimento
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for img in images:
+            t0 = time.perf_counter()
+            backend.recognize(img)
+            latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "backend": backend.name,
+        "images": len(latencies),
+        "images_per_second": round(len(latencies) / elapsed, 2) if elapsed > 0 else None,
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2)
+        if len(latencies) >= 20 else None,
+    }
+
+
+def run_benchmark():
+    """Compara todos os backends disponíveis nas imagens informadas"""
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Uso: python -m app.services.ocr_backends <imagem> [<imagem> ...]")
+        return
+
+    images = [np.array(Image.open(path).convert("L")) for path in sys.argv[1:]]
+
+    for name, backend_cls in BACKENDS.items():
+        try:
+            backend = backend_cls()
+        except Exception as e:
+            print(f"⏭️  {name}: indisponível ({str(e)})")
+            continue
+
+        try:
+            result = benchmark_backend(backend, images)
+            print(
+                f"📊 {name}: {result['images_per_second']} img/s "
+                f"(p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms)"
+            )
+        finally:
+            backend.close()
+
+
+if __name__ == "__main__":
+    run_benchmark()
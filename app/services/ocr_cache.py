@@ -0,0 +1,190 @@
+# ======================================================
+# OCR_CACHE.PY - Cache de resultados de OCR por conteúdo
+# ======================================================
+
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def content_hash(image_bytes: bytes, layout: Optional[str] = None) -> str:
+    """Hash exato do upload (inclui o layout, que muda o recorte)"""
+    digest = hashlib.sha256(image_bytes).hexdigest()
+    return f"{layout}:{digest}" if layout else digest
+
+
+# Grade do dHash da faixa: 64x16 comparações (1024 bits). Uma ficha nova
+# desloca a faixa inteira e muda dezenas de bits; 9x8 na tela toda não
+# distinguia screenshots com um spin de diferença.
+STRIP_HASH_SIZE: Tuple[int, int] = (65, 16)
+
+
+def perceptual_hash(gray: np.ndarray, size: Tuple[int, int] = (9, 8)) -> int:
+    """
+    dHash da imagem (largura x altura da grade em `size`)
+
+    Reduz para a grade e compara pixels vizinhos na horizontal. Imagens
+    quase idênticas (recompressão JPEG, leve ruído) diferem em poucos
+    bits.
+    """
+    small = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def strip_hash(gray: np.ndarray, orientation: str = "horizontal") -> int:
+    """dHash da faixa de histórico já recortada (vertical é transposta)"""
+    if orientation == "vertical":
+        gray = np.ascontiguousarray(gray.T)
+    return perceptual_hash(gray, STRIP_HASH_SIZE)
+
+
+@dataclass
+class _Entry:
+    exact_key: str
+    phash: Optional[int]
+    layout: Optional[str]
+    numbers: List[int]
+    size: int
+
+
+class OCRResultCache:
+    """
+    Cache LRU de resultados de OCR com orçamento em bytes
+
+    Busca primeiro pelo hash exato do upload (sem decodificar a
+    imagem). Com `perceptual`, busca também pelo hash da faixa de
+    histórico recortada: igual (distância 0, O(1)) ou, com
+    `phash_distance` > 0, com até tantos bits de diferença entre as
+    `scan_limit` entradas mais recentes.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 8 * 1024 * 1024,
+        phash_distance: int = 0,
+        perceptual: bool = False,
+        scan_limit: int = 64
+    ):
+        self.max_bytes = max_bytes
+        self.phash_distance = phash_distance
+        self.perceptual = perceptual
+        self.scan_limit = scan_limit
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._by_phash: Dict[int, str] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits_exact = 0
+        self.hits_perceptual = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_exact(self, exact_key: str) -> Optional[List[int]]:
+        """Busca pelo hash exato do upload"""
+        with self._lock:
+            entry = self._entries.get(exact_key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(exact_key)
+            self.hits_exact += 1
+            return list(entry.numbers)
+
+    def get_similar(self, phash: int, layout: Optional[str] = None) -> Optional[List[int]]:
+        """Busca pelo hash perceptual (mesmo layout, distância de Hamming)"""
+        with self._lock:
+            key = self._by_phash.get(phash)
+            entry = self._entries.get(key) if key else None
+
+            if entry is None or entry.layout != layout:
+                entry = None
+                if self.phash_distance > 0:
+                    # Varredura limitada às entradas mais recentes
+                    for scanned, candidate in enumerate(reversed(self._entries.values())):
+                        if scanned >= self.scan_limit:
+                            break
+                        if (
+                            candidate.phash is not None
+                            and candidate.layout == layout
+                            and (candidate.phash ^ phash).bit_count() <= self.phash_distance
+                        ):
+                            entry = candidate
+                            break
+
+            if entry is None:
+                return None
+
+            self._entries.move_to_end(entry.exact_key)
+            self.hits_perceptual += 1
+            return list(entry.numbers)
+
+    def record_miss(self) -> None:
+        """Nenhuma busca acertou: o resultado vai sair do OCR"""
+        with self._lock:
+            self.misses += 1
+
+    def put(
+        self,
+        exact_key: str,
+        numbers: List[int],
+        phash: Optional[int] = None,
+        layout: Optional[str] = None
+    ) -> None:
+        """Armazena um resultado, removendo os menos usados se preciso"""
+        size = (
+            sys.getsizeof(exact_key)
+            + sys.getsizeof(numbers)
+            + 28 * len(numbers)
+            + 128  # overhead da entrada e dos índices
+        )
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(exact_key, None)
+            if old is not None:
+                self._forget(old)
+
+            entry = _Entry(exact_key, phash, layout, list(numbers), size)
+            self._entries[exact_key] = entry
+            self._bytes += size
+            if phash is not None:
+                self._by_phash[phash] = exact_key
+
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._forget(evicted)
+                self.evictions += 1
+
+    def _forget(self, entry: _Entry) -> None:
+        self._bytes -= entry.size
+        if entry.phash is not None and self._by_phash.get(entry.phash) == entry.exact_key:
+            del self._by_phash[entry.phash]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_phash.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        """Métricas do cache (hit ratio, ocupação, evictions)"""
+        with self._lock:
+            hits = self.hits_exact + self.hits_perceptual
+            lookups = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits_exact": self.hits_exact,
+                "hits_perceptual": self.hits_perceptual,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            }
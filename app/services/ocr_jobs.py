@@ -0,0 +1,386 @@
+# ======================================================
+# OCR_JOBS.PY - Fila assíncrona de jobs de OCR
+# ======================================================
+
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Fila de OCR cheia (backpressure)"""
+
+
+# ======================================================
+# LADO DO WORKER (processo separado)
+# ======================================================
+
+_worker_service = None
+
+
+def _init_worker():
+    """Cria um OCRService por processo (backend, caches e pool próprios)"""
+    global _worker_service
+    from app.services.ocr_service import OCRService
+
+    _worker_service = OCRService()
+
+
+def _run_ocr(image_bytes: bytes, layout: Optional[str]) -> Dict:
+    """Executa o OCR no worker e devolve números + métricas do cache"""
+    started = time.perf_counter()
+    numbers = _worker_service.process_image(image_bytes, layout=layout)
+    cache = _worker_service.cache.stats() if _worker_service.cache is not None else None
+    return {
+        "numbers": numbers,
+        "duration": time.perf_counter() - started,
+        "pid": os.getpid(),
+        "cache": cache,
+    }
+
+
+def _run_ocr_sequence(image_bytes: bytes, layout: Optional[str]) -> Dict:
+    """Lê a faixa em ordem de tela (sessões e lotes) + métricas do cache"""
+    started = time.perf_counter()
+    numbers = _worker_service.read_sequence(image_bytes, layout=layout)
+    cache = _worker_service.cache.stats() if _worker_service.cache is not None else None
+    return {
+        "numbers": numbers,
+        "duration": time.perf_counter() - started,
+        "pid": os.getpid(),
+        "cache": cache,
+    }
+
+
+# ======================================================
+# LADO DA API
+# ======================================================
+
+@dataclass
+class OCRJob:
+    """Estado de um job de OCR"""
+    id: str
+    key: str
+    session_id: Optional[str]
+    layout: Optional[str]
+    status: str = "queued"  # queued | running | done | failed | timeout
+    numbers: List[int] = field(default_factory=list)
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    duration: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed", "timeout")
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "session_id": self.session_id,
+            "extracted_numbers": self.numbers if self.status == "done" else None,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "duration_ms": round(self.duration * 1000, 2) if self.duration is not None else None,
+        }
+
+
+class OCRJobQueue:
+    """
+    Fila de OCR com pool limitado de processos
+
+    O upload retorna um job id na hora; o OCR roda em processos
+    separados, isolando a CPU do OCR dos endpoints de spin. Jobs com o
+    mesmo conteúdo (hash) são deduplicados enquanto estiverem na fila
+    ou com resultado em cache. A fila é limitada (QueueFullError) e
+    cada job tem timeout.
+
+    Jobs de uma sessão leem a faixa em ordem de tela, com repetições
+    (`read_sequence`), para o histórico manter a ordem dos spins; sem
+    sessão, devolvem o conjunto de números (`process_image`, com cache).
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout: Optional[float] = None,
+        result_ttl: Optional[float] = None,
+        on_result: Optional[Callable[[OCRJob], None]] = None
+    ):
+        self.max_workers = max_workers or settings.OCR_JOB_WORKERS
+        self.max_queue = max_queue or settings.OCR_JOB_MAX_QUEUE
+        self.timeout = timeout or settings.OCR_JOB_TIMEOUT
+        self.result_ttl = result_ttl or settings.OCR_JOB_RESULT_TTL
+        self.on_result = on_result
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+        self._jobs: Dict[str, OCRJob] = {}
+        self._by_key: Dict[str, str] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._worker_cache: Dict[int, Dict] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._batch_pending = 0
+
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.deduplicated = 0
+        self.total_duration = 0.0
+
+    @staticmethod
+    def job_key(image_bytes: bytes, session_id: Optional[str], layout: Optional[str]) -> str:
+        """Chave de deduplicação: conteúdo + destino + layout"""
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        return f"{session_id or '-'}:{layout or '-'}:{digest}"
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs aguardando ou em execução (incluindo imagens de lotes)"""
+        return sum(1 for job in self._jobs.values() if not job.finished) + self._batch_pending
+
+    def submit(
+        self,
+        image_bytes: bytes,
+        session_id: Optional[str] = None,
+        layout: Optional[str] = None
+    ) -> OCRJob:
+        """
+        Enfileira um job (deve ser chamado dentro do event loop)
+
+        Raises:
+            QueueFullError: se a fila atingiu `max_queue`
+        """
+        self._prune()
+
+        key = self.job_key(image_bytes, session_id, layout)
+        existing_id = self._by_key.get(key)
+        if existing_id is not None:
+            existing = self._jobs.get(existing_id)
+            if existing is not None and existing.status in ("queued", "running", "done"):
+                self.deduplicated += 1
+                return existing
+
+        if self.queue_depth >= self.max_queue:
+            raise QueueFullError("Fila de OCR cheia")
+
+        job = OCRJob(id=str(uuid.uuid4()), key=key, session_id=session_id, layout=layout)
+        self._jobs[job.id] = job
+        self._by_key[key] = job.id
+        self._tasks[job.id] = asyncio.get_running_loop().create_task(
+            self._execute(job, image_bytes)
+        )
+        return job
+
+    async def run_batch(
+        self,
+        images: List[bytes],
+        layout: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Lê várias imagens em paralelo nos workers, preservando a ordem
+        
+        Cada imagem ocupa uma vaga da fila enquanto estiver pendente.
+        
+        Returns:
+            Um item por imagem, na ordem recebida:
+            {index, status, numbers, error, duration_ms}
+        
+        Raises:
+            QueueFullError: se o lote não cabe na fila
+        """
+        if self.queue_depth + len(images) > self.max_queue:
+            raise QueueFullError("Fila de OCR cheia")
+        
+        self._batch_pending += len(images)
+        try:
+            return list(await asyncio.gather(*(
+                self._execute_batch_item(index, image_bytes, layout)
+                for index, image_bytes in enumerate(images)
+            )))
+        finally:
+            self._batch_pending -= len(images)
+    
+    async def _run_in_slot(
+        self,
+        fn: Callable,
+        *args,
+        on_start: Optional[Callable[[], None]] = None
+    ) -> Dict:
+        """
+        Roda `fn` em um worker ocupando uma vaga do pool
+        
+        No timeout o chamador recebe o erro na hora, mas a vaga só é
+        devolvida quando o processo realmente termina: os jobs seguintes
+        não ficam esperando dentro do executor com o próprio relógio de
+        timeout correndo.
+        
+        Raises:
+            asyncio.TimeoutError: se `fn` passou de `timeout`
+        """
+        loop = asyncio.get_running_loop()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        
+        await self._slots.acquire()
+        handed_off = False
+        try:
+            if on_start is not None:
+                on_start()
+            future = loop.run_in_executor(self._executor, fn, *args)
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                future.add_done_callback(self._release_slot)
+                handed_off = True
+                raise
+        finally:
+            if not handed_off:
+                self._slots.release()
+    
+    def _release_slot(self, future: asyncio.Future) -> None:
+        """Worker atrasado terminou: o resultado é descartado e a vaga volta"""
+        if not future.cancelled():
+            future.exception()
+        self._slots.release()
+    
+    async def _execute_batch_item(self, index: int, image_bytes: bytes, layout: Optional[str]) -> Dict:
+        item = {"index": index, "status": "done", "numbers": [], "error": None, "duration_ms": None}
+        
+        try:
+            result = await self._run_in_slot(_run_ocr_sequence, image_bytes, layout)
+        except asyncio.TimeoutError:
+            item["status"] = "timeout"
+            item["error"] = f"OCR excedeu {self.timeout}s"
+            self.timeouts += 1
+        except Exception as e:
+            item["status"] = "failed"
+            item["error"] = str(e)
+            self.failed += 1
+            logger.error(f"❌ OCR em lote falhou na imagem {index}: {str(e)}")
+        else:
+            item["numbers"] = result["numbers"]
+            item["duration_ms"] = round(result["duration"] * 1000, 2)
+            self.completed += 1
+            self.total_duration += result["duration"]
+            metrics.observe_ocr(result["duration"], "batch")
+            if result.get("cache") is not None:
+                self._worker_cache[result["pid"]] = result["cache"]
+        
+        return item
+    
+    def get(self, job_id: str) -> Optional[OCRJob]:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str) -> Optional[OCRJob]:
+        """Aguarda o término de um job (útil em testes/CLI)"""
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.shield(task)
+        return self._jobs.get(job_id)
+
+    async def _execute(self, job: OCRJob, image_bytes: bytes) -> None:
+        def _start():
+            # Um job por worker: o status "running" reflete execução real
+            job.status = "running"
+            job.started_at = time.time()
+
+        fn = _run_ocr_sequence if job.session_id else _run_ocr
+        try:
+            result = await self._run_in_slot(fn, image_bytes, job.layout, on_start=_start)
+        except asyncio.TimeoutError:
+            job.status = "timeout"
+            job.error = f"OCR excedeu {self.timeout}s"
+            self.timeouts += 1
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            self.failed += 1
+            logger.error(f"❌ Job de OCR {job.id} falhou: {str(e)}")
+        else:
+            job.status = "done"
+            job.numbers = result["numbers"]
+            job.duration = result["duration"]
+            self.completed += 1
+            self.total_duration += result["duration"]
+            metrics.observe_ocr(result["duration"], "job")
+            if result.get("cache") is not None:
+                self._worker_cache[result["pid"]] = result["cache"]
+        finally:
+            job.finished_at = time.time()
+            self._tasks.pop(job.id, None)
+
+        if job.status == "done" and self.on_result is not None:
+            try:
+                self.on_result(job)
+            except Exception as e:
+                logger.error(f"❌ Callback do job {job.id} falhou: {str(e)}")
+
+    def _prune(self) -> None:
+        """Remove jobs finalizados há mais de `result_ttl` segundos"""
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            if self._by_key.get(job.key) == job_id:
+                del self._by_key[job.key]
+
+    def cache_stats(self) -> Optional[Dict]:
+        """Soma as métricas de cache reportadas pelos workers"""
+        if not self._worker_cache:
+            return None
+
+        totals: Dict = {}
+        for stats in self._worker_cache.values():
+            for name, value in stats.items():
+                if name != "hit_ratio":
+                    totals[name] = totals.get(name, 0) + value
+
+        hits = totals.get("hits_exact", 0) + totals.get("hits_perceptual", 0)
+        lookups = hits + totals.get("misses", 0)
+        totals["hit_ratio"] = round(hits / lookups, 4) if lookups else 0.0
+        return totals
+
+    def stats(self) -> Dict:
+        """Métricas da fila (profundidade, resultados, duração média)"""
+        running = sum(1 for job in self._jobs.values() if job.status == "running")
+        return {
+            "queue_depth": self.queue_depth,
+            "running": running,
+            "max_queue": self.max_queue,
+            "workers": self.max_workers,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "deduplicated": self.deduplicated,
+            "avg_duration_ms": round(self.total_duration / self.completed * 1000, 2)
+            if self.completed else None,
+        }
+
+    def shutdown(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,417 @@
+# ======================================================
+# OCR_ROI.PY - Detecção da faixa de histórico (ROI)
+# ======================================================
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Faixas HSV (OpenCV: H 0-179) das fichas vermelhas e verdes
+_RED_LOW_H = 10
+_RED_HIGH_H = 170
+_GREEN_H = (40, 85)
+_MIN_SATURATION = 100
+_MIN_VALUE = 60
+
+# Texto branco dos números: min(V, 255 - S)
+_TEXT_MIN_WHITENESS = 150
+_TEXT_MIN_FRACTION = 0.02
+_MAX_EXTENSION_SLOTS = 64
+
+
+@dataclass
+class Region:
+    """Região de interesse em coordenadas absolutas da imagem"""
+    x: int
+    y: int
+    w: int
+    h: int
+    orientation: str  # "horizontal" | "vertical"
+    source: str  # "detected" | "template" | "cache"
+
+    def crop(self, img: np.ndarray) -> np.ndarray:
+        return img[self.y:self.y + self.h, self.x:self.x + self.w]
+
+
+def chip_mask(rgb: np.ndarray, hsv: Optional[np.ndarray] = None) -> np.ndarray:
+    """Máscara binária das fichas vermelhas/verdes (segmentação por cor)"""
+    if hsv is None:
+        hsv = cv2.cvtColor(rgb, cv2.COLOR_RGB2HSV)
+    h, s, v = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+
+    saturated = (s >= _MIN_SATURATION) & (v >= _MIN_VALUE)
+    red = (h < _RED_LOW_H) | (h > _RED_HIGH_H)
+    green = (h >= _GREEN_H[0]) & (h <= _GREEN_H[1])
+
+    mask = ((red | green) & saturated).astype(np.uint8) * 255
+    kernel = np.ones((3, 3), np.uint8)
+    return cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+
+
+def _chip_boxes(mask: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """Caixas de contornos com formato de ficha (aprox. quadradas)"""
+    min_area = max(16, int(mask.shape[0] * mask.shape[1] * 0.0001))
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    boxes = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if w * h < min_area:
+            continue
+
+        # Fichas da mesma cor encostadas viram um só contorno
+        # (compressão borra o espaço entre elas): divide pela proporção
+        if w > 2 * h:
+            n = round(w / h)
+            step = w / n
+            boxes.extend((x + int(i * step), y, int(step), h) for i in range(n))
+        elif h > 2 * w:
+            n = round(h / w)
+            step = h / n
+            boxes.extend((x, y + int(i * step), w, int(step)) for i in range(n))
+        elif 0.5 <= w / h <= 2.0:
+            boxes.append((x, y, w, h))
+    return boxes
+
+
+def _largest_line(
+    boxes: List[Tuple[int, int, int, int]],
+    axis: int
+) -> List[Tuple[int, int, int, int]]:
+    """
+    Agrupa fichas alinhadas no eixo (0 = mesma linha, 1 = mesma coluna)
+    e retorna o maior grupo
+    """
+    # Centro no eixo perpendicular à faixa
+    def center(b):
+        return b[1] + b[3] / 2 if axis == 0 else b[0] + b[2] / 2
+
+    size = float(np.median([b[3] if axis == 0 else b[2] for b in boxes]))
+    ordered = sorted(boxes, key=center)
+
+    best: List = []
+    group = [ordered[0]]
+    for box in ordered[1:]:
+        if abs(center(box) - center(group[-1])) <= size * 0.5:
+            group.append(box)
+        else:
+            best = group if len(group) > len(best) else best
+            group = [box]
+    return group if len(group) > len(best) else best
+
+
+def _slot_has_text(hsv: np.ndarray) -> bool:
+    """Indica se o recorte contém texto claro (número de uma ficha)"""
+    if hsv.size == 0:
+        return False
+    whiteness = np.minimum(hsv[..., 2], 255 - hsv[..., 1])
+    return (whiteness >= _TEXT_MIN_WHITENESS).mean() >= _TEXT_MIN_FRACTION
+
+
+def detect_history_strip(rgb: np.ndarray) -> Optional[Region]:
+    """
+    Localiza a faixa de números (fichas alinhadas) por contornos e cor
+
+    Fichas pretas não aparecem na máscara de cor, então a faixa é
+    estendida, passo a passo (um espaçamento de ficha), enquanto o
+    próximo espaço ao longo da faixa ainda contém texto.
+    """
+    hsv = cv2.cvtColor(rgb, cv2.COLOR_RGB2HSV)
+    boxes = _chip_boxes(chip_mask(rgb, hsv))
+    if len(boxes) < 2:
+        return None
+
+    row = _largest_line(boxes, axis=0)
+    col = _largest_line(boxes, axis=1)
+    line, orientation = (row, "horizontal") if len(row) >= len(col) else (col, "vertical")
+    if len(line) < 2:
+        return None
+
+    img_h, img_w = rgb.shape[:2]
+    x0 = min(b[0] for b in line)
+    y0 = min(b[1] for b in line)
+    x1 = max(b[0] + b[2] for b in line)
+    y1 = max(b[1] + b[3] for b in line)
+    chip = int(np.median([max(b[2], b[3]) for b in line]))
+
+    # Espaçamento típico entre fichas consecutivas (fichas coloridas
+    # alternadas com pretas ficam a dois ou mais espaçamentos)
+    starts = sorted(b[0] if orientation == "horizontal" else b[1] for b in line)
+    steps = [b - a for a, b in zip(starts, starts[1:]) if b - a > 0]
+    step = min(steps) if steps else chip
+    pitch = max(chip, int(step / max(1, round(step / chip))))
+
+    for _ in range(_MAX_EXTENSION_SLOTS):
+        if orientation == "horizontal":
+            if x0 - pitch < 0 or not _slot_has_text(hsv[y0:y1, x0 - pitch:x0]):
+                break
+            x0 -= pitch
+        else:
+            if y0 - pitch < 0 or not _slot_has_text(hsv[y0 - pitch:y0, x0:x1]):
+                break
+            y0 -= pitch
+
+    for _ in range(_MAX_EXTENSION_SLOTS):
+        if orientation == "horizontal":
+            if x1 + pitch > img_w or not _slot_has_text(hsv[y0:y1, x1:x1 + pitch]):
+                break
+            x1 += pitch
+        else:
+            if y1 + pitch > img_h or not _slot_has_text(hsv[y1:y1 + pitch, x0:x1]):
+                break
+            y1 += pitch
+
+    pad = max(2, chip // 4)
+    x0, y0 = max(0, x0 - pad), max(0, y0 - pad)
+    x1, y1 = min(img_w, x1 + pad), min(img_h, y1 + pad)
+
+    return Region(x0, y0, x1 - x0, y1 - y0, orientation, "detected")
+
+
+def region_fits(rgb: np.ndarray, region: Region) -> bool:
+    """
+    Confere se uma região reaproveitada ainda enquadra a faixa
+
+    Falha se o recorte tem menos de duas fichas, se alguma ficha
+    encosta na borda ao longo da faixa ou se há texto logo depois de
+    uma das pontas: outro layout com a mesma resolução, ou a faixa
+    cresceu além da região. Regiões de template (fixadas pelo operador)
+    não são conferidas.
+    """
+    if region.source == "template":
+        return True
+
+    img_h, img_w = rgb.shape[:2]
+    if region.x + region.w > img_w or region.y + region.h > img_h:
+        return False
+
+    strip = region.crop(rgb)
+    boxes = _chip_boxes(chip_mask(strip))
+    if len(boxes) < 2:
+        return False
+
+    horizontal = region.orientation == "horizontal"
+    length = region.w if horizontal else region.h
+    for x, y, w, h in boxes:
+        start, size = (x, w) if horizontal else (y, h)
+        if start <= 0 or start + size >= length:
+            return False
+
+    # Meia ficha além de cada ponta
+    margin = max(1, (region.h if horizontal else region.w) // 2)
+    if horizontal:
+        outside = (
+            rgb[region.y:region.y + region.h, max(0, region.x - margin):region.x],
+            rgb[region.y:region.y + region.h, region.x + region.w:region.x + region.w + margin],
+        )
+    else:
+        outside = (
+            rgb[max(0, region.y - margin):region.y, region.x:region.x + region.w],
+            rgb[region.y + region.h:region.y + region.h + margin, region.x:region.x + region.w],
+        )
+    return not any(
+        slot.size and _slot_has_text(cv2.cvtColor(slot, cv2.COLOR_RGB2HSV))
+        for slot in outside
+    )
+
+
+def region_from_template(
+    template: Sequence[float],
+    shape: Tuple[int, ...]
+) -> Region:
+    """Converte um template relativo (x, y, w, h em 0-1) em região absoluta"""
+    img_h, img_w = shape[:2]
+    rx, ry, rw, rh = template
+    x, y = int(rx * img_w), int(ry * img_h)
+    w, h = max(1, int(rw * img_w)), max(1, int(rh * img_h))
+    orientation = "horizontal" if w >= h else "vertical"
+    return Region(x, y, min(w, img_w - x), min(h, img_h - y), orientation, "template")
+
+
+def normalize_scale(
+    gray: np.ndarray,
+    orientation: str,
+    target: int,
+    max_dimension: int
+) -> np.ndarray:
+    """
+    Reescala para o lado curto da faixa ficar com `target` pixels
+
+    Também garante que o maior lado não passe de `max_dimension`.
+    """
+    h, w = gray.shape[:2]
+    short = h if orientation == "horizontal" else w
+    scale = target / short if short else 1.0
+    scale = min(scale, max_dimension / max(h, w))
+
+    if abs(scale - 1.0) < 0.05:
+        return gray
+
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+    return cv2.resize(
+        gray,
+        (max(1, int(w * scale)), max(1, int(h * scale))),
+        interpolation=interpolation
+    )
+
+
+class RegionCache:
+    """
+    Cache LRU de regiões por layout de origem
+
+    A chave é o layout informado pelo cliente ou, na falta dele, a
+    resolução da imagem. A resolução sozinha não identifica o layout
+    (skins diferentes com o mesmo tamanho), então cada reaproveitamento
+    é conferido contra a imagem (`region_fits`). Junto da região fica o
+    número de fichas da última leitura em ordem de tela feita com ela.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._regions: "OrderedDict[str, Region]" = OrderedDict()
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(shape: Tuple[int, ...], layout: Optional[str] = None) -> str:
+        return f"layout:{layout}" if layout else f"size:{shape[1]}x{shape[0]}"
+
+    def get(self, key: str) -> Optional[Region]:
+        with self._lock:
+            region = self._regions.get(key)
+            if region is None:
+                return None
+            self._regions.move_to_end(key)
+            return Region(region.x, region.y, region.w, region.h, region.orientation, "cache")
+
+    def put(self, key: str, region: Region) -> None:
+        with self._lock:
+            self._regions[key] = region
+            self._regions.move_to_end(key)
+            self._counts.pop(key, None)
+            if len(self._regions) > self.max_entries:
+                evicted, _ = self._regions.popitem(last=False)
+                self._counts.pop(evicted, None)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._regions.pop(key, None)
+            self._counts.pop(key, None)
+
+    def record_count(self, key: str, count: int) -> bool:
+        """
+        Registra as fichas lidas com a região da chave
+
+        Retorna False se a contagem caiu em relação à leitura anterior
+        (faixa cortada: a região não serve mais).
+        """
+        with self._lock:
+            if key not in self._regions:
+                return True
+            if count < self._counts.get(key, 0):
+                return False
+            self._counts[key] = count
+            return True
+
+
+class ROIPreprocessor:
+    """
+    Estágio de pré-processamento antes das estratégias de OCR
+
+    Ordem: template configurado → cache do layout (conferido contra a
+    imagem) → detecção por contornos/cor. Sem região, usa a imagem
+    inteira (só limitando o tamanho máximo).
+    """
+
+    def __init__(
+        self,
+        templates: Optional[Dict[str, Sequence[float]]] = None,
+        target_height: int = 64,
+        max_dimension: int = 2000,
+        cache_size: int = 64
+    ):
+        self.templates = dict(templates or {})
+        self.target_height = target_height
+        self.max_dimension = max_dimension
+        self.cache = RegionCache(cache_size)
+
+    def locate(self, rgb: np.ndarray, layout: Optional[str] = None) -> Tuple[Optional[Region], str]:
+        """Retorna (região, chave do cache)"""
+        key = RegionCache.key_for(rgb.shape, layout)
+
+        # Template: posição fixa, sem cache
+        if layout and layout in self.templates:
+            return region_from_template(self.templates[layout], rgb.shape), key
+
+        region = self.cache.get(key)
+        if region is not None:
+            if region_fits(rgb, region):
+                return region, key
+            # Mesma resolução, outro layout (ou a faixa cresceu)
+            self.cache.invalidate(key)
+
+        region = detect_history_strip(rgb)
+        if region is not None:
+            self.cache.put(key, region)
+        return region, key
+
+    def confirm(
+        self,
+        rgb: np.ndarray,
+        region: Optional[Region],
+        count: int,
+        layout: Optional[str] = None,
+        ordered: bool = True
+    ) -> bool:
+        """
+        Confere a região depois de uma leitura; False = descartada
+
+        Descarta a região em cache se a leitura veio vazia, se a faixa
+        encosta na borda da região ou, em leituras em ordem de tela
+        (`ordered`, uma entrada por ficha), se a contagem caiu em
+        relação à leitura anterior com a mesma região.
+        """
+        if region is None or region.source == "template":
+            return True
+
+        key = RegionCache.key_for(rgb.shape, layout)
+        fits = count > 0 and region_fits(rgb, region)
+        if fits and ordered:
+            fits = self.cache.record_count(key, count)
+        if not fits:
+            logger.info("🔄 Região da faixa descartada (%s)", key)
+            self.cache.invalidate(key)
+        return fits
+
+    def apply(
+        self,
+        rgb: np.ndarray,
+        gray: np.ndarray,
+        layout: Optional[str] = None
+    ) -> Tuple[np.ndarray, Optional[Region], str]:
+        """
+        Recorta e normaliza a escala do grayscale
+
+        Returns:
+            (grayscale processado, região usada ou None, chave do cache)
+        """
+        region, key = self.locate(rgb, layout)
+
+        if region is None:
+            return normalize_scale(gray, "horizontal", gray.shape[0], self.max_dimension), None, key
+
+        cropped = region.crop(gray)
+        return normalize_scale(
+            cropped,
+            region.orientation,
+            self.target_height,
+            self.max_dimension
+        ), region, key
@@ -9,7 +9,15 @@ import re
 from PIL import Image
 import io
 import logging
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from app.core.config import settings
+from app.services.ocr_backends import OCRBackend, PytesseractBackend, create_backend
+from app.services.ocr_cache import OCRResultCache, content_hash, strip_hash
+from app.services.ocr_roi import ROIPreprocessor, RegionCache, normalize_scale
+from app.services.ocr_stream import FrameStreamProcessor
+from app.services.ocr_templates import ChipReading, TemplateDigitRecognizer
 
 
 logger = logging.getLogger(__name__)
@@ -21,9 +29,72 @@ class OCRService:
     Com tratamento robusto de erros e múltiplas estratégias
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        early_exit: Optional[bool] = None,
+        backend: Optional[Union[str, OCRBackend]] = None,
+        roi_enabled: Optional[bool] = None,
+        cache: Optional[OCRResultCache] = None,
+        template_enabled: Optional[bool] = None
+    ):
         self._verify_tesseract()
-        logger.info("✅ OCRService inicializado")
+        
+        # Pool limitado: o Tesseract roda fora do GIL (engine C ou
+        # subprocesso) e o OpenCV também o libera, então threads bastam
+        self.max_workers = max_workers or settings.OCR_MAX_WORKERS
+        
+        # Backend persistente (pool de engines) com pytesseract de fallback
+        if isinstance(backend, OCRBackend):
+            self.backend = backend
+        else:
+            self.backend = create_backend(
+                backend or settings.OCR_BACKEND,
+                pool_size=self.max_workers
+            )
+        self._fallback_backend = PytesseractBackend()
+        self.early_exit = (
+            early_exit if early_exit is not None else settings.OCR_EARLY_EXIT
+        )
+        
+        # Recorte da faixa de histórico antes das estratégias
+        if roi_enabled if roi_enabled is not None else settings.OCR_ROI_ENABLED:
+            self.roi: Optional[ROIPreprocessor] = ROIPreprocessor(
+                templates=settings.OCR_LAYOUT_TEMPLATES,
+                target_height=settings.OCR_ROI_TARGET_HEIGHT,
+                max_dimension=settings.OCR_MAX_DIMENSION,
+                cache_size=settings.OCR_ROI_CACHE_SIZE,
+            )
+        else:
+            self.roi = None
+        
+        # Cache de resultados por hash exato + perceptual
+        if cache is not None:
+            self.cache: Optional[OCRResultCache] = cache
+        elif settings.OCR_CACHE_ENABLED:
+            self.cache = OCRResultCache(
+                max_bytes=settings.OCR_CACHE_MAX_BYTES,
+                phash_distance=settings.OCR_CACHE_PHASH_DISTANCE,
+                perceptual=settings.OCR_CACHE_PERCEPTUAL,
+                scan_limit=settings.OCR_CACHE_PHASH_SCAN,
+            )
+        else:
+            self.cache = None
+        
+        # Caminho rápido: template matching das fichas (sem Tesseract)
+        self.template_recognizer: Optional[TemplateDigitRecognizer] = None
+        if template_enabled if template_enabled is not None else settings.OCR_TEMPLATE_ENABLED:
+            self.template_recognizer = TemplateDigitRecognizer(
+                fonts=settings.OCR_TEMPLATE_FONTS or (None,),
+                template_dir=settings.OCR_TEMPLATE_DIR or None,
+                min_confidence=settings.OCR_TEMPLATE_MIN_CONFIDENCE,
+            )
+        
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="ocr"
+        )
+        logger.info(f"✅ OCRService inicializado (backend: {self.backend.name})")
     
     def _verify_tesseract(self):
         """Verifica se Tesseract está instalado"""
@@ -35,36 +106,87 @@ class OCRService:
                 "OCR pode não funcionar corretamente."
             )
     
-    def process_image(self, image_bytes: bytes) -> List[int]:
+    def _decode_image(self, image_bytes: bytes) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Decodifica a imagem uma única vez
+        
+        Returns:
+            (RGB, grayscale) - arrays somente leitura compartilhados
+            entre a detecção de ROI e as estratégias
+        """
+        rgb = np.array(Image.open(io.BytesIO(image_bytes)).convert("RGB"))
+        gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+        rgb.setflags(write=False)
+        gray.setflags(write=False)
+        return rgb, gray
+    
+    def process_image(
+        self,
+        image_bytes: bytes,
+        layout: Optional[str] = None
+    ) -> List[int]:
         """
         Processa imagem e extrai números
         
+        A imagem é decodificada uma vez, recortada na faixa de histórico
+        (ROI) e as estratégias rodam em paralelo no pool de workers.
+        Com early exit, o resultado é devolvido assim que duas
+        estratégias concordam.
+        
         Args:
             image_bytes: Bytes da imagem
+            layout: Identificador opcional do layout/mesa de origem
             
         Returns:
             Lista de números encontrados (0-36)
         """
         try:
-            # Tentar múltiplas estratégias de processamento
-            strategies = [
-                self._strategy_basic,
-                self._strategy_adaptive,
-                self._strategy_bilateral,
-            ]
-            
-            all_numbers = set()
-            
-            for strategy in strategies:
-                try:
-                    numbers = strategy(image_bytes)
-                    all_numbers.update(numbers)
-                except Exception as e:
-                    logger.warning(f"Estratégia falhou: {strategy.__name__}: {str(e)}")
-                    continue
-            
-            result = sorted(list(all_numbers))
-            logger.info(f"✅ OCR extraiu {len(result)} números: {result}")
+            # Upload repetido: nem decodifica a imagem
+            exact_key = None
+            if self.cache is not None:
+                exact_key = content_hash(image_bytes, layout)
+                cached = self.cache.get_exact(exact_key)
+                if cached is not None:
+                    return cached
+            
+            rgb, gray = self._decode_image(image_bytes)
+            
+            region = None
+            strip = rgb
+            if self.roi is not None:
+                gray, region, _ = self.roi.apply(rgb, gray, layout)
+                if region is not None:
+                    strip = region.crop(rgb)
+            
+            # Mesma faixa de histórico (recompressão, outro viewer): só
+            # compara a faixa recortada, nunca a tela inteira
+            phash = None
+            if self.cache is not None and self.cache.perceptual and region is not None:
+                phash = strip_hash(gray, region.orientation)
+                cached = self.cache.get_similar(phash, layout)
+                if cached is not None:
+                    self.cache.put(exact_key, cached, phash, layout)
+                    return cached
+            if self.cache is not None:
+                self.cache.record_miss()
+            
+            readings = self._strategy_template(strip)
+            if readings is not None:
+                result = sorted({r.number for r in readings})
+            else:
+                result = self._run_strategies(gray)
+            
+            # Leitura vazia ou faixa cortada: a região sai do cache
+            if self.roi is not None:
+                if readings is not None:
+                    self.roi.confirm(rgb, region, len(readings), layout)
+                else:
+                    self.roi.confirm(rgb, region, len(result), layout, ordered=False)
+            
+            if self.cache is not None and result:
+                self.cache.put(exact_key, result, phash, layout)
+            
+            logger.info("✅ OCR extraiu %d números: %s", len(result), result)
             
             return result
             
@@ -72,33 +194,217 @@ class OCRService:
             logger.error(f"❌ Erro no OCR: {str(e)}", exc_info=True)
             return []
     
-    def _strategy_basic(self, image_bytes: bytes) -> List[int]:
-        """Estratégia básica de OCR"""
-        # Converter bytes para imagem
-        image = Image.open(io.BytesIO(image_bytes)).convert("L")
-        img = np.array(image)
+    def recognize_chips(
+        self,
+        image_bytes: bytes,
+        layout: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Lê as fichas por template matching, em ordem de tela
+        
+        Returns:
+            Lista de {number, color, confidence, source, box}; fichas
+            com baixa confiança passam pelo Tesseract
+        """
+        if self.template_recognizer is None:
+            return []
+        
+        rgb, _ = self._decode_image(image_bytes)
+        region = None
+        strip = rgb
+        if self.roi is not None:
+            region, _ = self.roi.locate(rgb, layout)
+            if region is not None:
+                strip = region.crop(rgb)
+        
+        readings = self.template_recognizer.recognize(strip, fallback=self._ocr)
+        if self.roi is not None:
+            self.roi.confirm(rgb, region, len(readings), layout)
+        return [r.to_dict() for r in readings]
+    
+    def read_sequence(
+        self,
+        image_bytes: bytes,
+        layout: Optional[str] = None
+    ) -> List[int]:
+        """
+        Lê os números de um screenshot em ordem de tela, com repetições
+        
+        Diferente de `process_image` (conjunto ordenado), preserva a
+        sequência da faixa de histórico, necessária para reconstruir o
+        histórico a partir de vários screenshots. Usa o mesmo cache de
+        resultados, com chave própria (`seq:`): upload repetido não
+        decodifica a imagem.
+        """
+        try:
+            exact_key = None
+            if self.cache is not None:
+                exact_key = "seq:" + content_hash(image_bytes, layout)
+                cached = self.cache.get_exact(exact_key)
+                if cached is not None:
+                    return cached
+                self.cache.record_miss()
+            
+            rgb, _ = self._decode_image(image_bytes)
+            region = None
+            strip = rgb
+            if self.roi is not None:
+                region, _ = self.roi.locate(rgb, layout)
+                if region is not None:
+                    strip = region.crop(rgb)
+            numbers = self.read_strip(strip)
+            if self.roi is not None:
+                self.roi.confirm(rgb, region, len(numbers), layout)
+            if self.cache is not None and numbers:
+                self.cache.put(exact_key, numbers, layout=layout)
+            return numbers
+        except Exception as e:
+            logger.error(f"❌ Erro no OCR: {str(e)}", exc_info=True)
+            return []
+    
+    def read_strip(self, rgb: np.ndarray) -> List[int]:
+        """
+        Lê a faixa de histórico (RGB já recortado) em ordem de tela
+        
+        Usa o template matching; sem leitura confiável, cai para o
+        Tesseract na faixa inteira (que preserva a ordem do texto).
+        """
+        readings = self._strategy_template(rgb)
+        if readings is not None:
+            return [r.number for r in readings]
+        
+        gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+        if self.roi is not None:
+            orientation = "horizontal" if gray.shape[1] >= gray.shape[0] else "vertical"
+            gray = normalize_scale(
+                gray,
+                orientation,
+                self.roi.target_height,
+                self.roi.max_dimension
+            )
+        return self._strategy_basic(gray)
+    
+    def frame_stream(
+        self,
+        on_spins: Optional[Callable[[List[int]], None]] = None,
+        layout: Optional[str] = None
+    ) -> FrameStreamProcessor:
+        """
+        Cria um processador de frames (vídeo/capturas) com detecção de mudança
+        
+        Args:
+            on_spins: Recebe os spins novos em ordem cronológica, ex.:
+                lambda nums: session_manager.add_spins(session_id, nums)
+            layout: Layout de origem (usa template/cache de ROI)
+        """
+        kwargs = {}
+        if self.roi is not None:
+            kwargs["locate"] = lambda frame: self.roi.locate(frame, layout)[0]
+            kwargs["on_region_lost"] = lambda frame: self.roi.cache.invalidate(
+                RegionCache.key_for(frame.shape, layout)
+            )
+        
+        return FrameStreamProcessor(
+            recognize=self.read_strip,
+            on_spins=on_spins,
+            diff_threshold=settings.OCR_STREAM_DIFF_THRESHOLD,
+            newest_first=settings.OCR_STREAM_NEWEST_FIRST,
+            max_new_per_frame=settings.OCR_STREAM_MAX_NEW_PER_FRAME,
+            min_overlap=settings.OCR_STREAM_MIN_OVERLAP,
+            **kwargs
+        )
+    
+    def _strategy_template(self, rgb: np.ndarray) -> Optional[List[ChipReading]]:
+        """
+        Estratégia por template matching
+        
+        Retorna None (para usar as estratégias Tesseract completas) se
+        nenhuma ficha foi segmentada ou se alguma ficha continuou com
+        baixa confiança mesmo após o fallback.
+        """
+        if self.template_recognizer is None:
+            return None
+        
+        try:
+            readings = self.template_recognizer.recognize(rgb, fallback=self._ocr)
+        except Exception as e:
+            logger.warning(f"Estratégia falhou: _strategy_template: {str(e)}")
+            return None
+        
+        if not readings:
+            return None
+        
+        min_confidence = self.template_recognizer.min_confidence
+        if any(r.source == "template" and r.confidence < min_confidence for r in readings):
+            return None
+        
+        return readings
+    
+    def _run_strategies(self, gray: np.ndarray) -> List[int]:
+        """Executa as estratégias em paralelo sobre o mesmo grayscale"""
+        # Tentar múltiplas estratégias de processamento
+        strategies = [
+            self._strategy_basic,
+            self._strategy_adaptive,
+            self._strategy_bilateral,
+        ]
+        
+        futures = {
+            self._executor.submit(strategy, gray): strategy
+            for strategy in strategies
+        }
         
+        all_numbers = set()
+        seen_results: List[List[int]] = []
+        
+        for future in as_completed(futures):
+            strategy = futures[future]
+            try:
+                numbers = future.result()
+            except Exception as e:
+                logger.warning(f"Estratégia falhou: {strategy.__name__}: {str(e)}")
+                continue
+            
+            if self.early_exit and numbers and numbers in seen_results:
+                # Duas estratégias concordam: descarta as restantes
+                for pending in futures:
+                    pending.cancel()
+                all_numbers = set(numbers)
+                break
+            
+            seen_results.append(numbers)
+            all_numbers.update(numbers)
+        
+        return sorted(list(all_numbers))
+    
+    def _ocr(self, img: np.ndarray) -> List[int]:
+        """Executa o Tesseract na imagem pré-processada"""
+        try:
+            text = self.backend.recognize(img)
+        except Exception as e:
+            if self.backend is self._fallback_backend:
+                raise
+            logger.warning(f"Backend {self.backend.name} falhou, usando pytesseract: {str(e)}")
+            text = self._fallback_backend.recognize(img)
+        
+        return self._extract_valid_numbers(text)
+    
+    def _strategy_basic(self, gray: np.ndarray) -> List[int]:
+        """Estratégia básica de OCR"""
         # Threshold simples
         _, img = cv2.threshold(
-            img, 
+            gray, 
             0, 
             255, 
             cv2.THRESH_BINARY + cv2.THRESH_OTSU
         )
         
-        # OCR
-        config = "--psm 6 -c tessedit_char_whitelist=0123456789"
-        text = pytesseract.image_to_string(img, config=config)
-        
-        return self._extract_valid_numbers(text)
+        return self._ocr(img)
     
-    def _strategy_adaptive(self, image_bytes: bytes) -> List[int]:
+    def _strategy_adaptive(self, gray: np.ndarray) -> List[int]:
         """Estratégia com threshold adaptativo"""
-        image = Image.open(io.BytesIO(image_bytes)).convert("L")
-        img = np.array(image)
-        
         # Equalizar histograma
-        img = cv2.equalizeHist(img)
+        img = cv2.equalizeHist(gray)
         
         # Threshold adaptativo
         img = cv2.adaptiveThreshold(
@@ -114,20 +420,10 @@ class OCRService:
         kernel = np.ones((2, 2), np.uint8)
         img = cv2.morphologyEx(img, cv2.MORPH_OPEN, kernel)
         
-        # OCR
-        config = "--psm 6 -c tessedit_char_whitelist=0123456789"
-        text = pytesseract.image_to_string(img, config=config)
-        
-        return self._extract_valid_numbers(text)
+        return self._ocr(img)
     
-    def _strategy_bilateral(self, image_bytes: bytes) -> List[int]:
+    def _strategy_bilateral(self, gray: np.ndarray) -> List[int]:
         """Estratégia com filtro bilateral (preserva bordas)"""
-        image = Image.open(io.BytesIO(image_bytes))
-        img = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-        
-        # Converter para grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
         # Filtro bilateral (suaviza mas preserva bordas)
         filtered = cv2.bilateralFilter(gray, 9, 75, 75)
         
@@ -139,11 +435,7 @@ class OCRService:
             cv2.THRESH_BINARY + cv2.THRESH_OTSU
         )
         
-        # OCR
-        config = "--psm 6 -c tessedit_char_whitelist=0123456789"
-        text = pytesseract.image_to_string(thresh, config=config)
-        
-        return self._extract_valid_numbers(text)
+        return self._ocr(thresh)
     
     def _extract_valid_numbers(self, text: str) -> List[int]:
         """
@@ -170,6 +462,11 @@ class OCRService:
         
         return valid
     
+    def shutdown(self) -> None:
+        """Encerra o pool de workers e o backend de OCR"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.backend.close()
+    
     def validate_image(self, image_bytes: bytes) -> tuple[bool, Optional[str]]:
         """
         Valida se a imagem pode ser processada
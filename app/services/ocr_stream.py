@@ -0,0 +1,349 @@
+# ======================================================
+# OCR_STREAM.PY - OCR de sequência de frames (vídeo/diretório)
+# ======================================================
+
+import logging
+import os
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import cv2
+import numpy as np
+
+from app.services.ocr_roi import Region, detect_history_strip, region_fits
+
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+MIN_OVERLAP = 3  # números em comum exigidos entre duas leituras
+
+
+# ======================================================
+# FONTES DE FRAMES
+# ======================================================
+
+def iter_video_frames(path: str, every: int = 1) -> Iterator[np.ndarray]:
+    """Lê frames RGB de um arquivo de vídeo (um a cada `every`)"""
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError(f"Não foi possível abrir o vídeo: {path}")
+
+    try:
+        index = 0
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            if index % every == 0:
+                yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            index += 1
+    finally:
+        capture.release()
+
+
+def iter_image_dir(path: str) -> Iterator[np.ndarray]:
+    """Lê frames RGB de um diretório de capturas (ordem alfabética)"""
+    for name in sorted(os.listdir(path)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        frame = cv2.imread(os.path.join(path, name), cv2.IMREAD_COLOR)
+        if frame is not None:
+            yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def iter_frames(path: str, every: int = 1) -> Iterator[np.ndarray]:
+    """Vídeo ou diretório de imagens"""
+    if os.path.isdir(path):
+        return iter_image_dir(path)
+    return iter_video_frames(path, every=every)
+
+
+# ======================================================
+# DETECÇÃO DE NOVOS NÚMEROS
+# ======================================================
+
+def new_numbers(
+    previous: List[int],
+    current: List[int],
+    newest_first: bool = True,
+    min_overlap: int = MIN_OVERLAP
+) -> Optional[List[int]]:
+    """
+    Compara duas leituras da faixa e retorna os números novos
+
+    Com `newest_first` a faixa cresce pela esquerda e os antigos
+    deslizam para a direita (e saem no fim). Retorna os novos em ordem
+    cronológica, [] se nada mudou, ou None se as leituras não se
+    sobrepõem (troca de mesa, leitura ruim).
+
+    A sobreposição precisa ter ao menos `min_overlap` números (ou a
+    leitura inteira, se for mais curta): um único número em comum
+    casa por acaso 1 vez em 37.
+    """
+    if not newest_first:
+        previous, current = previous[::-1], current[::-1]
+
+    required = min(min_overlap, len(previous), len(current))
+    if required < 1:
+        return None
+
+    for k in range(len(current) - required + 1):
+        tail = current[k:]
+        if previous[:len(tail)] == tail:
+            return current[:k][::-1]
+
+    return None
+
+
+def strip_additions(
+    history_tail: List[int],
+    strip: List[int],
+    newest_first: bool = True,
+    min_overlap: int = MIN_OVERLAP
+) -> List[int]:
+    """
+    Números de uma leitura da faixa que ainda não estão no histórico
+
+    `history_tail` é o fim do histórico da sessão (ordem cronológica) e
+    `strip` a leitura em ordem de tela. A parte da faixa que coincide
+    com o fim do histórico é descartada; sem sobreposição, a faixa
+    inteira entra. Retorna os números em ordem cronológica.
+    """
+    if not strip:
+        return []
+
+    previous = history_tail[::-1] if newest_first else list(history_tail)
+    added = new_numbers(previous, strip, newest_first, min_overlap) if history_tail else None
+    if added is None:
+        added = strip[::-1] if newest_first else list(strip)
+    return added
+
+
+def merge_sequences(
+    sequences: Iterable[List[int]],
+    newest_first: bool = True,
+    min_overlap: int = MIN_OVERLAP
+) -> List[int]:
+    """
+    Junta leituras sucessivas da faixa em um histórico único
+    
+    Cada leitura é comparada com a anterior (`new_numbers`) e só os
+    números novos são acrescentados, então a sobreposição entre
+    screenshots não duplica spins. Leituras sem sobreposição entram
+    inteiras. Retorna o histórico em ordem cronológica.
+    """
+    merged: List[int] = []
+    previous: Optional[List[int]] = None
+
+    for current in sequences:
+        if not current:
+            continue
+
+        added = (
+            new_numbers(previous, current, newest_first, min_overlap)
+            if previous is not None else None
+        )
+        if added is None:
+            added = current[::-1] if newest_first else list(current)
+
+        merged.extend(added)
+        previous = current
+
+    return merged
+
+
+@dataclass
+class FrameStreamStats:
+    frames: int = 0
+    changed: int = 0
+    recognitions: int = 0
+    spins: int = 0
+    resyncs: int = 0
+    relocations: int = 0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass
+class FrameEvent:
+    """Novos números detectados em um frame"""
+    frame: int
+    numbers: List[int]
+    strip: List[int] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class FrameStreamProcessor:
+    """
+    Processa uma sequência de frames com detecção de mudança
+
+    Só a faixa de histórico é comparada entre frames (miniatura em
+    grayscale). O reconhecimento roda apenas quando a faixa mudou em
+    relação à última leitura e já estabilizou (parou a animação), então
+    o custo acompanha a frequência de spins, não o frame rate.
+    """
+
+    def __init__(
+        self,
+        recognize: Callable[[np.ndarray], List[int]],
+        on_spins: Optional[Callable[[List[int]], None]] = None,
+        locate: Callable[[np.ndarray], Optional[Region]] = detect_history_strip,
+        on_region_lost: Optional[Callable[[np.ndarray], None]] = None,
+        diff_threshold: float = 0.02,
+        newest_first: bool = True,
+        max_new_per_frame: int = 5,
+        min_overlap: int = MIN_OVERLAP,
+        thumbnail_width: int = 256
+    ):
+        """
+        Args:
+            recognize: Lê a faixa (RGB recortado) em ordem de tela
+            on_spins: Recebe os novos números em ordem cronológica
+                (ex.: session_manager.add_spins)
+            locate: Localiza a faixa; chamado até encontrar uma região,
+                que então é reutilizada enquanto continuar servindo
+            on_region_lost: Chamado com o frame quando a região deixa de
+                enquadrar a faixa (ex.: invalida o cache de regiões)
+        """
+        self.recognize = recognize
+        self.on_spins = on_spins
+        self.locate = locate
+        self.on_region_lost = on_region_lost
+        self.region: Optional[Region] = None
+        self._region_count: Optional[int] = None  # fichas da última leitura com a região
+        self.diff_threshold = diff_threshold
+        self.newest_first = newest_first
+        self.max_new_per_frame = max_new_per_frame
+        self.min_overlap = min_overlap
+        self.thumbnail_width = thumbnail_width
+
+        self.stats = FrameStreamStats()
+        self._previous_thumb: Optional[np.ndarray] = None
+        self._recognized_thumb: Optional[np.ndarray] = None
+        self._strip: Optional[List[int]] = None
+
+    def _thumbnail(self, strip: np.ndarray) -> np.ndarray:
+        gray = cv2.cvtColor(strip, cv2.COLOR_RGB2GRAY)
+        h, w = gray.shape
+        width = min(self.thumbnail_width, w)
+        height = max(1, int(h * width / w))
+        return cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def _differs(self, a: Optional[np.ndarray], b: np.ndarray) -> bool:
+        if a is None or a.shape != b.shape:
+            return True
+        return float(np.abs(a - b).mean()) / 255.0 > self.diff_threshold
+
+    def feed(self, frame: np.ndarray) -> Optional[FrameEvent]:
+        """Processa um frame RGB; retorna um evento se houver spins novos"""
+        index = self.stats.frames
+        self.stats.frames += 1
+
+        if self.region is None:
+            self.region = self.locate(frame)
+            if self.region is None:
+                return None
+
+        strip = self.region.crop(frame)
+        thumb = self._thumbnail(strip)
+
+        moving = self._differs(self._previous_thumb, thumb) and self._previous_thumb is not None
+        self._previous_thumb = thumb
+
+        if not self._differs(self._recognized_thumb, thumb):
+            return None
+        self.stats.changed += 1
+
+        # Espera a faixa estabilizar antes de ler (animação da ficha)
+        if moving:
+            return None
+
+        self._recognized_thumb = thumb
+        self.stats.recognitions += 1
+        current = self.recognize(strip)
+
+        # Leitura vazia, com menos fichas que a anterior ou faixa
+        # encostando na borda: relocaliza no próximo frame
+        if (
+            not current
+            or (self._region_count is not None and len(current) < self._region_count)
+            or not region_fits(frame, self.region)
+        ):
+            self._lose_region(frame, index)
+            return None
+        self._region_count = len(current)
+
+        if self._strip is None:
+            self._strip = current
+            return None
+
+        added = new_numbers(self._strip, current, self.newest_first, self.min_overlap)
+        self._strip = current
+
+        if added is None or len(added) > self.max_new_per_frame:
+            # Sem sobreposição: a faixa passa a ser a nova referência
+            self.stats.resyncs += 1
+            logger.warning(f"⚠️  Frame {index}: faixa sem sobreposição, ressincronizando")
+            return None
+
+        if not added:
+            return None
+
+        self.stats.spins += len(added)
+        if self.on_spins is not None:
+            self.on_spins(added)
+        return FrameEvent(frame=index, numbers=added, strip=current)
+
+    def _lose_region(self, frame: np.ndarray, index: int) -> None:
+        self.stats.relocations += 1
+        logger.info(f"🔄 Frame {index}: região da faixa descartada, relocalizando")
+        if self.on_region_lost is not None:
+            self.on_region_lost(frame)
+        self.region = None
+        self._region_count = None
+        self._previous_thumb = None
+        self._recognized_thumb = None
+
+    def run(self, frames: Iterable[np.ndarray]) -> Iterator[FrameEvent]:
+        """Processa todos os frames, emitindo eventos incrementalmente"""
+        for frame in frames:
+            event = self.feed(frame)
+            if event is not None:
+                yield event
+
+
+# ======================================================
+# FUNÇÃO AUXILIAR PARA TESTES
+# ======================================================
+
+def test_frame_stream():
+    """Processa um vídeo ou diretório local e imprime os spins detectados"""
+    import sys
+    import time
+
+    from app.services.ocr_service import OCRService
+
+    if len(sys.argv) < 2:
+        print("Uso: python -m app.services.ocr_stream <video|diretório> [a_cada_n_frames]")
+        return
+
+    every = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    service = OCRService()
+
+    started = time.perf_counter()
+    processor = service.frame_stream()
+    for event in processor.run(iter_frames(sys.argv[1], every=every)):
+        print(f"🎯 Frame {event.frame}: novos {event.numbers}")
+
+    elapsed = time.perf_counter() - started
+    stats = processor.stats.to_dict()
+    print(f"📊 {stats} em {elapsed:.2f}s ({stats['frames'] / elapsed:.1f} frames/s)")
+    service.shutdown()
+
+
+if __name__ == "__main__":
+    test_frame_stream()
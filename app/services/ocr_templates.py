@@ -0,0 +1,325 @@
+# ======================================================
+# OCR_TEMPLATES.PY - Reconhecimento por template matching
+# ======================================================
+
+import logging
+import os
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from app.engines.ai_engine import color as number_color
+
+
+logger = logging.getLogger(__name__)
+
+GLYPH_SIZE = 32  # lado do quadrado normalizado (px)
+NUMBERS = list(range(37))
+
+# Texto claro sobre ficha colorida: min(V, 255 - S)
+_TEXT_MIN_INTENSITY = 150
+
+
+@dataclass
+class ChipReading:
+    """Número lido em uma ficha"""
+    number: int
+    color: str
+    confidence: float
+    source: str  # "template" | "tesseract"
+    box: Tuple[int, int, int, int]
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def _normalize_glyph(intensity: np.ndarray, threshold: int = 127) -> Optional[np.ndarray]:
+    """
+    Recorta o texto, centraliza num quadrado (mantendo proporção) e
+    reduz para GLYPH_SIZE x GLYPH_SIZE. Retorna vetor float32 de média
+    zero e norma 1 (pronto para correlação normalizada).
+
+    `intensity` é um mapa 0-255 do texto (claro = texto); os tons
+    intermediários do anti-aliasing são preservados.
+    """
+    ys, xs = np.nonzero(intensity > threshold)
+    if len(xs) == 0:
+        return None
+
+    crop = intensity[ys.min():ys.max() + 1, xs.min():xs.max() + 1]
+    h, w = crop.shape
+    side = max(h, w)
+    square = np.zeros((side, side), dtype=np.uint8)
+    y0, x0 = (side - h) // 2, (side - w) // 2
+    square[y0:y0 + h, x0:x0 + w] = crop
+
+    glyph = cv2.resize(square, (GLYPH_SIZE, GLYPH_SIZE), interpolation=cv2.INTER_AREA)
+    vec = glyph.astype(np.float32).ravel()
+    vec -= vec.mean()
+    norm = np.linalg.norm(vec)
+    if norm == 0:
+        return None
+    return vec / norm
+
+
+def _load_font(path: Optional[str], size: int):
+    if path:
+        return ImageFont.truetype(path, size)
+    return ImageFont.load_default(size=size)
+
+
+def render_templates(fonts: Sequence[Optional[str]] = (None,), size: int = 48) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Renderiza os números 0-36 em cada fonte
+
+    Returns:
+        (matriz de templates [N x GLYPH_SIZE²], rótulos [N])
+    """
+    vectors: List[np.ndarray] = []
+    labels: List[int] = []
+
+    for path in fonts:
+        try:
+            font = _load_font(path, size)
+        except Exception as e:
+            logger.warning(f"⚠️  Fonte de template inválida '{path}': {str(e)}")
+            continue
+
+        for n in NUMBERS:
+            canvas = Image.new("L", (size * 3, size * 2), 0)
+            ImageDraw.Draw(canvas).text((size // 2, size // 4), str(n), fill=255, font=font)
+            vec = _normalize_glyph(np.array(canvas))
+            if vec is not None:
+                vectors.append(vec)
+                labels.append(n)
+
+    return np.stack(vectors), np.array(labels, dtype=np.int16)
+
+
+def load_template_dir(directory: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Carrega templates recortados de uma skin real
+
+    Arquivos `<número>.png` ou `<número>_<variação>.png` com o texto
+    claro sobre fundo escuro.
+    """
+    vectors: List[np.ndarray] = []
+    labels: List[int] = []
+
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        label = stem.split("_")[0]
+        if ext.lower() not in (".png", ".jpg", ".jpeg") or not label.isdigit():
+            continue
+        if int(label) not in NUMBERS:
+            continue
+
+        img = np.array(Image.open(os.path.join(directory, name)).convert("L"))
+        vec = _normalize_glyph(img)
+        if vec is not None:
+            vectors.append(vec)
+            labels.append(int(label))
+
+    if not vectors:
+        return np.empty((0, GLYPH_SIZE * GLYPH_SIZE), np.float32), np.empty(0, np.int16)
+    return np.stack(vectors), np.array(labels, dtype=np.int16)
+
+
+def text_intensity(rgb: np.ndarray) -> np.ndarray:
+    """
+    Mapa 0-255 de "brancura": alto para texto branco, baixo para o
+    fundo da ficha (vermelho/verde são saturados, preto é escuro)
+    """
+    hsv = cv2.cvtColor(rgb, cv2.COLOR_RGB2HSV)
+    return np.minimum(hsv[..., 2], 255 - hsv[..., 1])
+
+
+def text_mask(intensity: np.ndarray) -> np.ndarray:
+    """Pixels de texto: claros e pouco saturados (números brancos)"""
+    return (intensity >= _TEXT_MIN_INTENSITY).astype(np.uint8)
+
+
+def chip_color(rgb: np.ndarray, box: Tuple[int, int, int, int], mask: np.ndarray) -> str:
+    """Classifica a cor da ficha pelo entorno (não-texto) do número"""
+    x, y, w, h = box
+    pad = max(2, h // 2)
+    y0, y1 = max(0, y - pad), min(rgb.shape[0], y + h + pad)
+    x0, x1 = max(0, x - pad), min(rgb.shape[1], x + w + pad)
+
+    region = rgb[y0:y1, x0:x1]
+    background = mask[y0:y1, x0:x1] == 0
+    if not background.any():
+        return "black"
+
+    hsv = cv2.cvtColor(region, cv2.COLOR_RGB2HSV)[background]
+    h, s, v = (float(np.median(hsv[:, i])) for i in range(3))
+
+    if s < 80 or v < 60:
+        return "black"
+    if h < 10 or h > 170:
+        return "red"
+    if 40 <= h <= 85:
+        return "green"
+    return "black"
+
+
+def _group_tokens(boxes: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+    """Junta dígitos vizinhos na mesma linha em um único número"""
+    if not boxes:
+        return []
+
+    tokens: List[List[int]] = []
+
+    for x, y, w, h in sorted(boxes, key=lambda b: b[0]):
+        merged = False
+        for t in tokens:
+            tx, ty, tw, th = t
+            overlap = min(ty + th, y + h) - max(ty, y)
+            gap = x - (tx + tw)
+            if overlap > 0.5 * min(th, h) and -w <= gap <= 0.5 * max(th, h):
+                nx0, ny0 = min(tx, x), min(ty, y)
+                nx1, ny1 = max(tx + tw, x + w), max(ty + th, y + h)
+                t[:] = [nx0, ny0, nx1 - nx0, ny1 - ny0]
+                merged = True
+                break
+        if not merged:
+            tokens.append([x, y, w, h])
+
+    return [tuple(t) for t in tokens]
+
+
+class TemplateDigitRecognizer:
+    """
+    Reconhecedor de fichas 0-36 por template matching (sem Tesseract)
+
+    Segmenta os números claros, normaliza cada um e calcula a
+    correlação contra todos os templates com um único produto de
+    matrizes. A cor da ficha é usada para checar/reordenar o resultado
+    (RED_NUMBERS). Fichas com baixa confiança podem ir para um
+    fallback (Tesseract) no recorte da ficha.
+    """
+
+    def __init__(
+        self,
+        fonts: Sequence[Optional[str]] = (None,),
+        template_dir: Optional[str] = None,
+        min_confidence: float = 0.75,
+        min_glyph_height: int = 8
+    ):
+        templates, labels = render_templates(fonts)
+
+        if template_dir and os.path.isdir(template_dir):
+            skin_templates, skin_labels = load_template_dir(template_dir)
+            if len(skin_labels):
+                templates = np.vstack([templates, skin_templates])
+                labels = np.concatenate([labels, skin_labels])
+
+        self.templates = templates  # [N x D], linhas com norma 1
+        self.labels = labels
+        self.min_confidence = min_confidence
+        self.min_glyph_height = min_glyph_height
+
+        # Máscara de rótulos compatíveis com cada cor de ficha
+        self._color_ok = {
+            c: np.array([number_color(int(n)) == c for n in labels])
+            for c in ("red", "black", "green")
+        }
+
+    def segment(
+        self,
+        rgb: np.ndarray
+    ) -> Tuple[List[Tuple[int, int, int, int]], np.ndarray, np.ndarray]:
+        """Caixas dos números (em ordem de tela), intensidade e máscara de texto"""
+        intensity = text_intensity(rgb)
+        mask = text_mask(intensity)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        glyphs = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            if h >= self.min_glyph_height and w <= 2 * h:
+                glyphs.append((x, y, w, h))
+
+        tokens = _group_tokens(glyphs)
+        if not tokens:
+            return [], intensity, mask
+
+        # Ordem de tela: esquerda→direita (faixa horizontal) ou
+        # cima→baixo (faixa vertical)
+        xs = [t[0] for t in tokens]
+        ys = [t[1] for t in tokens]
+        if max(xs) - min(xs) >= max(ys) - min(ys):
+            tokens.sort(key=lambda t: t[0])
+        else:
+            tokens.sort(key=lambda t: t[1])
+        return tokens, intensity, mask
+
+    def classify(self, vectors: np.ndarray, colors: List[str]) -> List[Tuple[int, float]]:
+        """Correlação vetorizada [chips x templates] e melhor rótulo por ficha"""
+        scores = vectors @ self.templates.T
+
+        results = []
+        for i, c in enumerate(colors):
+            row = scores[i]
+            allowed = self._color_ok.get(c)
+            if allowed is not None and allowed.any():
+                row = np.where(allowed, row, -1.0)
+            best = int(np.argmax(row))
+            results.append((int(self.labels[best]), float(row[best])))
+        return results
+
+    def recognize(
+        self,
+        rgb: np.ndarray,
+        fallback: Optional[Callable[[np.ndarray], List[int]]] = None
+    ) -> List[ChipReading]:
+        """
+        Lê as fichas em ordem de tela
+
+        Args:
+            rgb: Imagem (idealmente já recortada na faixa de histórico)
+            fallback: OCR para fichas abaixo de `min_confidence`; recebe
+                o recorte grayscale da ficha
+        """
+        boxes, intensity, mask = self.segment(rgb)
+        if not boxes:
+            return []
+
+        vectors, kept, colors = [], [], []
+        for box in boxes:
+            x, y, w, h = box
+            vec = _normalize_glyph(intensity[y:y + h, x:x + w])
+            if vec is None:
+                continue
+            vectors.append(vec)
+            kept.append(box)
+            colors.append(chip_color(rgb, box, mask))
+
+        if not vectors:
+            return []
+
+        readings = []
+        for box, c, (number, score) in zip(kept, colors, self.classify(np.stack(vectors), colors)):
+            reading = ChipReading(number, c, round(score, 4), "template", box)
+
+            if score < self.min_confidence and fallback is not None:
+                x, y, w, h = box
+                pad = max(2, h // 2)
+                crop = cv2.cvtColor(
+                    rgb[max(0, y - pad):y + h + pad, max(0, x - pad):x + w + pad],
+                    cv2.COLOR_RGB2GRAY
+                )
+                try:
+                    found = fallback(crop)
+                except Exception as e:
+                    logger.warning(f"Fallback de OCR falhou na ficha {box}: {str(e)}")
+                    found = []
+                if found:
+                    reading = ChipReading(found[0], c, round(score, 4), "tesseract", box)
+
+            readings.append(reading)
+
+        return readings
@@ -0,0 +1,347 @@
+# ======================================================
+# ENGINE_BENCHMARK.PY - Benchmark do motor de análise
+# ======================================================
+#
+# Uso:
+#   python -m benchmarks.engine_benchmark                 # roda e compara
+#   python -m benchmarks.engine_benchmark --save-baseline # grava a baseline
+#   python -m benchmarks.engine_benchmark --sizes 100,10000 --strategies 1,10
+#
+# Mede tempo e alocações de analyze_data e de cada calculate_* em
+# históricos sintéticos (seed fixa) e compara com uma baseline em JSON.
+# Sai com código 1 se alguma medição piorar além da tolerância.
+# A significância (Monte Carlo) é medida à parte, em
+# analyze_data_significance, só até MAX_HISTORY_LIMIT.
+
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.engines.ai_engine import (
+    analyze_data,
+    analyze_premium_strategies,
+    calculate_absences,
+    calculate_neighbors,
+    calculate_physical_zones,
+    calculate_stats,
+    calculate_terminals,
+)
+
+
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000)
+DEFAULT_STRATEGIES = (1, 10, 100)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "engine_baseline.json")
+
+
+# ======================================================
+# DADOS SINTÉTICOS
+# ======================================================
+
+def make_history(size: int, seed: int = 42) -> List[int]:
+    """Histórico determinístico de `size` spins"""
+    rng = random.Random(seed * 1_000_003 + size)
+    return [rng.randint(0, 36) for _ in range(size)]
+
+
+def make_strategies(count: int, seed: int = 42) -> List[Dict]:
+    """`count` estratégias com 1 a 6 gatilhos cada"""
+    rng = random.Random(seed * 7919 + count)
+    return [
+        {
+            "name": f"Estratégia {i + 1}",
+            "triggers": rng.sample(range(37), rng.randint(1, 6)),
+        }
+        for i in range(count)
+    ]
+
+
+# ======================================================
+# CASOS
+# ======================================================
+
+Case = Tuple[str, str, Callable[[], object]]
+
+
+def _with_significance(enabled: bool, fn: Callable[[], object]) -> Callable[[], object]:
+    """Roda `fn` com SIGNIFICANCE_ENABLED fixo (restaura ao final)"""
+    def run():
+        previous = settings.SIGNIFICANCE_ENABLED
+        settings.SIGNIFICANCE_ENABLED = enabled
+        try:
+            return fn()
+        finally:
+            settings.SIGNIFICANCE_ENABLED = previous
+    return run
+
+
+def build_cases(
+    sizes: Sequence[int],
+    strategy_counts: Sequence[int],
+    seed: int = 42,
+    max_work: int = 0
+) -> Tuple[List[Case], List[str]]:
+    """
+    Monta os casos (função, parâmetros, chamada)
+
+    As funções que dependem das estratégias rodam para cada
+    quantidade; as demais só variam com o tamanho do histórico.
+    `max_work` (spins x estratégias) pula combinações muito pesadas.
+    analyze_data roda sem significância; com ela, é um caso separado
+    (sem estratégias) para tamanhos até MAX_HISTORY_LIMIT.
+
+    Returns:
+        (casos, nomes dos casos pulados)
+    """
+    cases: List[Case] = []
+    skipped: List[str] = []
+
+    for size in sizes:
+        history = make_history(size, seed)
+        label = f"spins={size}"
+
+        cases.extend([
+            ("calculate_physical_zones", label, lambda h=history: calculate_physical_zones(h)),
+            ("calculate_neighbors", label, lambda h=history: calculate_neighbors(h, radius=3)),
+            ("calculate_terminals", label, lambda h=history, n=size: calculate_terminals(h, max_spins=n)),
+            ("calculate_absences", label, lambda h=history, n=size: calculate_absences(h, max_spins=n)),
+            ("calculate_stats", label, lambda h=history: calculate_stats(h)),
+        ])
+
+        if size <= settings.MAX_HISTORY_LIMIT:
+            cases.append((
+                "analyze_data_significance", label,
+                _with_significance(True, lambda h=history, n=size: analyze_data(h, history_limit=n)),
+            ))
+
+        for count in strategy_counts:
+            strategies = make_strategies(count, seed)
+            label = f"spins={size},strategies={count}"
+
+            if max_work and size * count > max_work:
+                skipped.extend(
+                    f"{name}[{label}]" for name in ("analyze_premium_strategies", "analyze_data")
+                )
+                continue
+
+            cases.extend([
+                (
+                    "analyze_premium_strategies", label,
+                    lambda h=history, s=strategies: analyze_premium_strategies(h, s),
+                ),
+                (
+                    "analyze_data", label,
+                    _with_significance(
+                        False,
+                        lambda h=history, n=size, s=strategies: analyze_data(h, history_limit=n, user_strategies=s),
+                    ),
+                ),
+            ])
+
+    return cases, skipped
+
+
+# ======================================================
+# MEDIÇÃO
+# ======================================================
+
+def measure(
+    fn: Callable[[], object],
+    min_time: float = 0.2,
+    min_repeats: int = 3,
+    max_repeats: int = 1000
+) -> Dict:
+    """
+    Tempo (mediana/mínimo por chamada) e alocações de uma chamada
+
+    O tempo é medido sem tracemalloc (que deixa o código bem mais
+    lento); as alocações vêm de uma chamada separada com tracemalloc.
+    """
+    fn()  # aquecimento
+
+    timings: List[float] = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        total = 0.0
+        while (total < min_time or len(timings) < min_repeats) and len(timings) < max_repeats:
+            started = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - started
+            timings.append(elapsed)
+            total += elapsed
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = fn()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+
+    return {
+        "repeats": len(timings),
+        "median_ms": round(statistics.median(timings) * 1000, 4),
+        "min_ms": round(min(timings) * 1000, 4),
+        "peak_kb": round((peak - before) / 1024, 1),
+        "retained_kb": round((after - before) / 1024, 1),
+    }
+
+
+def run_cases(cases: List[Case], min_time: float = 0.2, verbose: bool = True) -> Dict[str, Dict]:
+    results: Dict[str, Dict] = {}
+    for name, label, fn in cases:
+        key = f"{name}[{label}]"
+        results[key] = measure(fn, min_time=min_time)
+        if verbose:
+            r = results[key]
+            print(
+                f"  {key:<62} {r['median_ms']:>11.4f} ms  "
+                f"(min {r['min_ms']:.4f}, x{r['repeats']})  pico {r['peak_kb']:>10.1f} KB"
+            )
+    return results
+
+
+# ======================================================
+# BASELINE
+# ======================================================
+
+def load_baseline(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, results: Dict[str, Dict], seed: int) -> None:
+    payload = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "seed": seed,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+
+
+def compare(
+    results: Dict[str, Dict],
+    baseline: Dict[str, Dict],
+    time_tolerance: float = 0.2,
+    memory_tolerance: float = 0.1
+) -> List[str]:
+    """
+    Compara com a baseline e retorna as regressões
+
+    Tempo: mínimo por chamada (o menos sensível a ruído da máquina)
+    acima de (1 + tolerância) x baseline. Memória: pico
+    acima de (1 + tolerância) x baseline (com folga mínima de 1 KB, para
+    não acusar ruído em casos pequenos).
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+
+        if current["min_ms"] > previous["min_ms"] * (1 + time_tolerance):
+            regressions.append(
+                f"⏱️  {key}: {previous['min_ms']} → {current['min_ms']} ms "
+                f"({current['min_ms'] / previous['min_ms']:.2f}x)"
+            )
+
+        limit = previous["peak_kb"] * (1 + memory_tolerance) + 1
+        if current["peak_kb"] > limit:
+            regressions.append(
+                f"💾 {key}: pico {previous['peak_kb']} → {current['peak_kb']} KB"
+            )
+
+    return regressions
+
+
+def print_improvements(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float = 0.2) -> None:
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous and current["min_ms"] < previous["min_ms"] * (1 - threshold):
+            print(
+                f"🚀 {key}: {previous['min_ms']} → {current['min_ms']} ms "
+                f"({previous['min_ms'] / current['min_ms']:.2f}x mais rápido)"
+            )
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do motor de análise")
+    parser.add_argument("--sizes", type=_int_list, default=list(DEFAULT_SIZES), help="ex.: 10,1000,100000")
+    parser.add_argument("--strategies", type=_int_list, default=list(DEFAULT_STRATEGIES), help="ex.: 1,10,100")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--min-time", type=float, default=0.2, help="segundos medidos por caso")
+    parser.add_argument(
+        "--max-work", type=int, default=2_000_000,
+        help="pula casos com spins x estratégias acima disso (0 = sem limite)"
+    )
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="grava o resultado como baseline")
+    parser.add_argument("--time-tolerance", type=float, default=0.2)
+    parser.add_argument("--memory-tolerance", type=float, default=0.1)
+    parser.add_argument("--json", help="salva o resultado completo em JSON")
+    args = parser.parse_args()
+
+    cases, skipped = build_cases(args.sizes, args.strategies, args.seed, args.max_work)
+    print(f"📊 {len(cases)} casos (seed {args.seed})")
+    if skipped:
+        print(f"⏭️  {len(skipped)} casos acima de --max-work pulados")
+
+    results = run_cases(cases, min_time=args.min_time)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, args.seed)
+        print(f"💾 Baseline salva em {args.baseline}")
+        return
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"ℹ️  Sem baseline em {args.baseline} (use --save-baseline)")
+        return
+
+    if baseline.get("seed") != args.seed:
+        print(f"⚠️  Baseline gerada com seed {baseline.get('seed')}, comparando mesmo assim")
+
+    print_improvements(results, baseline["results"])
+    regressions = compare(
+        results,
+        baseline["results"],
+        time_tolerance=args.time_tolerance,
+        memory_tolerance=args.memory_tolerance,
+    )
+    if regressions:
+        print(f"❌ {len(regressions)} regressões em relação à baseline:")
+        for line in regressions:
+            print(f"   {line}")
+        sys.exit(1)
+
+    print("✅ Sem regressões em relação à baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+# ======================================================
+# LOAD_TEST.PY - Teste de carga com perfis de tráfego
+# ======================================================
+#
+# Uso:
+#   python -m benchmarks.load_test --duration 60 --sessions 50
+#   python -m benchmarks.load_test --record perfil.json      # grava o perfil
+#   python -m benchmarks.load_test --replay perfil.json      # repete o perfil
+#   python -m benchmarks.load_test --url http://localhost:8000 --pid <uvicorn>
+#
+# Sem --url, a app roda no mesmo processo (httpx + ASGITransport).
+# O perfil é uma lista de requisições com horário relativo, gerada por
+# seed a partir do mix de tráfego; gravado em JSON, pode ser repetido
+# exatamente antes de cada release.
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import resource
+import statistics
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+
+
+# ======================================================
+# PERFIL DE TRÁFEGO
+# ======================================================
+
+@dataclass
+class TrafficMix:
+    """Parâmetros do mix de tráfego (tempos em segundos)"""
+    duration: float = 60.0
+    sessions: int = 50  # sessões simultâneas enviando spins
+    spin_interval: float = 3.0  # média entre add-spin de uma sessão
+    pollers: int = 20  # clientes consultando /analysis
+    poll_interval: float = 2.0
+    strategy_rate: float = 0.05  # chance de /strategies após um spin
+    manual_burst_rate: float = 0.02  # chance de manual-input após um spin
+    manual_burst_size: int = 50  # números por manual-input
+    session_lifetime: float = 30.0  # média de vida antes do churn
+    history_limit: int = 50
+
+
+@dataclass
+class Request:
+    """Requisição agendada em `t` segundos após o início"""
+    t: float
+    route: str  # rótulo da rota (agrupamento das métricas)
+    method: str
+    path: str
+    params: Dict = field(default_factory=dict)
+    json: Optional[Dict] = None
+
+
+def generate_profile(mix: TrafficMix, seed: int = 42) -> List[Request]:
+    """
+    Gera a sequência de requisições do mix (determinística pela seed)
+
+    Cada sessão envia add-spin em intervalos exponenciais, às vezes
+    seguido de /strategies ou de um manual-input; ao fim da vida a
+    sessão é apagada e substituída (churn). Os pollers consultam a
+    análise de sessões ativas.
+    """
+    rng = random.Random(seed)
+    requests: List[Request] = []
+    active: List[str] = []
+
+    def session_requests(session_id: str, start: float) -> None:
+        end = min(mix.duration, start + rng.expovariate(1 / mix.session_lifetime))
+        t = start + rng.uniform(0, mix.spin_interval)
+        params = {"session_id": session_id}
+
+        while t < end:
+            requests.append(Request(
+                t, "add-spin", "POST", "/api/v1/add-spin", params,
+                {"number": rng.randint(0, 36), "history_limit": mix.history_limit},
+            ))
+            if rng.random() < mix.strategy_rate:
+                requests.append(Request(
+                    t + 0.01, "strategies", "POST", "/api/v1/strategies", params,
+                    {
+                        "strategies": [
+                            {"name": f"S{i}", "triggers": rng.sample(range(37), rng.randint(1, 5))}
+                            for i in range(rng.randint(1, 10))
+                        ],
+                        "history_limit": mix.history_limit,
+                    },
+                ))
+            if rng.random() < mix.manual_burst_rate:
+                requests.append(Request(
+                    t + 0.02, "manual-input", "POST", "/api/v1/manual-input", params,
+                    {
+                        "numbers": [rng.randint(0, 36) for _ in range(mix.manual_burst_size)],
+                        "history_limit": mix.history_limit,
+                    },
+                ))
+            t += rng.expovariate(1 / mix.spin_interval)
+
+        if end < mix.duration:
+            requests.append(Request(end, "delete-session", "DELETE", f"/api/v1/session/{session_id}"))
+            # Churn: uma nova sessão assume o lugar
+            session_requests(str(uuid.UUID(int=rng.getrandbits(128))), end)
+        active.append(session_id)
+
+    for _ in range(mix.sessions):
+        session_requests(str(uuid.UUID(int=rng.getrandbits(128))), 0.0)
+
+    for _ in range(mix.pollers):
+        t = rng.uniform(0, mix.poll_interval)
+        while t < mix.duration:
+            requests.append(Request(
+                t, "analysis", "GET", "/api/v1/analysis",
+                {"session_id": rng.choice(active), "history_limit": mix.history_limit},
+            ))
+            t += rng.expovariate(1 / mix.poll_interval)
+
+    requests.sort(key=lambda r: r.t)
+    return requests
+
+
+def save_profile(path: str, mix: TrafficMix, seed: int, requests: List[Request]) -> None:
+    with open(path, "w") as f:
+        json.dump(
+            {"mix": asdict(mix), "seed": seed, "requests": [asdict(r) for r in requests]},
+            f,
+        )
+
+
+def load_profile(path: str) -> List[Request]:
+    with open(path) as f:
+        payload = json.load(f)
+    return [Request(**r) for r in payload["requests"]]
+
+
+# ======================================================
+# MEMÓRIA
+# ======================================================
+
+def rss_bytes(pid: Optional[int] = None) -> Optional[int]:
+    """RSS atual do processo (Linux /proc); sem /proc, o pico do próprio processo"""
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if pid is None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return None
+
+
+# ======================================================
+# EXECUÇÃO
+# ======================================================
+
+@dataclass
+class RouteStats:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    failures: int = 0
+
+    def summary(self) -> Dict:
+        latencies = sorted(self.latencies)
+        n = len(latencies)
+        return {
+            "requests": n + self.failures,
+            "errors": sum(c for s, c in self.statuses.items() if s >= 400) + self.failures,
+            "statuses": dict(self.statuses),
+            "p50_ms": round(latencies[n // 2] * 1000, 2) if n else None,
+            "p99_ms": round(latencies[min(n - 1, int(n * 0.99))] * 1000, 2) if n else None,
+            "max_ms": round(latencies[-1] * 1000, 2) if n else None,
+            "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if n else None,
+        }
+
+
+async def _send(client: httpx.AsyncClient, request: Request, stats: Dict[str, RouteStats], slots: asyncio.Semaphore):
+    async with slots:
+        started = time.perf_counter()
+        try:
+            response = await client.request(
+                request.method, request.path, params=request.params, json=request.json
+            )
+        except Exception:
+            stats[request.route].failures += 1
+            return
+        stats[request.route].latencies.append(time.perf_counter() - started)
+        stats[request.route].statuses[response.status_code] += 1
+
+
+async def replay(
+    client: httpx.AsyncClient,
+    requests: List[Request],
+    speed: float = 1.0,
+    concurrency: int = 256,
+    pid: Optional[int] = None,
+    sample_interval: float = 1.0
+) -> Dict:
+    """
+    Dispara as requisições nos horários do perfil (`speed` acelera)
+
+    Requisições atrasadas (cliente saturado) saem assim que possível;
+    o atraso acumulado aparece em `schedule_lag_ms`.
+    """
+    stats: Dict[str, RouteStats] = defaultdict(RouteStats)
+    slots = asyncio.Semaphore(concurrency)
+    memory: List[int] = []
+    tasks = []
+    max_lag = 0.0
+
+    async def sample_memory():
+        while True:
+            rss = rss_bytes(pid)
+            if rss is not None:
+                memory.append(rss)
+            await asyncio.sleep(sample_interval)
+
+    sampler = asyncio.create_task(sample_memory())
+    started = time.perf_counter()
+
+    for request in requests:
+        delay = request.t / speed - (time.perf_counter() - started)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            max_lag = max(max_lag, -delay)
+        tasks.append(asyncio.create_task(_send(client, request, stats, slots)))
+
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    sampler.cancel()
+
+    rss = rss_bytes(pid)
+    if rss is not None:
+        memory.append(rss)
+
+    total = sum(len(s.latencies) + s.failures for s in stats.values())
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2) if elapsed > 0 else None,
+        "schedule_lag_ms": round(max_lag * 1000, 2),
+        "routes": {route: s.summary() for route, s in sorted(stats.items())},
+        "memory": {
+            "start_mb": round(memory[0] / 2**20, 1),
+            "end_mb": round(memory[-1] / 2**20, 1),
+            "peak_mb": round(max(memory) / 2**20, 1),
+            "growth_mb": round((memory[-1] - memory[0]) / 2**20, 1),
+        } if memory else None,
+    }
+
+
+async def run_in_process(requests: List[Request], **kwargs) -> Dict:
+    """Roda a app no mesmo processo (inclui o lifespan)"""
+    import main
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            report = await replay(client, requests, **kwargs)
+        report["active_sessions"] = main.session_manager.get_active_sessions_count()
+    return report
+
+
+async def run_remote(url: str, requests: List[Request], **kwargs) -> Dict:
+    """Roda contra um servidor (ex.: uvicorn local)"""
+    limits = httpx.Limits(max_connections=kwargs.get("concurrency", 256))
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+        return await replay(client, requests, **kwargs)
+
+
+def print_report(report: Dict) -> None:
+    print(
+        f"📊 {report['requests']} requisições em {report['elapsed_s']}s "
+        f"({report['throughput_rps']} req/s, atraso máx. do agendador {report['schedule_lag_ms']} ms)"
+    )
+    header = f"{'rota':<16} {'reqs':>7} {'erros':>6} {'p50 ms':>9} {'p99 ms':>9} {'máx ms':>9}  status"
+    print(header)
+    print("-" * len(header))
+    for route, s in report["routes"].items():
+        print(
+            f"{route:<16} {s['requests']:>7} {s['errors']:>6} {s['p50_ms'] or 0:>9} "
+            f"{s['p99_ms'] or 0:>9} {s['max_ms'] or 0:>9}  {s['statuses']}"
+        )
+    if report.get("memory"):
+        m = report["memory"]
+        print(f"💾 RSS {m['start_mb']} → {m['end_mb']} MB (pico {m['peak_mb']}, crescimento {m['growth_mb']} MB)")
+    if "active_sessions" in report:
+        print(f"👥 Sessões ativas no fim: {report['active_sessions']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga com perfis de tráfego")
+    parser.add_argument("--url", help="servidor alvo (padrão: app no mesmo processo)")
+    parser.add_argument("--pid", type=int, help="PID do servidor, para medir a memória dele")
+    parser.add_argument("--replay", help="perfil gravado a repetir")
+    parser.add_argument("--record", help="grava o perfil gerado neste arquivo")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--speed", type=float, default=1.0, help="acelera o perfil (2 = metade do tempo)")
+    parser.add_argument("--concurrency", type=int, default=256, help="requisições simultâneas no cliente")
+    parser.add_argument("--json", help="salva o relatório em JSON")
+    parser.add_argument(
+        "--log-level", default="WARNING",
+        help="nível de log da app no mesmo processo (INFO mede também o custo dos logs)"
+    )
+
+    defaults = TrafficMix()
+    for name, value in asdict(defaults).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args()
+
+    if args.replay:
+        requests = load_profile(args.replay)
+        print(f"🔁 Repetindo {len(requests)} requisições de {args.replay}")
+    else:
+        mix = TrafficMix(**{name: getattr(args, name) for name in asdict(defaults)})
+        requests = generate_profile(mix, args.seed)
+        print(f"🎲 Perfil gerado: {len(requests)} requisições em {mix.duration}s (seed {args.seed})")
+        if args.record:
+            save_profile(args.record, mix, args.seed, requests)
+            print(f"💾 Perfil gravado em {args.record}")
+
+    kwargs = {"speed": args.speed, "concurrency": args.concurrency}
+    if args.url:
+        report = asyncio.run(run_remote(args.url, requests, pid=args.pid, **kwargs))
+    else:
+        import main as app_main  # noqa: F401 (configura o logging da app)
+        logging.getLogger().setLevel(args.log_level.upper())
+        report = asyncio.run(run_in_process(requests, **kwargs))
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+# ======================================================
+# OCR_BENCHMARK.PY - Benchmark de OCR com faixas sintéticas
+# ======================================================
+#
+# Uso:
+#   python -m benchmarks.ocr_benchmark [--images 60] [--seed 42]
+#       [--font arquivo.ttf ...] [--pipeline template ...] [--json saida.json]
+#
+# Renderiza screenshots com a faixa de histórico (gabarito conhecido),
+# variando fonte, tamanho das fichas, ruído, escala e compressão JPEG,
+# e mede cada pipeline/estratégia do OCRService em cada backend.
+
+import argparse
+import glob
+import io
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Callable, Dict, List, Optional, Sequence
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from app.engines.ai_engine import color as number_color
+from app.services.ocr_backends import BACKENDS
+
+
+logger = logging.getLogger(__name__)
+
+CHIP_COLORS = {
+    "red": [(200, 20, 20), (178, 34, 34), (220, 40, 50)],
+    "black": [(15, 15, 15), (30, 30, 35), (45, 45, 45)],
+    "green": [(0, 140, 40), (20, 150, 70), (0, 120, 60)],
+}
+BACKGROUNDS = [(40, 40, 45), (20, 60, 30), (60, 20, 20), (25, 25, 60)]
+
+# Caminhos comuns de TTF (usados quando --font não é informado)
+_SYSTEM_FONT_PATTERNS = (
+    "/usr/share/fonts/**/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/**/DejaVuSans.ttf",
+    "/usr/share/fonts/**/LiberationSans-Bold.ttf",
+    "/Library/Fonts/Arial Bold.ttf",
+    "C:/Windows/Fonts/arialbd.ttf",
+)
+
+
+# ======================================================
+# CORPUS SINTÉTICO
+# ======================================================
+
+@dataclass
+class SyntheticSample:
+    """Screenshot renderizado com o gabarito em ordem de tela"""
+    numbers: List[int]
+    image_bytes: bytes
+    params: Dict = field(default_factory=dict)
+
+
+def system_fonts(limit: int = 3) -> List[Optional[str]]:
+    """Fonte padrão do PIL + TTFs encontrados no sistema"""
+    fonts: List[Optional[str]] = [None]
+    for pattern in _SYSTEM_FONT_PATTERNS:
+        fonts.extend(glob.glob(pattern, recursive=True)[:1])
+        if len(fonts) > limit:
+            break
+    return fonts
+
+
+def _font(path: Optional[str], size: int):
+    if path:
+        return ImageFont.truetype(path, size)
+    return ImageFont.load_default(size=size)
+
+
+def render_strip(
+    numbers: Sequence[int],
+    rng: random.Random,
+    font_path: Optional[str] = None,
+    chip: int = 44,
+    orientation: str = "horizontal",
+    noise: float = 0.0,
+    scale: float = 1.0,
+    jpeg_quality: Optional[int] = None,
+    size: Sequence[int] = (1280, 720)
+) -> bytes:
+    """
+    Renderiza um screenshot com a faixa de fichas
+
+    Returns:
+        Bytes PNG (ou JPEG com `jpeg_quality`)
+    """
+    width, height = size
+    img = Image.new("RGB", (width, height), rng.choice(BACKGROUNDS))
+    draw = ImageDraw.Draw(img)
+    font = _font(font_path, int(chip * 0.55))
+    gap = rng.randint(2, 8)
+    step = chip + gap
+
+    if orientation == "horizontal":
+        x0 = rng.randint(20, max(21, width - step * len(numbers) - 20))
+        y0 = rng.randint(20, height - chip - 20)
+    else:
+        x0 = rng.randint(20, width - chip - 20)
+        y0 = rng.randint(20, max(21, height - step * len(numbers) - 20))
+
+    for i, n in enumerate(numbers):
+        x = x0 + i * step if orientation == "horizontal" else x0
+        y = y0 if orientation == "horizontal" else y0 + i * step
+        draw.rectangle((x, y, x + chip, y + chip), fill=rng.choice(CHIP_COLORS[number_color(n)]))
+        draw.text((x + chip // 2, y + chip // 2), str(n), fill=(255, 255, 255), font=font, anchor="mm")
+
+    rgb = np.array(img)
+
+    if noise > 0:
+        noisy = rgb.astype(np.float32) + np.random.default_rng(rng.randint(0, 2**32 - 1)).normal(0, noise, rgb.shape)
+        rgb = np.clip(noisy, 0, 255).astype(np.uint8)
+
+    if abs(scale - 1.0) > 0.01:
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+        rgb = cv2.resize(rgb, (int(width * scale), int(height * scale)), interpolation=interpolation)
+
+    buffer = io.BytesIO()
+    if jpeg_quality:
+        Image.fromarray(rgb).save(buffer, "JPEG", quality=jpeg_quality)
+    else:
+        Image.fromarray(rgb).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def build_corpus(
+    count: int = 60,
+    seed: int = 42,
+    fonts: Optional[Sequence[Optional[str]]] = None
+) -> List[SyntheticSample]:
+    """Gera `count` screenshots determinísticos (mesma seed = mesmo corpus)"""
+    rng = random.Random(seed)
+    fonts = list(fonts) if fonts else system_fonts()
+    samples = []
+
+    for _ in range(count):
+        orientation = "vertical" if rng.random() < 0.2 else "horizontal"
+        length = rng.randint(5, 8) if orientation == "vertical" else rng.randint(8, 16)
+        numbers = [rng.randint(0, 36) for _ in range(length)]
+        params = {
+            "font": fonts[rng.randrange(len(fonts))],
+            "chip": rng.randint(32, 56),
+            "orientation": orientation,
+            "noise": rng.choice([0.0, 0.0, 4.0, 8.0, 12.0]),
+            "scale": rng.choice([0.6, 0.8, 1.0, 1.0, 1.25, 1.5]),
+            "jpeg_quality": rng.choice([None, None, 90, 70, 50]),
+        }
+        image_bytes = render_strip(
+            numbers,
+            rng,
+            font_path=params["font"],
+            chip=params["chip"],
+            orientation=params["orientation"],
+            noise=params["noise"],
+            scale=params["scale"],
+            jpeg_quality=params["jpeg_quality"],
+        )
+        samples.append(SyntheticSample(numbers, image_bytes, params))
+
+    return samples
+
+
+# ======================================================
+# MÉTRICAS
+# ======================================================
+
+def match_numbers(expected: List[int], found: List[int], ordered: bool = True) -> List[bool]:
+    """
+    Marca, para cada número do gabarito, se foi lido corretamente
+
+    Ordenado: alinhamento de sequência (inserções/omissões não
+    deslocam o resto). Sem ordem (process_image devolve um conjunto):
+    presença do número.
+    """
+    if not ordered:
+        present = set(found)
+        return [n in present for n in expected]
+
+    hits = [False] * len(expected)
+    for block in SequenceMatcher(a=expected, b=found, autojunk=False).get_matching_blocks():
+        for i in range(block.a, block.a + block.size):
+            hits[i] = True
+    return hits
+
+
+@dataclass
+class PipelineResult:
+    name: str
+    latencies: List[float] = field(default_factory=list)
+    correct: int = 0
+    total: int = 0
+    exact: int = 0
+    errors: int = 0
+    per_number: Dict[int, List[int]] = field(default_factory=lambda: {n: [0, 0] for n in range(37)})
+
+    def record(self, expected: List[int], found: List[int], ordered: bool, elapsed: float) -> None:
+        self.latencies.append(elapsed)
+        hits = match_numbers(expected, found, ordered)
+        self.correct += sum(hits)
+        self.total += len(expected)
+        if (found == expected) if ordered else (set(found) == set(expected)):
+            self.exact += 1
+        for n, hit in zip(expected, hits):
+            self.per_number[n][0] += int(hit)
+            self.per_number[n][1] += 1
+
+    def summary(self) -> Dict:
+        latencies = sorted(self.latencies)
+        elapsed = sum(latencies)
+        per_number = {
+            n: round(ok / seen, 4) for n, (ok, seen) in self.per_number.items() if seen
+        }
+        return {
+            "pipeline": self.name,
+            "images": len(latencies),
+            "errors": self.errors,
+            "images_per_second": round(len(latencies) / elapsed, 2) if elapsed > 0 else None,
+            "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2) if latencies else None,
+            "p95_ms": round(latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1000, 2)
+            if latencies else None,
+            "accuracy": round(self.correct / self.total, 4) if self.total else None,
+            "exact_strip_rate": round(self.exact / len(latencies), 4) if latencies else None,
+            "per_number_accuracy": per_number,
+            "worst_numbers": sorted(per_number, key=per_number.get)[:5],
+        }
+
+
+# ======================================================
+# PIPELINES
+# ======================================================
+
+def _make_service(backend_name: str, fonts: Sequence[Optional[str]]):
+    from app.services.ocr_service import OCRService
+    from app.services.ocr_templates import TemplateDigitRecognizer
+
+    service = OCRService(backend=backend_name, early_exit=False)
+    service.cache = None  # mede o OCR, não o cache
+    if service.template_recognizer is not None:
+        # Templates das fontes do corpus (como OCR_TEMPLATE_FONTS da skin)
+        service.template_recognizer = TemplateDigitRecognizer(
+            fonts=fonts,
+            min_confidence=service.template_recognizer.min_confidence,
+        )
+    return service
+
+
+def _preprocess(service, sample: SyntheticSample, layout: str):
+    """Decodifica e recorta como o process_image (fora do tempo medido)"""
+    rgb, gray = service._decode_image(sample.image_bytes)
+    if service.roi is None:
+        return rgb, gray
+    gray, region, _ = service.roi.apply(rgb, gray, layout)
+    strip = region.crop(rgb) if region is not None else rgb
+    return strip, gray
+
+
+def pipelines_for(service, backend_name: str) -> Dict[str, Dict]:
+    """
+    Pipelines medidos em um serviço
+
+    `stage`: "bytes" recebe o upload (ponta a ponta); "rgb"/"gray"
+    recebem a faixa já decodificada e recortada (só a estratégia).
+    `ordered`: se o resultado preserva a ordem de tela.
+    """
+    def template(rgb):
+        # Reconhecedor puro (sem fallback nem corte por confiança)
+        return [r.number for r in service.template_recognizer.recognize(rgb)]
+
+    return {
+        f"{backend_name}:process_image": {
+            "stage": "bytes", "ordered": False,
+            "run": lambda data, layout: service.process_image(data, layout=layout),
+        },
+        f"{backend_name}:read_sequence": {
+            "stage": "bytes", "ordered": True,
+            "run": lambda data, layout: service.read_sequence(data, layout=layout),
+        },
+        "template": {"stage": "rgb", "ordered": True, "run": template}
+        if service.template_recognizer is not None else None,
+        f"{backend_name}:basic": {"stage": "gray", "ordered": True, "run": service._strategy_basic},
+        f"{backend_name}:adaptive": {"stage": "gray", "ordered": True, "run": service._strategy_adaptive},
+        f"{backend_name}:bilateral": {"stage": "gray", "ordered": True, "run": service._strategy_bilateral},
+    }
+
+
+def run_pipeline(
+    name: str,
+    pipeline: Dict,
+    service,
+    corpus: List[SyntheticSample],
+    rounds: int = 1
+) -> Optional[PipelineResult]:
+    """Mede um pipeline; retorna None se ele falhar já na primeira imagem"""
+    result = PipelineResult(name)
+    run: Callable = pipeline["run"]
+
+    for r in range(rounds):
+        for i, sample in enumerate(corpus):
+            # Layout único por imagem: o cache de ROI não reaproveita
+            # regiões entre screenshots diferentes do corpus
+            layout = f"bench-{i}"
+            try:
+                if pipeline["stage"] == "bytes":
+                    args = (sample.image_bytes, layout)
+                else:
+                    strip, gray = _preprocess(service, sample, layout)
+                    args = (strip,) if pipeline["stage"] == "rgb" else (gray,)
+
+                started = time.perf_counter()
+                found = run(*args)
+                elapsed = time.perf_counter() - started
+            except Exception as e:
+                if r == 0 and i == 0:
+                    print(f"⏭️  {name}: indisponível ({type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''})")
+                    return None
+                result.errors += 1
+                continue
+
+            if r == 0:
+                result.record(sample.numbers, found, pipeline["ordered"], elapsed)
+            else:
+                result.latencies.append(elapsed)
+
+    return result
+
+
+def run_benchmark(
+    corpus: List[SyntheticSample],
+    fonts: Sequence[Optional[str]] = (None,),
+    backends: Optional[Sequence[str]] = None,
+    only: Optional[Sequence[str]] = None,
+    rounds: int = 1
+) -> List[Dict]:
+    """Roda todos os pipelines em todos os backends disponíveis"""
+    summaries = []
+    seen = set()
+
+    for backend_name in backends or list(BACKENDS):
+        try:
+            service = _make_service(backend_name, fonts)
+        except Exception as e:
+            print(f"⏭️  backend {backend_name}: indisponível ({str(e)})")
+            continue
+
+        if service.backend.name != backend_name:
+            # create_backend caiu para outro backend (ex.: tesserocr ausente)
+            print(f"⏭️  backend {backend_name}: indisponível (usando {service.backend.name})")
+
+        try:
+            for name, pipeline in pipelines_for(service, service.backend.name).items():
+                if pipeline is None or name in seen:
+                    continue  # template não depende do backend
+                if only and not any(o in name for o in only):
+                    continue
+                seen.add(name)
+
+                result = run_pipeline(name, pipeline, service, corpus, rounds)
+                if result is not None:
+                    summaries.append(result.summary())
+        finally:
+            service.shutdown()
+
+    return summaries
+
+
+def print_report(summaries: List[Dict]) -> None:
+    header = f"{'pipeline':<28} {'img/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'acc':>7} {'exata':>7} {'erros':>6}  piores"
+    print(header)
+    print("-" * len(header))
+    for s in summaries:
+        print(
+            f"{s['pipeline']:<28} {s['images_per_second'] or 0:>8} {s['p50_ms'] or 0:>8} "
+            f"{s['p95_ms'] or 0:>8} {s['accuracy'] or 0:>7} {s['exact_strip_rate'] or 0:>7} "
+            f"{s['errors']:>6}  {s['worst_numbers']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de OCR com faixas sintéticas")
+    parser.add_argument("--images", type=int, default=60, help="tamanho do corpus")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rounds", type=int, default=1, help="repetições (só latência)")
+    parser.add_argument("--font", action="append", help="TTF extra (repetível)")
+    parser.add_argument("--backend", action="append", choices=list(BACKENDS))
+    parser.add_argument("--pipeline", action="append", help="filtra pipelines pelo nome")
+    parser.add_argument("--json", help="salva o resultado completo em JSON")
+    args = parser.parse_args()
+
+    # Falhas por imagem entram nas métricas; os logs só poluem a saída
+    logging.disable(logging.CRITICAL)
+
+    fonts = system_fonts() + (args.font or [])
+    started = time.perf_counter()
+    corpus = build_corpus(args.images, args.seed, fonts)
+    print(f"🖼️  Corpus: {len(corpus)} imagens, {len(fonts)} fontes ({time.perf_counter() - started:.1f}s)")
+
+    summaries = run_benchmark(corpus, fonts, args.backend, args.pipeline, args.rounds)
+    print_report(summaries)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"seed": args.seed, "images": len(corpus), "results": summaries}, f, indent=2)
+        print(f"💾 Resultado salvo em {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,30 +2,36 @@
 # MAIN.PY - Backend FastAPI Roulette AI (Corrigido)
 # ======================================================
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Depends
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, UploadFile, File, Depends, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import List, Optional
+import json
 import logging
 
 from app.models.schemas import (
     SpinInput, 
     MultipleSpinsInput, 
     StrategyInput,
+    AlertRulesInput,
     AnalysisResponse
 )
 from app.services.ai_service import AIService
+from app.services.import_service import HistoryImportService, detect_format
 from app.core.config import settings
 from app.core.session_manager import SessionManager
+from app.core.rate_limit import AdmissionControlMiddleware
+from app.core.timing import ServerTimingMiddleware, timing_registry
+from app.core.metrics import AppCollector, MetricsMiddleware, metrics
+from app.core.logging_config import RequestIdMiddleware, setup_logging, stop_logging
+from app.services.ocr_jobs import QueueFullError
 
 # ======================================================
 # LOGGING
 # ======================================================
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Formatação e escrita numa thread separada (QueueHandler/QueueListener)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # ======================================================
@@ -37,10 +43,21 @@ session_manager = SessionManager()
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 Iniciando Roulette AI Backend...")
+    if settings.SIGNIFICANCE_ENABLED and settings.SIGNIFICANCE_WARMUP:
+        # Distribuições nulas do limite padrão; as demais janelas são
+        # simuladas sob demanda (ou todas, com SIGNIFICANCE_WARMUP_ALL)
+        from app.engines.significance import significance_engine
+        windows = [settings.DEFAULT_HISTORY_LIMIT]
+        if settings.SIGNIFICANCE_WARMUP_ALL:
+            windows += list(range(1, settings.MAX_HISTORY_LIMIT + 1))
+        significance_engine.start_warmup(windows)
     yield
     # Shutdown
     logger.info("🛑 Encerrando Roulette AI Backend...")
     session_manager.cleanup_old_sessions()
+    if ocr_jobs is not None:
+        ocr_jobs.shutdown()
+    stop_logging()
 
 app = FastAPI(
     title="Roulette AI API",
@@ -49,9 +66,31 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# ======================================================
+# ADMISSION CONTROL - Rate limit e limites de carga
+# ======================================================
+app.add_middleware(AdmissionControlMiddleware)
+
+# ======================================================
+# INSTRUMENTAÇÃO - Tempo por seção (Server-Timing)
+# ======================================================
+app.add_middleware(ServerTimingMiddleware)
+
+# ======================================================
+# MÉTRICAS - Latência por rota (Prometheus)
+# ======================================================
+app.add_middleware(MetricsMiddleware)
+
+# ======================================================
+# CORRELAÇÃO - X-Request-ID nos logs e na resposta
+# ======================================================
+app.add_middleware(RequestIdMiddleware)
+
 # ======================================================
 # CORS - Configuração segura
 # ======================================================
+# Registrado por último = mais externo: respostas 413/429/503 do
+# admission control também levam os cabeçalhos CORS
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
@@ -64,12 +103,40 @@ app.add_middleware(
 # DEPENDÊNCIAS
 # ======================================================
 ai_service = AIService()
+import_service = HistoryImportService(
+    session_manager,
+    chunk_size=settings.IMPORT_CHUNK_SIZE
+)
 import os
-ocr_service = None
+ocr_jobs = None
 
 if os.getenv("OCR_ENABLED", "false").lower() == "true":
-    from app.services.ocr_service import OCRService
-    ocr_service = OCRService()
+    # OCR roda em processos separados; o processo da API só enfileira
+    from app.services.ocr_jobs import OCRJobQueue
+    
+    from app.services.ocr_stream import strip_additions
+    
+    def _add_ocr_result_to_session(job):
+        # Leitura em ordem de tela: só entra o que passa do fim do histórico
+        if job.session_id and job.numbers:
+            tail = session_manager.get_history(job.session_id, limit=len(job.numbers))
+            added = strip_additions(
+                tail,
+                job.numbers,
+                settings.OCR_STREAM_NEWEST_FIRST,
+                settings.OCR_STREAM_MIN_OVERLAP
+            )
+            if added:
+                session_manager.add_spins(job.session_id, added)
+    
+    ocr_jobs = OCRJobQueue(on_result=_add_ocr_result_to_session)
+
+# Valores lidos no scrape de /metrics
+metrics.register_collector(AppCollector(
+    session_manager,
+    get_ocr_jobs=lambda: ocr_jobs,
+    timing_registry=timing_registry
+))
 
 def get_session_id(session_id: Optional[str] = None) -> str:
     """Obtém ou cria um session_id"""
@@ -99,14 +166,34 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check detalhado"""
-    return {
+    health = {
         "status": "healthy",
         "active_sessions": session_manager.get_active_sessions_count(),
         "services": {
             "ai_engine": "operational",
-            "ocr": "operational"
+            "ocr": "operational" if ocr_jobs is not None else "disabled"
         }
     }
+    
+    if ocr_jobs is not None:
+        health["ocr_jobs"] = ocr_jobs.stats()
+        cache_stats = ocr_jobs.cache_stats()
+        if cache_stats is not None:
+            health["ocr_cache"] = cache_stats
+    
+    if settings.TIMING_ENABLED:
+        health["timings"] = timing_registry.snapshot()
+    
+    return health
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Métricas no formato de exposição do Prometheus"""
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Métricas desabilitadas")
+    
+    body, content_type = metrics.render()
+    return Response(content=body, headers={"Content-Type": content_type})
 
 # ======================================================
 # ROTAS - ANÁLISE DE DADOS
@@ -128,18 +215,19 @@ async def add_spin(
             )
         
         # Adicionar ao histórico da sessão
-        session_manager.add_spin(session_id, data.number)
+        session_manager.add_spin(session_id, data.number, timestamp=data.timestamp)
         
         # Obter histórico
-        history = session_manager.get_history(
+        history, insights = session_manager.get_history_with_insights(
             session_id, 
             limit=data.history_limit
         )
         
         # Analisar
-        analysis = ai_service.analyze(
+        analysis = await ai_service.analyze_async(
             history=history,
-            history_limit=data.history_limit
+            history_limit=data.history_limit,
+            insights=insights
         )
         
         return AnalysisResponse(
@@ -161,28 +249,20 @@ async def manual_input(
     Adiciona múltiplos spins de uma vez
     """
     try:
-        # Validar todos os números
-        invalid = [n for n in data.numbers if not (0 <= n <= 36)]
-        if invalid:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Números inválidos: {invalid}"
-            )
-        
-        # Adicionar todos ao histórico
-        for number in data.numbers:
-            session_manager.add_spin(session_id, number)
+        # Números já validados pelo schema (MultipleSpinsInput)
+        session_manager.add_spins(session_id, data.numbers, timestamps=data.timestamps)
         
         # Obter histórico
-        history = session_manager.get_history(
+        history, insights = session_manager.get_history_with_insights(
             session_id,
             limit=data.history_limit
         )
         
         # Analisar
-        analysis = ai_service.analyze(
+        analysis = await ai_service.analyze_async(
             history=history,
-            history_limit=data.history_limit
+            history_limit=data.history_limit,
+            insights=insights
         )
         
         return AnalysisResponse(
@@ -197,16 +277,71 @@ async def manual_input(
         logger.error(f"Erro em manual_input: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/v1/import")
+async def import_history(
+    request: Request,
+    format: Optional[str] = None,
+    history_limit: int = Query(
+        settings.DEFAULT_HISTORY_LIMIT,
+        ge=settings.MIN_HISTORY_LIMIT,
+        le=settings.MAX_HISTORY_LIMIT
+    ),
+    session_id: str = Depends(get_session_id)
+):
+    """
+    Importação em massa de histórico (CSV ou NDJSON em streaming)
+    
+    O corpo é lido em blocos e gravado em lotes; a análise roda
+    uma única vez no final.
+    """
+    fmt = detect_format(request.headers.get("content-type"), format)
+    if fmt is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Formato não suportado (use CSV ou NDJSON)"
+        )
+    
+    try:
+        report = await import_service.import_stream(
+            session_id,
+            request.stream(),
+            fmt
+        )
+        
+        history, insights = session_manager.get_history_with_insights(session_id, limit=history_limit)
+        analysis = await ai_service.analyze_async(
+            history=history,
+            history_limit=history_limit,
+            insights=insights
+        ) if history else None
+        
+        return {
+            "status": "ok",
+            "session_id": session_id,
+            "import": report,
+            "data": analysis
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro em import_history: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/v1/analysis")
 async def get_analysis(
     session_id: str,
-    history_limit: int = 50
+    history_limit: int = Query(
+        settings.DEFAULT_HISTORY_LIMIT,
+        ge=settings.MIN_HISTORY_LIMIT,
+        le=settings.MAX_HISTORY_LIMIT
+    )
 ):
     """
     Obtém análise do histórico atual sem adicionar spins
     """
     try:
-        history = session_manager.get_history(session_id, limit=history_limit)
+        history, insights = session_manager.get_history_with_insights(session_id, limit=history_limit)
         
         if not history:
             return {
@@ -214,9 +349,10 @@ async def get_analysis(
                 "message": "Nenhum histórico encontrado para esta sessão"
             }
         
-        analysis = ai_service.analyze(
+        analysis = await ai_service.analyze_async(
             history=history,
-            history_limit=history_limit
+            history_limit=history_limit,
+            insights=insights
         )
         
         return AnalysisResponse(
@@ -232,6 +368,160 @@ async def get_analysis(
 # ======================================================
 # ROTAS - OCR
 # ======================================================
+@app.post("/api/v1/ocr-upload", status_code=202)
+async def ocr_upload(
+    file: UploadFile = File(...),
+    layout: Optional[str] = None,
+    session_id: str = Depends(get_session_id)
+):
+    """
+    Enfileira um screenshot para OCR e retorna o job id imediatamente
+    
+    Quando o job termina, a faixa lida (ordem de tela, com repetições)
+    é comparada com o fim do histórico e só os spins novos entram na
+    sessão; acompanhe por GET /api/v1/ocr-jobs/{job_id}.
+    """
+    if ocr_jobs is None:
+        raise HTTPException(status_code=503, detail="OCR desabilitado neste servidor")
+    
+    if file.content_type not in settings.OCR_ALLOWED_FORMATS:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Formato não suportado: {file.content_type}"
+        )
+    
+    image_bytes = await file.read()
+    if not image_bytes:
+        raise HTTPException(status_code=400, detail="Arquivo vazio")
+    if len(image_bytes) > settings.OCR_MAX_FILE_SIZE:
+        raise HTTPException(status_code=413, detail="Imagem muito grande")
+    
+    try:
+        job = ocr_jobs.submit(image_bytes, session_id=session_id, layout=layout)
+    except QueueFullError:
+        return JSONResponse(
+            status_code=503,
+            headers={"Retry-After": "5"},
+            content={"status": "error", "message": "Fila de OCR cheia, tente novamente"}
+        )
+    
+    return {
+        "status": job.status,
+        "session_id": session_id,
+        "job_id": job.id,
+        "poll_url": f"/api/v1/ocr-jobs/{job.id}"
+    }
+
+@app.post("/api/v1/ocr-batch")
+async def ocr_batch(
+    files: List[UploadFile] = File(...),
+    layout: Optional[str] = None,
+    newest_first: Optional[bool] = None,
+    history_limit: int = Query(
+        settings.DEFAULT_HISTORY_LIMIT,
+        ge=settings.MIN_HISTORY_LIMIT,
+        le=settings.MAX_HISTORY_LIMIT
+    ),
+    session_id: str = Depends(get_session_id)
+):
+    """
+    OCR de vários screenshots em uma requisição (back-fill de histórico)
+    
+    As imagens são distribuídas entre os processos de OCR. Retorna a
+    sequência lida de cada imagem (ordem de tela, com repetições) e o
+    histórico combinado, sem duplicar a sobreposição entre screenshots
+    consecutivos. Envie as imagens em ordem cronológica de captura.
+    """
+    if ocr_jobs is None:
+        raise HTTPException(status_code=503, detail="OCR desabilitado neste servidor")
+    
+    from app.services.ocr_stream import merge_sequences
+    
+    if len(files) > settings.OCR_BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Máximo de {settings.OCR_BATCH_MAX_FILES} imagens por lote"
+        )
+    
+    images = []
+    for file in files:
+        if file.content_type not in settings.OCR_ALLOWED_FORMATS:
+            raise HTTPException(
+                status_code=415,
+                detail=f"Formato não suportado: {file.filename} ({file.content_type})"
+            )
+        image_bytes = await file.read()
+        if not image_bytes:
+            raise HTTPException(status_code=400, detail=f"Arquivo vazio: {file.filename}")
+        if len(image_bytes) > settings.OCR_MAX_FILE_SIZE:
+            raise HTTPException(status_code=413, detail=f"Imagem muito grande: {file.filename}")
+        images.append(image_bytes)
+    
+    try:
+        results = await ocr_jobs.run_batch(images, layout=layout)
+    except QueueFullError:
+        return JSONResponse(
+            status_code=503,
+            headers={"Retry-After": "5"},
+            content={"status": "error", "message": "Fila de OCR cheia, tente novamente"}
+        )
+    
+    for file, item in zip(files, results):
+        item["filename"] = file.filename
+    
+    if newest_first is None:
+        newest_first = settings.OCR_STREAM_NEWEST_FIRST
+    merged = merge_sequences(
+        (item["numbers"] for item in results),
+        newest_first,
+        settings.OCR_STREAM_MIN_OVERLAP
+    )
+    
+    if merged:
+        session_manager.add_spins(session_id, merged)
+    
+    history, insights = session_manager.get_history_with_insights(session_id, limit=history_limit)
+    analysis = await ai_service.analyze_async(
+        history=history,
+        history_limit=history_limit,
+        insights=insights
+    ) if history else None
+    
+    return {
+        "status": "success",
+        "session_id": session_id,
+        "images": results,
+        "merged_history": merged,
+        "data": analysis
+    }
+
+@app.get("/api/v1/ocr-jobs/{job_id}")
+async def get_ocr_job(
+    job_id: str,
+    history_limit: int = Query(
+        settings.DEFAULT_HISTORY_LIMIT,
+        ge=settings.MIN_HISTORY_LIMIT,
+        le=settings.MAX_HISTORY_LIMIT
+    )
+):
+    """Consulta o status de um job de OCR (com análise quando concluído)"""
+    job = ocr_jobs.get(job_id) if ocr_jobs is not None else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job de OCR não encontrado")
+    
+    response = job.to_dict()
+    
+    if job.status == "done" and job.session_id:
+        history, insights = session_manager.get_history_with_insights(job.session_id, limit=history_limit)
+        if history:
+            response["data"] = await ai_service.analyze_async(
+                history=history,
+                history_limit=history_limit,
+                insights=insights
+            )
+    
+    return response
+
 
 # ======================================================
 # ROTAS - ESTRATÉGIAS
@@ -245,7 +535,7 @@ async def analyze_strategies(
     Analisa estratégias customizadas do usuário
     """
     try:
-        history = session_manager.get_history(
+        history, insights = session_manager.get_history_with_insights(
             session_id,
             limit=data.history_limit
         )
@@ -256,10 +546,11 @@ async def analyze_strategies(
                 detail="Nenhum histórico disponível para análise"
             )
         
-        analysis = ai_service.analyze(
+        analysis = await ai_service.analyze_async(
             history=history,
             history_limit=data.history_limit,
-            user_strategies=data.strategies
+            user_strategies=[s.model_dump() for s in data.strategies],
+            insights=insights
         )
         
         return {
@@ -302,6 +593,116 @@ async def get_session_stats(session_id: str):
         logger.error(f"Erro ao obter stats: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/v1/session/{session_id}/bias")
+async def get_session_bias(session_id: str):
+    """
+    Viés da roda sobre todos os spins da sessão
+    
+    Não depende da janela do histórico: contadores, testes de
+    aderência, posterior Dirichlet e CUSUM são mantidos spin a spin.
+    """
+    bias = session_manager.get_bias(session_id)
+    if bias is None:
+        raise HTTPException(status_code=404, detail="Sessão não encontrada")
+    
+    return {"status": "ok", "session_id": session_id, "bias": bias}
+
+@app.get("/api/v1/session/{session_id}/alerts")
+async def get_session_alerts(session_id: str):
+    """Regras de alerta da sessão e alertas ativos"""
+    alerts = session_manager.get_alerts(session_id)
+    if alerts is None:
+        raise HTTPException(status_code=404, detail="Sessão não encontrada")
+    
+    return {"status": "ok", "session_id": session_id, **alerts}
+
+@app.put("/api/v1/session/{session_id}/alerts")
+async def set_session_alerts(session_id: str, data: AlertRulesInput):
+    """
+    Substitui as regras de alerta da sessão
+    
+    As regras são compiladas uma vez e avaliadas a cada spin novo;
+    os alertas ativos voltam em `alerts` de toda análise.
+    """
+    try:
+        alerts = session_manager.set_alert_rules(
+            session_id,
+            [rule.model_dump(exclude_none=True) for rule in data.rules]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {"status": "ok", "session_id": session_id, **alerts}
+
+@app.get("/api/v1/session/{session_id}/history")
+async def get_session_history(
+    session_id: str,
+    cursor: Optional[int] = None,
+    limit: int = settings.HISTORY_PAGE_DEFAULT_SIZE
+):
+    """
+    Histórico paginado por cursor
+    
+    Use `next_cursor` da resposta como `cursor` da próxima chamada;
+    `next_cursor` nulo indica o fim do histórico.
+    """
+    if not (1 <= limit <= settings.HISTORY_PAGE_MAX_SIZE):
+        raise HTTPException(
+            status_code=400,
+            detail=f"limit deve estar entre 1 e {settings.HISTORY_PAGE_MAX_SIZE}"
+        )
+    
+    try:
+        page = session_manager.get_history_page(session_id, cursor=cursor, limit=limit)
+        return {
+            "status": "ok",
+            "session_id": session_id,
+            "total_spins": page["total"],
+            "cursor": page["cursor"],
+            "next_cursor": page["next_cursor"],
+            "history": page["items"],
+            "timestamps": page["timestamps"],
+        }
+    except Exception as e:
+        logger.error(f"Erro ao paginar histórico: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/v1/session/{session_id}/export")
+async def export_session_history(session_id: str, format: str = "ndjson"):
+    """
+    Exporta o histórico em streaming (NDJSON ou CSV, chunked)
+    
+    Lê a sessão em blocos, sem montar a lista completa em memória.
+    """
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(
+            status_code=400,
+            detail="Formato inválido (use 'ndjson' ou 'csv')"
+        )
+    
+    chunk_size = settings.HISTORY_EXPORT_CHUNK_SIZE
+    
+    def ndjson_rows():
+        for chunk in session_manager.iter_history(session_id, chunk_size=chunk_size):
+            yield "".join(
+                json.dumps({"position": pos, "number": n}) + "\n"
+                for pos, n in chunk
+            )
+    
+    def csv_rows():
+        yield "position,number\n"
+        for chunk in session_manager.iter_history(session_id, chunk_size=chunk_size):
+            yield "".join(f"{pos},{n}\n" for pos, n in chunk)
+    
+    if format == "csv":
+        return StreamingResponse(
+            csv_rows(),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{session_id}.csv"'}
+        )
+    
+    return StreamingResponse(ndjson_rows(), media_type="application/x-ndjson")
+
 # ======================================================
 # EXCEPTION HANDLERS
 # ======================================================
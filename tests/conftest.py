@@ -0,0 +1,52 @@
+# ======================================================
+# CONFTEST.PY - Configuração comum dos testes
+# ======================================================
+
+import os
+import sys
+
+# Permite `import app` / `import main` rodando pytest da raiz do projeto
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import random
+
+import pytest
+
+
+@pytest.fixture
+def windowed_session(monkeypatch):
+    """
+    Alimenta uma sessão com janela pequena (evicção constante)
+
+    Retorna `run(seed)`, que gera (janela atual, insights) depois de
+    cada lote aleatório de add_spin/add_spins, inclusive lotes maiores
+    que a janela.
+    """
+    from app.core.config import settings
+    from app.core.session_manager import SessionManager
+
+    max_size = 40
+    monkeypatch.setattr(settings, "MAX_HISTORY_PER_SESSION", max_size)
+
+    def run(seed: int, steps: int = 80):
+        rng = random.Random(seed)
+        manager = SessionManager()
+        session_id = manager.create_session()
+        spins = []
+        for _ in range(steps):
+            # Poucos números deixam sequências e repetições longas
+            pool = rng.choice((37, 3))
+            batch = [rng.randrange(pool) for _ in range(rng.choice((1, 1, 3, 17, 55)))]
+            if len(batch) == 1:
+                manager.add_spin(session_id, batch[0])
+            else:
+                manager.add_spins(session_id, batch)
+            spins.extend(batch)
+
+            history, insights = manager.get_history_with_insights(session_id)
+            assert history == spins[-max_size:]
+            yield history, insights
+
+    return run
@@ -0,0 +1,83 @@
+# ======================================================
+# TEST_BIAS.PY - Estimador de viés da roda
+# ======================================================
+
+import math
+import random
+
+import pytest
+
+from app.core import config
+from app.engines.bias import SECTOR_KEYS, BiasEstimator, _SECTOR_INDEX, chi2_sf, goodness_of_fit
+
+
+def _page_cusum(hits, w_hit, w_miss):
+    """CUSUM de Page direto: S = max(0, S + w); retorna (S, último spin com S = 0)"""
+    score, start = 0.0, 0
+    for t, hit in enumerate(hits, start=1):
+        score = max(0.0, score + (w_hit if hit else w_miss))
+        if score == 0.0:
+            start = t
+    return score, start
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_lazy_cusum_matches_page_recursion(seed):
+    rng = random.Random(seed)
+    # Roda viciada a partir do meio: o 17 e o setor dele saem mais
+    spins = [rng.randrange(37) for _ in range(600)]
+    spins += [17 if rng.random() < 0.08 else rng.randrange(37) for _ in range(600)]
+
+    estimator = BiasEstimator()
+    for t, number in enumerate(spins, start=1):
+        estimator.append(number)
+        if t % 97 and t != len(spins):
+            continue
+
+        cusum = estimator.number_cusum
+        for n in (0, 17, number):
+            expected = _page_cusum([s == n for s in spins[:t]], cusum.w_hit[n], cusum.w_miss[n])
+            score, start = cusum.state(n, t)
+            assert score == pytest.approx(expected[0], abs=1e-9)
+            if expected[0] > 1e-9:
+                assert start == expected[1]
+
+        sectors = estimator.sector_cusum
+        for i in range(len(SECTOR_KEYS)):
+            expected = _page_cusum(
+                [_SECTOR_INDEX[s] == i for s in spins[:t]], sectors.w_hit[i], sectors.w_miss[i]
+            )
+            assert sectors.state(i, t)[0] == pytest.approx(expected[0], abs=1e-9)
+
+    alarms = estimator.summary()["alarms"]
+    assert any(a.get("number") == 17 for a in alarms)
+
+
+def test_chi2_sf_closed_forms():
+    for x in (0.0, 0.5, 2.0, 7.3, 40.0):
+        assert chi2_sf(x, 2) == pytest.approx(math.exp(-x / 2), rel=1e-10, abs=1e-300)
+        assert chi2_sf(x, 1) == pytest.approx(math.erfc(math.sqrt(x / 2)), rel=1e-9, abs=1e-300)
+    # Mediana do χ²(36) ≈ 35.336
+    assert chi2_sf(35.336, 36) == pytest.approx(0.5, abs=1e-3)
+
+
+def test_goodness_of_fit_counts():
+    counts = [10] * 37
+    assert goodness_of_fit(counts, [1 / 37] * 37)["chi_square"] == 0.0
+    skewed = goodness_of_fit([20, 10, 0], [1 / 3] * 3)
+    assert skewed["chi_square"] == 20.0
+    assert skewed["p_value_chi_square"] == pytest.approx(math.exp(-10), rel=1e-3)
+
+
+@pytest.mark.parametrize("name, value", [
+    ("BIAS_PRIOR", 0.0),
+    ("BIAS_PRIOR", -1.0),
+    ("BIAS_CREDIBLE_LEVEL", 1.0),
+    ("BIAS_CUSUM_NUMBER_SHIFT", 0.0),
+    ("BIAS_CUSUM_SECTOR_SHIFT", -0.1),
+    ("BIAS_CUSUM_THRESHOLD", 0.0),
+])
+def test_invalid_bias_settings_are_rejected(monkeypatch, name, value):
+    monkeypatch.setattr(config.settings, name, value)
+    with pytest.raises(ValueError, match=name):
+        config.validate_environment()
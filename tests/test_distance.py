@@ -0,0 +1,64 @@
+# ======================================================
+# TEST_DISTANCE.PY - Histogramas de distância na roda
+# ======================================================
+
+import random
+from collections import Counter
+
+import pytest
+
+from app.engines.ai_engine import ROULETTE_WHEEL
+from app.engines.distance import OFFSETS, DistanceTracker, wheel_distance
+
+
+def _brute_histogram(spins, window):
+    distances = [wheel_distance(a, b) for a, b in zip(spins, spins[1:])]
+    counts = Counter(distances[-window:])
+    return {str(o): counts.get(o, 0) for o in OFFSETS}
+
+
+def test_wheel_distance_is_signed_and_short():
+    assert wheel_distance(0, 32) == 1
+    assert wheel_distance(32, 0) == -1
+    assert wheel_distance(0, 26) == -1
+    for a in range(37):
+        for b in range(37):
+            assert -18 <= wheel_distance(a, b) <= 18
+
+
+@pytest.mark.parametrize("windows", [(37, 100, 500), (5,), (1, 3)])
+def test_histograms_match_brute_force_recount(windows):
+    rng = random.Random(sum(windows))
+    tracker = DistanceTracker(windows)
+    spins = []
+    for t in range(1200):
+        spins.append(rng.randrange(37))
+        tracker.append(spins[-1])
+        if t % 113 and t not in (0, 1, 1199):
+            continue
+
+        summary = tracker.summary(top_k=5, radius=2)
+        for described in summary["windows"]:
+            window = described["window"]
+            assert described["histogram"] == _brute_histogram(spins, window)
+            assert described["observed"] == min(len(spins) - 1, window)
+
+
+def test_top_offsets_skip_distances_that_never_occurred():
+    tracker = DistanceTracker([37])
+    base = ROULETTE_WHEEL.index(0)
+    for step in (0, 2, 4):  # duas distâncias de +2
+        tracker.append(ROULETTE_WHEEL[(base + step) % 37])
+
+    window = tracker.summary(top_k=5)["windows"][0]
+    assert window["top_offsets"] == [{"offset": 2, "count": 2, "share": 1.0}]
+
+
+def test_reset_clears_state():
+    tracker = DistanceTracker([10])
+    for n in (1, 2, 3):
+        tracker.append(n)
+    tracker.reset()
+    window = tracker.summary()["windows"][0]
+    assert window["observed"] == 0
+    assert window["top_offsets"] == []
@@ -0,0 +1,60 @@
+# ======================================================
+# TEST_GAPS.PY - Índice de gaps incremental vs recontagem
+# ======================================================
+
+import bisect
+
+import pytest
+
+from app.engines.ai_engine import SECTOR_OF, TERMINAL_OF
+from app.engines.gaps import GAP_BUCKET_LABELS, GAP_BUCKETS, SECTOR_KEYS, GapIndex
+
+
+KEYS = ("hits", "absence", "mean_gap", "max_gap", "histogram")
+
+
+def _describe(window, member):
+    positions = [i for i, n in enumerate(window) if member(n)]
+    gaps = [b - a for a, b in zip(positions, positions[1:])]
+    buckets = [0] * len(GAP_BUCKETS)
+    for gap in gaps:
+        buckets[bisect.bisect_right(GAP_BUCKETS, gap) - 1] += 1
+    return {
+        "hits": len(positions),
+        "absence": len(window) - 1 - positions[-1] if positions else len(window),
+        "mean_gap": round(sum(gaps) / len(gaps), 2) if gaps else None,
+        "max_gap": max(gaps) if gaps else None,
+        "histogram": dict(zip(GAP_BUCKET_LABELS, buckets)),
+    }
+
+
+def _check(summary, window):
+    assert summary["window"] == len(window)
+    for field, category in (("number", lambda n: n), ("terminal", TERMINAL_OF.__getitem__),
+                            ("sector", SECTOR_OF.__getitem__)):
+        for entry in summary[field + "s"]:
+            key = entry[field]
+            expected = _describe(window, lambda n: category(n) == key)
+            assert {k: entry[k] for k in KEYS} == expected
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3, 4])
+def test_gaps_match_recount_across_evictions(windowed_session, seed):
+    for window, insights in windowed_session(seed):
+        _check(insights["gaps"], window)
+
+
+def test_compaction_keeps_positions(monkeypatch):
+    from app.engines import gaps
+
+    monkeypatch.setattr(gaps, "_COMPACT_MIN", 4)
+    history = [n % 5 for n in range(300)]
+    index = GapIndex()
+    for number in history:
+        index.append(number)
+    for i in range(250):
+        index.evict(history[i])
+        if i % 17 == 0:
+            _check(index.summary(), history[i + 1:])
+    _check(index.summary(), history[250:])
+    assert set(SECTOR_KEYS) == {e["sector"] for e in index.summary()["sectors"]}
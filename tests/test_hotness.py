@@ -0,0 +1,74 @@
+# ======================================================
+# TEST_HOTNESS.PY - Scores com decaimento exponencial
+# ======================================================
+
+import random
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from app.engines.ai_engine import TERMINAL_OF
+from app.engines.hotness import HotnessTracker
+from app.models.schemas import MultipleSpinsInput, SpinInput
+
+
+def _reference(spins, half_life, now):
+    """Soma direta de 2^(−Δt/meia-vida) por número e por terminal"""
+    numbers, terminals = [0.0] * 37, [0.0] * 10
+    for number, timestamp in spins:
+        weight = 0.5 ** ((now - timestamp) / half_life)
+        numbers[number] += weight
+        terminals[TERMINAL_OF[number]] += weight
+    return numbers, terminals
+
+
+@pytest.mark.parametrize("half_life", [5.0, 60.0, 1800.0])
+def test_matches_direct_sum(half_life):
+    rng = random.Random(7)
+    start = time.time() - 40000
+    tracker = HotnessTracker(half_life)
+    spins = []
+    t = start
+    for _ in range(20000):
+        t += rng.uniform(0, 2)
+        spin = (rng.randint(0, 36), t)
+        spins.append(spin)
+        tracker.append(*spin)
+
+    now = t + 1
+    summary = tracker.summary(now=now, top_k=37)
+    numbers, terminals = _reference(spins, half_life, now)
+    for entry in summary["numbers"]:
+        assert entry["score"] == pytest.approx(numbers[entry["number"]], abs=1e-3)
+    for entry in summary["terminals"]:
+        assert entry["score"] == pytest.approx(terminals[entry["terminal"]], abs=1e-3)
+    assert summary["total"] == pytest.approx(sum(numbers), abs=1e-2)
+
+
+def test_future_timestamps_do_not_overflow():
+    tracker = HotnessTracker(60.0)
+    now = time.time()
+    tracker.append(17, now * 1000)  # epoch em milissegundos
+    tracker.append(17, now + 10 ** 9)
+    tracker.append(3, now - 30)
+    summary = tracker.summary()
+    assert summary["numbers"][0]["number"] == 17
+    assert summary["total"] <= 3.0
+
+
+def test_clock_behind_reference_reads_at_reference():
+    tracker = HotnessTracker(60.0)
+    now = time.time()
+    tracker.append(5, now)
+    summary = tracker.summary(now=now - 10 ** 6)
+    assert summary["total"] == pytest.approx(1.0)
+
+
+def test_schema_rejects_future_timestamps():
+    now = time.time()
+    SpinInput(number=1, timestamp=now)
+    with pytest.raises(ValidationError):
+        SpinInput(number=1, timestamp=now * 1000)
+    with pytest.raises(ValidationError):
+        MultipleSpinsInput(numbers=[1, 2], timestamps=[now, now + 86400])
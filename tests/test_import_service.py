@@ -0,0 +1,47 @@
+# ======================================================
+# TEST_IMPORT_SERVICE.PY - Parsing de CSV/NDJSON
+# ======================================================
+
+from app.services.import_service import _LineParser
+
+
+def _parse_all(fmt, lines):
+    parser = _LineParser(fmt)
+    numbers, errors = [], []
+    for line in lines:
+        number, error = parser.parse(line)
+        if error:
+            errors.append(error)
+        elif number is not None:
+            numbers.append(number)
+    return numbers, errors
+
+
+def test_export_header_selects_the_number_column():
+    numbers, errors = _parse_all("csv", ["position,number", "1,17", "2,0", "3,36"])
+    assert numbers == [17, 0, 36]
+    assert errors == []
+
+
+def test_header_with_bom_and_quotes():
+    numbers, errors = _parse_all("csv", ['\ufeff"number","position"', "5,1", "32,2"])
+    assert numbers == [5, 32]
+    assert errors == []
+
+
+def test_bad_first_line_is_reported_not_dropped():
+    numbers, errors = _parse_all("csv", ["l7", "12", "3"])
+    assert numbers == [12, 3]
+    assert len(errors) == 1 and errors[0].startswith("Linha 1:")
+
+
+def test_first_line_without_header_is_data():
+    numbers, errors = _parse_all("csv", ["", "7", "37", "8"])
+    assert numbers == [7, 8]
+    assert len(errors) == 1 and "37" in errors[0]
+
+
+def test_ndjson_numbers_and_objects():
+    numbers, errors = _parse_all("ndjson", ["4", '{"number": 9}', '"x"', "{bad"])
+    assert numbers == [4, 9]
+    assert len(errors) == 2
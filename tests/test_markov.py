@@ -0,0 +1,57 @@
+# ======================================================
+# TEST_MARKOV.PY - Transições incrementais vs recontagem
+# ======================================================
+
+from collections import Counter
+
+import pytest
+
+from app.core.config import settings
+from app.engines.markov import (
+    COLOR_STATES,
+    DOZEN_STATES,
+    SECTOR_STATES,
+    _COLOR_STATE,
+    _DOZEN_STATE,
+    _SECTOR_STATE,
+)
+
+
+def _pairs(window, state=lambda n: n):
+    return Counter((state(a), state(b)) for a, b in zip(window, window[1:]))
+
+
+def _followers(pairs, src, top_k):
+    row = {dst: c for (s, dst), c in pairs.items() if s == src}
+    total = sum(row.values())
+    ranked = sorted(row, key=lambda dst: (-row[dst], dst))[:top_k]
+    return total, [(dst, row[dst], round(row[dst] / total, 4)) for dst in ranked]
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3, 4])
+def test_transitions_match_recount_across_evictions(windowed_session, seed):
+    top_k = settings.TRANSITIONS_TOP_K
+    for window, insights in windowed_session(seed):
+        summary = insights["transitions"]
+        last = window[-1]
+        assert summary["last_number"] == last
+        assert summary["transitions"] == len(window) - 1
+
+        total, followers = _followers(_pairs(window), last, top_k)
+        numbers = summary["numbers"]
+        assert numbers["observed"] == total
+        assert [(f["number"], f["count"], f["probability"]) for f in numbers["followers"]] == followers
+
+        for key, mapping, states in (
+            ("sectors", _SECTOR_STATE, SECTOR_STATES),
+            ("colors", _COLOR_STATE, COLOR_STATES),
+            ("dozens", _DOZEN_STATE, DOZEN_STATES),
+        ):
+            pairs = _pairs(window, lambda n: mapping[n])
+            for src in range(len(states)):
+                row_total = sum(c for (s, _), c in pairs.items() if s == src)
+                expected = {
+                    str(states[dst]): round(pairs[(src, dst)] / row_total, 4) if row_total else 0.0
+                    for dst in range(len(states))
+                }
+                assert insights["transitions"][key]["matrix"][str(states[src])] == expected
@@ -0,0 +1,79 @@
+# ======================================================
+# TEST_OCR_CACHE.PY - Cache de resultados de OCR
+# ======================================================
+
+import io
+import random
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from app.services.ocr_cache import OCRResultCache, strip_hash
+from app.services.ocr_roi import ROIPreprocessor
+from benchmarks.ocr_benchmark import render_strip
+
+
+def _decode(image_bytes):
+    rgb = np.array(Image.open(io.BytesIO(image_bytes)).convert("RGB"))
+    return rgb, cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+
+
+def test_perceptual_lookup_is_off_by_default():
+    cache = OCRResultCache()
+    assert not cache.perceptual
+    assert cache.phash_distance == 0
+
+
+def test_one_new_spin_changes_the_strip_hash():
+    """Screenshots da mesma mesa com um spin de diferença não colidem"""
+    checked = 0
+    for seed in range(10):
+        rng = random.Random(seed)
+        numbers = [rng.randint(0, 36) for _ in range(12)]
+        shifted = [rng.randint(0, 36)] + numbers[:-1]
+        frames = [
+            _decode(render_strip(seq, random.Random(100 + seed)))
+            for seq in (numbers, shifted)
+        ]
+
+        hashes = []
+        for rgb, gray in frames:
+            strip, region, _ = ROIPreprocessor().apply(rgb, gray)
+            if region is None:
+                break  # sem faixa, o serviço nem consulta o hash perceptual
+            hashes.append(strip_hash(strip, region.orientation))
+        if len(hashes) == 2:
+            checked += 1
+            assert hashes[0] != hashes[1]
+    assert checked
+
+
+def test_exact_and_strip_hash_hits():
+    cache = OCRResultCache(perceptual=True)
+    cache.put("a", [1, 2, 3], phash=0b1010, layout="evo")
+    assert cache.get_exact("a") == [1, 2, 3]
+    assert cache.get_similar(0b1010, "evo") == [1, 2, 3]
+    assert cache.get_similar(0b1010, "other") is None
+    assert cache.get_similar(0b1011, "evo") is None  # distância 0
+
+
+def test_similar_scan_is_bounded():
+    cache = OCRResultCache(perceptual=True, phash_distance=2, scan_limit=3)
+    cache.put("old", [7], phash=0b1111)
+    for i in range(5):
+        cache.put(f"new{i}", [i], phash=1 << (10 + i))
+    # Entrada antiga a 1 bit de distância, mas fora das 3 mais recentes
+    assert cache.get_similar(0b1110) is None
+    cache.put("recent", [9], phash=0b110000)
+    assert cache.get_similar(0b110001) == [9]
+
+
+def test_misses_are_recorded_once():
+    cache = OCRResultCache()
+    assert cache.get_exact("x") is None
+    cache.record_miss()
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.0
+
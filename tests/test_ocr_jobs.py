@@ -0,0 +1,112 @@
+# ======================================================
+# TEST_OCR_JOBS.PY - Fila de OCR e resultados na sessão
+# ======================================================
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from app.services import ocr_jobs
+from app.services.ocr_jobs import OCRJobQueue
+from app.services.ocr_stream import strip_additions
+
+
+def _sleep(seconds: float, value):
+    time.sleep(seconds)
+    return {"numbers": [value], "duration": seconds, "pid": 0}
+
+
+def _thread_queue(monkeypatch, fn, **kwargs) -> OCRJobQueue:
+    """Fila com threads no lugar dos processos (o worker vira `fn`)"""
+    queue = OCRJobQueue(**kwargs)
+    queue._executor.shutdown(wait=False)
+    queue._executor = ThreadPoolExecutor(max_workers=queue.max_workers)
+    monkeypatch.setattr(ocr_jobs, "_run_ocr", fn)
+    monkeypatch.setattr(ocr_jobs, "_run_ocr_sequence", fn)
+    return queue
+
+
+def test_timed_out_job_keeps_its_worker_slot(monkeypatch):
+    """Um job travado não faz os seguintes estourarem o timeout"""
+    durations = {b"slow": 0.6, b"fast": 0.05}
+    queue = _thread_queue(
+        monkeypatch,
+        lambda image, layout: _sleep(durations[image], image.decode()),
+        max_workers=1,
+        timeout=0.3,
+    )
+
+    async def scenario():
+        slow = queue.submit(b"slow")
+        await asyncio.sleep(0)
+        fast = queue.submit(b"fast")
+        await queue.wait(slow.id)
+        assert slow.status == "timeout"
+        assert fast.status == "queued"  # vaga ainda ocupada pelo worker lento
+        await queue.wait(fast.id)
+        return fast
+
+    fast = asyncio.run(scenario())
+    assert fast.status == "done"
+    assert fast.numbers == ["fast"]
+    queue.shutdown()
+
+
+def test_session_jobs_read_the_ordered_sequence(monkeypatch):
+    queue = _thread_queue(monkeypatch, lambda image, layout: None, max_workers=1)
+    monkeypatch.setattr(ocr_jobs, "_run_ocr", lambda image, layout: _sleep(0, "set"))
+    monkeypatch.setattr(ocr_jobs, "_run_ocr_sequence", lambda image, layout: _sleep(0, "sequence"))
+
+    async def scenario():
+        with_session = queue.submit(b"a", session_id="s1")
+        without = queue.submit(b"b")
+        await queue.wait(with_session.id)
+        await queue.wait(without.id)
+        return with_session.numbers, without.numbers
+
+    assert asyncio.run(scenario()) == (["sequence"], ["set"])
+    queue.shutdown()
+
+
+def test_repeated_session_upload_hits_the_result_cache(monkeypatch):
+    """Jobs de sessão (caminho de toda requisição HTTP) consultam o cache"""
+    from app.services.ocr_service import OCRService
+
+    service = OCRService(max_workers=1, roi_enabled=False)
+    reads = []
+    monkeypatch.setattr(service, "read_strip", lambda strip: reads.append(1) or [7, 3, 19])
+    monkeypatch.setattr(ocr_jobs, "_worker_service", service)
+
+    queue = OCRJobQueue(max_workers=1)
+    queue._executor.shutdown(wait=False)
+    queue._executor = ThreadPoolExecutor(max_workers=1)
+    _, png = cv2.imencode(".png", np.full((40, 120, 3), 90, dtype=np.uint8))
+    image = png.tobytes()
+
+    async def scenario():
+        # Sessões diferentes: chaves de job distintas, sem deduplicação na fila
+        first = queue.submit(image, session_id="s1")
+        await queue.wait(first.id)
+        second = queue.submit(image, session_id="s2")
+        await queue.wait(second.id)
+        return first.numbers, second.numbers
+
+    assert asyncio.run(scenario()) == ([7, 3, 19], [7, 3, 19])
+    assert len(reads) == 1
+    stats = queue.cache_stats()
+    assert stats["hits_exact"] == 1
+    assert stats["misses"] == 1
+    queue.shutdown()
+
+
+def test_strip_additions_keeps_order_and_repeats():
+    history = [5, 17, 17, 32]
+    # Faixa com os mais novos à esquerda: 0 e 17 saíram depois de 32
+    assert strip_additions(history, [17, 0, 32, 17, 17]) == [0, 17]
+    assert strip_additions(history, [32, 17, 17, 5]) == []
+    # Sem sobreposição (ou sessão vazia): a faixa inteira, em ordem cronológica
+    assert strip_additions([], [3, 2, 1]) == [1, 2, 3]
+    assert strip_additions(history, [1, 2], newest_first=False) == [1, 2]
@@ -0,0 +1,91 @@
+# ======================================================
+# TEST_OCR_ROI.PY - Cache de regiões da faixa de histórico
+# ======================================================
+
+import io
+import random
+
+import numpy as np
+from PIL import Image
+
+from app.services.ocr_roi import ROIPreprocessor, Region, detect_history_strip, region_fits
+from app.services.ocr_stream import FrameStreamProcessor
+from benchmarks.ocr_benchmark import render_strip
+
+
+def _rgb(numbers, seed, **kwargs):
+    return np.array(Image.open(io.BytesIO(render_strip(numbers, random.Random(seed), **kwargs))).convert("RGB"))
+
+
+NUMBERS = [32, 15, 19, 4, 21, 2, 25, 17, 34, 6]
+# Seeds com fundo neutro (fundos vermelho/verde saturados viram ficha na máscara)
+SEEDS = (0, 2, 6, 9, 10)
+
+
+def test_detected_region_fits_its_own_image():
+    for seed in SEEDS:
+        rgb = _rgb(NUMBERS, seed)
+        region = detect_history_strip(rgb)
+        assert region is not None
+        assert region_fits(rgb, region)
+
+
+def test_cached_region_is_not_reused_for_another_layout_of_the_same_size():
+    roi = ROIPreprocessor()
+    first = _rgb(NUMBERS, 0)
+    other = _rgb(NUMBERS, 2, orientation="vertical")
+
+    region, key = roi.locate(first)
+    assert region.source == "detected"
+    assert roi.locate(first)[0].source == "cache"
+
+    moved, other_key = roi.locate(other)
+    assert other_key == key  # mesma resolução
+    assert moved.source == "detected"
+    assert moved.orientation == "vertical"
+
+
+def test_region_is_dropped_when_the_strip_outgrows_it():
+    for seed in SEEDS:
+        rgb = _rgb(NUMBERS, seed)
+        full = detect_history_strip(rgb)
+
+        # Região de uma faixa mais curta: fichas além da ponta
+        short = Region(full.x, full.y, full.w // 2, full.h, full.orientation, "cache")
+        assert not region_fits(rgb, short)
+
+
+def test_confirm_drops_region_when_count_falls():
+    roi = ROIPreprocessor()
+    rgb = _rgb(NUMBERS, 6)
+    region, key = roi.locate(rgb)
+
+    assert roi.confirm(rgb, region, len(NUMBERS))
+    assert roi.confirm(rgb, region, len(NUMBERS))
+    assert not roi.confirm(rgb, region, len(NUMBERS) - 3)
+    assert roi.cache.get(key) is None
+
+    # Leitura vazia também descarta
+    region, key = roi.locate(rgb)
+    assert not roi.confirm(rgb, region, 0)
+    assert roi.cache.get(key) is None
+
+
+def test_frame_stream_relocates_when_count_falls():
+    frames = [_rgb(NUMBERS, 9)] * 2
+    readings = iter([NUMBERS, NUMBERS[:6]])
+    lost = []
+
+    processor = FrameStreamProcessor(
+        recognize=lambda strip: next(readings),
+        on_region_lost=lost.append,
+        diff_threshold=0.0,
+    )
+    processor.feed(frames[0])
+    processor._recognized_thumb = None  # força nova leitura do mesmo frame
+    processor._previous_thumb = None
+    processor.feed(frames[1])
+
+    assert processor.stats.relocations == 1
+    assert processor.region is None
+    assert len(lost) == 1
@@ -0,0 +1,43 @@
+# ======================================================
+# TEST_OCR_STREAM.PY - Sobreposição entre leituras da faixa
+# ======================================================
+
+import random
+
+from app.services.ocr_stream import merge_sequences, new_numbers
+
+
+def _strip(history, end, size=12):
+    """Faixa em ordem de tela (mais recente à esquerda) no spin `end`"""
+    return history[max(0, end - size):end][::-1]
+
+
+def test_single_number_overlap_is_not_accepted():
+    # Só o 7 em comum: troca de mesa, não 11 spins novos
+    assert new_numbers([7, 1, 2, 3], [9, 8, 6, 5, 4, 7]) is None
+    assert new_numbers([7, 1, 2, 3], [4, 7, 1, 2]) == [4]
+
+
+def test_short_strips_need_the_whole_strip():
+    assert new_numbers([5], [9, 5]) == [9]
+    assert new_numbers([5, 9], [3, 5]) is None
+    assert new_numbers([], [1, 2]) is None
+
+
+def test_oldest_first_orientation():
+    assert new_numbers([4, 3, 2, 1], [3, 2, 1, 5], newest_first=False) == [5]
+
+
+def test_merge_reconstructs_history_from_overlapping_screenshots():
+    rng = random.Random(11)
+    for _ in range(50):
+        history = [rng.randrange(37) for _ in range(rng.randint(20, 80))]
+        ends, end = [], rng.randint(4, 12)
+        while end < len(history):
+            ends.append(end)
+            end += rng.randint(0, 8)  # até 8 spins novos por screenshot
+        ends.append(len(history))
+
+        merged = merge_sequences(_strip(history, e) for e in ends)
+        first = ends[0]
+        assert merged == history[max(0, first - 12):]
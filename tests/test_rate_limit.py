@@ -0,0 +1,165 @@
+# ======================================================
+# TEST_RATE_LIMIT.PY - Admission control
+# ======================================================
+
+import asyncio
+
+from app.core.rate_limit import (
+    AdmissionControlMiddleware,
+    RateLimiter,
+    TokenBucket,
+    TrustedProxies,
+    client_ip,
+)
+
+
+async def _ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def _scope(peer="203.0.113.7", path="/api/v1/analysis", query=b"", forwarded=None):
+    headers = []
+    if forwarded is not None:
+        headers.append((b"x-forwarded-for", forwarded.encode("latin-1")))
+    return {
+        "type": "http",
+        "path": path,
+        "query_string": query,
+        "headers": headers,
+        "client": (peer, 50000),
+    }
+
+
+def _status(middleware, scope) -> int:
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return sent[0]["status"]
+
+
+def _middleware(**kwargs) -> AdmissionControlMiddleware:
+    kwargs.setdefault("rate_limiter", RateLimiter(rate=0.0, capacity=3))
+    kwargs.setdefault("session_limiter", RateLimiter(rate=0.0, capacity=3))
+    return AdmissionControlMiddleware(
+        _ok_app,
+        heavy_routes=[],
+        exempt_routes=[],
+        enabled=True,
+        **kwargs
+    )
+
+
+def test_token_bucket_refills_lazily():
+    bucket = TokenBucket(rate=0.0, capacity=2)
+    assert bucket.try_consume()[0]
+    assert bucket.try_consume()[0]
+    allowed, retry_after = bucket.try_consume()
+    assert not allowed and retry_after == float("inf")
+
+
+def test_forwarded_for_ignored_from_untrusted_peer():
+    trusted = TrustedProxies()
+    scope = _scope(forwarded="1.2.3.4")
+    assert client_ip(scope, trusted) == "203.0.113.7"
+
+
+def test_forwarded_for_from_trusted_proxy_uses_rightmost_untrusted_hop():
+    trusted = TrustedProxies(["10.0.0.0/8"])
+    scope = _scope(peer="10.1.2.3", forwarded="6.6.6.6, 198.51.100.9, 10.4.4.4")
+    assert client_ip(scope, trusted) == "198.51.100.9"
+
+
+def test_rotating_session_ids_does_not_reset_the_ip_bucket():
+    middleware = _middleware()
+    statuses = [
+        _status(middleware, _scope(query=f"session_id=s{i}".encode()))
+        for i in range(5)
+    ]
+    assert statuses == [200, 200, 200, 429, 429]
+
+
+def test_spoofed_forwarded_for_does_not_reset_the_ip_bucket():
+    middleware = _middleware()
+    statuses = [
+        _status(middleware, _scope(forwarded=f"192.0.2.{i}"))
+        for i in range(5)
+    ]
+    assert statuses == [200, 200, 200, 429, 429]
+
+
+def test_session_bucket_applies_on_top_of_ip_bucket():
+    middleware = _middleware(
+        rate_limiter=RateLimiter(rate=0.0, capacity=100),
+        session_limiter=RateLimiter(rate=0.0, capacity=2),
+    )
+    statuses = [
+        _status(middleware, _scope(peer=f"198.51.100.{i}", query=b"session_id=shared"))
+        for i in range(3)
+    ]
+    assert statuses == [200, 200, 429]
+
+
+def test_new_sessions_do_not_evict_ip_buckets():
+    middleware = _middleware(
+        rate_limiter=RateLimiter(rate=0.0, capacity=1, max_clients=2),
+        session_limiter=RateLimiter(rate=0.0, capacity=100, max_clients=2),
+    )
+    assert _status(middleware, _scope(peer="198.51.100.1")) == 200
+    for i in range(10):
+        _status(middleware, _scope(peer="198.51.100.2", query=f"session_id=x{i}".encode()))
+    # O bucket (vazio) do primeiro IP continua lá
+    assert _status(middleware, _scope(peer="198.51.100.1")) == 429
+
+
+def test_session_rejection_does_not_spend_the_ip_bucket():
+    ip_limiter = RateLimiter(rate=0.0, capacity=3)
+    middleware = _middleware(
+        rate_limiter=ip_limiter,
+        session_limiter=RateLimiter(rate=0.0, capacity=1),
+    )
+    statuses = [
+        _status(middleware, _scope(query=b"session_id=busy"))
+        for _ in range(4)
+    ]
+    assert statuses == [200, 429, 429, 429]
+    # Só o pedido admitido consumiu do IP: restam 2 tokens
+    assert [_status(middleware, _scope()) for _ in range(3)] == [200, 200, 429]
+
+
+def test_preflight_is_exempt_from_admission_control():
+    middleware = _middleware(rate_limiter=RateLimiter(rate=0.0, capacity=0))
+    scope = _scope()
+    scope["method"] = "OPTIONS"
+    assert _status(middleware, scope) == 200
+    assert _status(middleware, _scope()) == 429
+
+
+def test_rejection_from_the_app_carries_cors_headers():
+    """CORS é o middleware mais externo: o 429 chega legível ao navegador"""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    origin = main.settings.ALLOWED_ORIGINS[0]
+    client = TestClient(main.app)
+    client.get("/health")  # monta a pilha de middlewares
+
+    layer = main.app.middleware_stack
+    while not isinstance(layer, AdmissionControlMiddleware):
+        layer = layer.app
+    original = layer.rate_limiter
+    layer.rate_limiter = RateLimiter(rate=0.0, capacity=0)
+    try:
+        response = client.get("/api/v1/analysis", headers={"Origin": origin})
+    finally:
+        layer.rate_limiter = original
+
+    assert response.status_code == 429
+    assert response.headers["access-control-allow-origin"] == origin
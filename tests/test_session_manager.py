@@ -0,0 +1,64 @@
+# ======================================================
+# TEST_SESSION_MANAGER.PY - Histórico e seções da sessão
+# ======================================================
+
+import random
+import threading
+
+from app.core.session_manager import SessionManager
+from app.engines.trackers import SessionTrackers
+
+
+def _without_clock(summary):
+    summary = dict(summary)
+    summary.pop("hotness")
+    return summary
+
+
+def test_snapshot_summary_matches_and_is_independent():
+    rng = random.Random(3)
+    history = [rng.randrange(37) for _ in range(550)]
+    trackers = SessionTrackers()
+    trackers.extend(history[:500], [1_000.0 + i for i in range(500)])
+
+    snapshot = trackers.snapshot()
+    expected = _without_clock(trackers.summary())
+    hotness = trackers.hotness.summary(now=2_000.0)
+
+    trackers.extend(history[500:], [1_600.0 + i for i in range(50)])
+    trackers.evict_prefix(history, 20)
+
+    assert _without_clock(snapshot.summary()) == expected
+    assert snapshot.hotness.summary(now=2_000.0) == hotness
+
+
+def test_summary_is_built_outside_the_session_lock(monkeypatch):
+    manager = SessionManager()
+    session_id = manager.create_session()
+    manager.add_spins(session_id, [1, 2, 3])
+
+    held = []
+    original = SessionTrackers.summary
+
+    def summary(self):
+        # Outra thread consegue o lock enquanto o resumo é montado
+        acquired = []
+        lock = manager._lock._lock
+
+        def probe_lock():
+            acquired.append(lock.acquire(timeout=1))
+            if acquired[0]:
+                lock.release()
+
+        probe = threading.Thread(target=probe_lock)
+        probe.start()
+        probe.join()
+        held.append(not acquired[0])
+        return original(self)
+
+    monkeypatch.setattr(SessionTrackers, "summary", summary)
+    history, insights = manager.get_history_with_insights(session_id, limit=2)
+
+    assert history == [2, 3]
+    assert insights["streaks"]["window"] == 3  # janela da sessão, não `limit`
+    assert held == [False]
@@ -0,0 +1,70 @@
+# ======================================================
+# TEST_SIGNIFICANCE.PY - Monte Carlo fora do event loop
+# ======================================================
+
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.engines import significance
+from app.engines.significance import SignificanceEngine
+from app.services.ai_service import AIService
+
+
+def test_uncached_window_is_simulated_off_the_event_loop(monkeypatch):
+    engine = SignificanceEngine(simulations=200, max_windows=8)
+    monkeypatch.setattr(significance, "significance_engine", engine)
+
+    threads = []
+    original = engine.warmup
+
+    def warmup(windows):
+        threads.append(threading.current_thread())
+        original(windows)
+
+    monkeypatch.setattr(engine, "warmup", warmup)
+    history = [n % 37 for n in range(80)]
+
+    async def run():
+        loop_thread = threading.current_thread()
+        first = await AIService().analyze_async(history, history_limit=60)
+        second = await AIService().analyze_async(history, history_limit=60)
+        return loop_thread, first, second
+
+    loop_thread, first, second = asyncio.run(run())
+
+    assert engine.is_cached(60)
+    assert len(threads) == 1 and threads[0] is not loop_thread
+    assert first["physical_zones"] == second["physical_zones"]
+
+
+@pytest.mark.parametrize("limit", [0, 5, 10_000])
+def test_history_limit_out_of_range_is_rejected(limit):
+    import main
+
+    client = TestClient(main.app)
+    response = client.get("/api/v1/analysis", params={"session_id": "x", "history_limit": limit})
+    assert response.status_code == 422
+
+
+def test_window_above_max_history_limit_skips_significance(monkeypatch):
+    """Janela gigante não dispara simulação (alocação proporcional à janela)"""
+    from app.core.config import settings
+    from app.engines.ai_engine import analyze_data
+
+    engine = SignificanceEngine(simulations=200, max_windows=8, max_window=50)
+    monkeypatch.setattr(significance, "significance_engine", engine)
+    monkeypatch.setattr(settings, "SIGNIFICANCE_ENABLED", True)
+
+    result = analyze_data([n % 37 for n in range(120)], history_limit=120)
+
+    assert engine.cached_windows() == []
+    assert "significance" not in result["absences"]
+    with pytest.raises(ValueError):
+        engine.distribution(51, "number_hits")
+
+    small = analyze_data([n % 37 for n in range(40)], history_limit=40)
+    assert engine.is_cached(40)
+    assert "significance" in small["absences"]
@@ -0,0 +1,24 @@
+# ======================================================
+# TEST_STRATEGIES.PY - Rota de estratégias do usuário
+# ======================================================
+
+from fastapi.testclient import TestClient
+
+
+def test_strategies_route_returns_the_analysis():
+    """Os modelos Strategy chegam ao motor como dicts (senão a lista volta vazia)"""
+    import main
+
+    session_id = main.session_manager.create_session()
+    main.session_manager.add_spins(session_id, [n % 37 for n in range(60)])
+
+    client = TestClient(main.app)
+    response = client.post(
+        "/api/v1/strategies",
+        params={"session_id": session_id},
+        json={"strategies": [{"name": "Zero", "triggers": [0, 32]}], "history_limit": 50},
+    )
+
+    assert response.status_code == 200
+    strategies = response.json()["strategies"]
+    assert [s["name"] for s in strategies] == ["Zero"]
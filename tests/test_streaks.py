@@ -0,0 +1,58 @@
+# ======================================================
+# TEST_STREAKS.PY - Sequências incrementais vs recontagem
+# ======================================================
+
+from collections import Counter, defaultdict
+from itertools import groupby
+
+import pytest
+
+from app.engines.streaks import CATEGORIES, StreakTracker
+
+
+def _runs(window, states):
+    return [(value, len(list(group))) for value, group in groupby(states[n] for n in window)]
+
+
+def _check(summary, window):
+    assert summary["window"] == len(window)
+    for name, states in CATEGORIES.items():
+        runs = _runs(window, states)
+        section = summary[name]
+
+        histogram = defaultdict(Counter)
+        for value, length in runs:
+            histogram[value][length] += 1
+
+        assert section["current"] == {"value": runs[-1][0], "length": runs[-1][1]}
+        assert section["by_value"] == {
+            value: {
+                "longest": max(counts),
+                "runs": sum(counts.values()),
+                "distribution": {str(k): counts[k] for k in sorted(counts)},
+            }
+            for value, counts in histogram.items()
+        }
+        longest = max(length for _, length in runs)
+        assert section["longest"]["length"] == longest
+        assert (section["longest"]["value"], longest) in runs
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3, 4])
+def test_streaks_match_recount_across_evictions(windowed_session, seed):
+    for window, insights in windowed_session(seed):
+        _check(insights["streaks"], window)
+
+
+def test_evicting_down_to_a_single_run_and_empty():
+    history = [1, 3, 5, 7, 2, 4]  # vermelhos e depois pretos
+    tracker = StreakTracker()
+    for number in history:
+        tracker.append(number)
+
+    for index in range(len(history) - 1):
+        tracker.evict(history, index)
+        _check(tracker.summary(), history[index + 1:])
+
+    tracker.evict(history, len(history) - 1)
+    assert tracker.summary()["color"]["current"] == {"value": None, "length": 0}